@@ -0,0 +1,153 @@
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+
+from analysis.data_source import DB_PATH, DEFAULT_EXCHANGE, list_markets
+from analysis.fill_levels import plot_report
+from analysis.replay import replay_fill_stats
+from libraries.analytics.fill_stats import FILTER_THRESHOLD
+
+REPORTS = ("fill_rate", "fill_levels")
+FORMATS = ("csv", "json", "parquet")
+OUT_DIR = os.path.join("output", "analysis")
+
+
+def analyze_market(
+    market: str,
+    start: datetime,
+    end: datetime,
+    db_path: str | None,
+    parquet_dir: str | None,
+    exchange: str,
+    filter_threshold: float,
+) -> dict:
+    """
+    One replay of a market's history, feeding every report. Runs in a worker process, which opens
+    its own read-only handle on the shared database.
+    """
+    started = time.perf_counter()
+    snapshot = replay_fill_stats(
+        market, start, end, db_path=db_path, parquet_dir=parquet_dir, exchange=exchange, filter_threshold=filter_threshold
+    ).snapshot()
+
+    return {
+        "market": market,
+        "summary": {
+            "market": market,
+            "exchange": exchange,
+            "total_usd_filled": snapshot["total_usd_filled"],
+            "total_overflow_usd": snapshot["total_overflow_usd"],
+            "avg_overflow_per_active_hour": snapshot["avg_overflow_per_active_hour"],
+            "active_hours": len(snapshot["per_hour"]),
+            "seconds": time.perf_counter() - started,
+        },
+        "fill_rate": [{"market": market, **row} for row in snapshot["per_hour"]],
+        "fill_levels": [
+            {"market": market, "level": int(level), "usd_filled": usd}
+            for level, usd in snapshot["fill_by_level"].items()
+        ],
+    }
+
+
+def write_rows(rows: list[dict], path_stem: str, formats: list[str]) -> list[str]:
+    written = []
+    for fmt in formats:
+        path = f"{path_stem}.{fmt}"
+        if fmt == "json":
+            with open(path, "w") as f:
+                json.dump(rows, f, indent=2)
+        elif fmt == "csv":
+            with open(path, "w", newline="") as f:
+                if rows:
+                    writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+                    writer.writeheader()
+                    writer.writerows(rows)
+        elif fmt == "parquet":
+            import pandas as pd
+            pd.DataFrame(rows).to_parquet(path, index=False)
+        written.append(path)
+    return written
+
+
+def parse_window(args) -> tuple[datetime, datetime]:
+    end = datetime.fromisoformat(args.end) if args.end else datetime.now(tz=timezone.utc)
+    start = datetime.fromisoformat(args.start) if args.start else end - timedelta(hours=args.hours)
+    # Stored timestamps are UTC ISO strings, so the window bounds must be too
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    return start.astimezone(timezone.utc), end.astimezone(timezone.utc)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill-rate and fill-level reports across many markets.")
+    parser.add_argument("--reports", nargs="+", choices=REPORTS, default=list(REPORTS))
+    parser.add_argument("--markets", nargs="+", help="Markets to analyze, e.g. XECUSDT (default: every recorded market)")
+    parser.add_argument("--exchange", default=DEFAULT_EXCHANGE)
+    parser.add_argument("--hours", type=float, default=24, help="Window length ending at --end (default: 24)")
+    parser.add_argument("--start", help="Window start, ISO 8601 (UTC if no offset)")
+    parser.add_argument("--end", help="Window end, ISO 8601 (default: now)")
+    parser.add_argument("--filter_threshold", type=float, default=FILTER_THRESHOLD)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--db", default=DB_PATH, help=f"SQLite database, opened read-only (default: {DB_PATH})")
+    source.add_argument("--parquet_dir", help="Directory with bba/trades/orderbook .parquet files instead of SQLite")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes (default: CPU count)")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=["csv", "json"])
+    parser.add_argument("--plot", action="store_true", help="Also write a fill-level chart per market")
+    parser.add_argument("--out", default=OUT_DIR)
+    args = parser.parse_args()
+
+    start, end = parse_window(args)
+    db_path = None if args.parquet_dir else args.db
+    markets = [m.replace("-", "") for m in args.markets] if args.markets else list_markets(db_path, args.parquet_dir, args.exchange)
+    if not markets:
+        print("No markets to analyze")
+        return
+
+    run_dir = os.path.join(args.out, datetime.now(tz=timezone.utc).strftime("%Y%m%dT%H%M%SZ"))
+    os.makedirs(run_dir, exist_ok=True)
+    print(f"[ANALYSIS] {len(markets)} markets, {start.isoformat()} -> {end.isoformat()}, {args.workers} workers")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {
+            pool.submit(analyze_market, market, start, end, db_path, args.parquet_dir, args.exchange, args.filter_threshold): market
+            for market in markets
+        }
+        for future in as_completed(futures):
+            market = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"[ERROR] {market} failed: {e}")
+                continue
+            results.append(result)
+            summary = result["summary"]
+            print(f"[ANALYSIS] {market}: ${summary['total_usd_filled']:,.2f} filled in {summary['seconds']:.1f}s")
+
+    results.sort(key=lambda r: r["summary"]["total_usd_filled"], reverse=True)
+    written = write_rows([r["summary"] for r in results], os.path.join(run_dir, "summary"), args.formats)
+    for report in args.reports:
+        rows = [row for r in results for row in r[report]]
+        written += write_rows(rows, os.path.join(run_dir, report), args.formats)
+
+    if args.plot and "fill_levels" in args.reports:
+        for r in results:
+            levels = {row["level"]: row["usd_filled"] for row in r["fill_levels"]}
+            plot_report(
+                {"market": r["market"], "filter_threshold": args.filter_threshold, "fill_by_level": levels},
+                os.path.join(run_dir, "charts", f"fill_levels_{r['market']}.png"),
+            )
+
+    with open(os.path.join(run_dir, "run.json"), "w") as f:
+        json.dump({"start": start.isoformat(), "end": end.isoformat(), "exchange": args.exchange, "markets": markets, "args": vars(args)}, f, indent=2)
+    print(f"[ANALYSIS] Wrote {', '.join(written)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import heapq
+import itertools
+import json
+import os
+import sqlite3
+from datetime import datetime, timezone
+from typing import Iterator
+
+from libraries.models.bar import Bar
+from libraries.models.bba import BBA
+from libraries.models.orderbook import Orderbook
+from libraries.models.side import Side
+from libraries.models.trade import Trade
+from libraries.storage.orderbook_store import OrderbookHistory, has_blocks
+
+DB_PATH = "output/arb_data.db"
+DEFAULT_EXCHANGE = "CoinEx"
+
+# Merge order for events sharing a timestamp: book state first, so a trade sees the quote at or before it
+_BBA, _ORDERBOOK, _TRADE = 0, 1, 2
+
+
+def open_readonly(db_path: str = DB_PATH) -> sqlite3.Connection:
+    """Read-only handle, safe to open from many processes while the recorder keeps writing."""
+    return sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+
+
+def _read_parquet(parquet_dir: str, table: str, columns: list[str], market: str, exchange: str, start: str, end: str, seed: bool):
+    try:
+        import pandas as pd
+    except ImportError as e:
+        raise RuntimeError("Reading a Parquet dataset needs pandas and pyarrow installed") from e
+
+    path = os.path.join(parquet_dir, f"{table}.parquet")
+    key = [("exchange", "==", exchange), ("market", "==", market)]
+    df = pd.read_parquet(path, columns=columns, filters=key + [("ts", ">=", start), ("ts", "<", end)]).sort_values("ts")
+    if seed:
+        before = pd.read_parquet(path, columns=columns, filters=key + [("ts", "<", start)]).sort_values("ts").tail(1)
+        df = pd.concat([before, df])
+    return df.itertuples(index=False)
+
+
+def list_markets(db_path: str | None = None, parquet_dir: str | None = None, exchange: str = DEFAULT_EXCHANGE) -> list[str]:
+    """Every market with recorded trades on the exchange."""
+    if parquet_dir:
+        import pandas as pd
+        df = pd.read_parquet(os.path.join(parquet_dir, "trades.parquet"), columns=["exchange", "market"])
+        return sorted(df[df["exchange"] == exchange]["market"].unique())
+
+    conn = open_readonly(db_path or DB_PATH)
+    try:
+        rows = conn.execute("SELECT DISTINCT market FROM trades WHERE exchange = ? ORDER BY market", (exchange,)).fetchall()
+    finally:
+        conn.close()
+    return [row[0] for row in rows]
+
+
+def _sqlite_rows(conn: sqlite3.Connection, table: str, columns: str, market: str, exchange: str, start: str, end: str, seed: bool):
+    rows = conn.execute(
+        f"SELECT ts, {columns} FROM {table} WHERE exchange = ? AND market = ? AND ts >= ? AND ts < ? ORDER BY ts ASC",
+        (exchange, market, start, end),
+    )
+    if not seed:
+        return rows
+    # The quote in force when the window opens, so the first trades aren't compared against nothing
+    before = conn.execute(
+        f"SELECT ts, {columns} FROM {table} WHERE exchange = ? AND market = ? AND ts < ? ORDER BY ts DESC LIMIT 1",
+        (exchange, market, start),
+    ).fetchall()
+    return itertools.chain(before, rows)
+
+
+def _sqlite_book_rows(conn: sqlite3.Connection, market: str, exchange: str, start: datetime, end: datetime):
+    """(ts, bids) for depth in [start, end) plus the book in force at start, from snapshot rows and delta blocks alike."""
+    start_s, end_s = start.isoformat(), end.isoformat()
+    snapshot_rows = ((row[0], json.loads(row[1])) for row in _sqlite_rows(conn, "orderbook", "bids", market, exchange, start_s, end_s, seed=True))
+    if not has_blocks(conn):
+        return snapshot_rows
+    block_rows = ((ob.ts.isoformat(), ob.bids) for ob in OrderbookHistory(conn, market, exchange).iter_books(start, end))
+    return heapq.merge(snapshot_rows, block_rows, key=lambda row: row[0])
+
+
+def iter_events(
+    market: str,
+    start: datetime,
+    end: datetime,
+    db_path: str | None = None,
+    parquet_dir: str | None = None,
+    exchange: str = DEFAULT_EXCHANGE,
+) -> Iterator[BBA | Orderbook | Trade]:
+    """
+    Recorded BBA, depth and trade updates for one market in [start, end), merged into timestamp
+    order. Each table is read with a single sorted scan, replacing the per-trade "latest quote
+    before this trade" lookups the scripts used to run.
+    """
+    start_s, end_s = start.isoformat(), end.isoformat()
+
+    if parquet_dir:
+        conn = None
+        bba_rows = _read_parquet(parquet_dir, "bba", ["ts", "best_bid_price", "best_bid_size", "best_ask_price", "best_ask_size"], market, exchange, start_s, end_s, seed=True)
+        trade_rows = _read_parquet(parquet_dir, "trades", ["ts", "taker_side", "price", "amount"], market, exchange, start_s, end_s, seed=False)
+        book_rows = ((row[0], json.loads(row[1])) for row in _read_parquet(parquet_dir, "orderbook", ["ts", "bids"], market, exchange, start_s, end_s, seed=True))
+    else:
+        conn = open_readonly(db_path or DB_PATH)
+        bba_rows = _sqlite_rows(conn, "bba", "best_bid_price, best_bid_size, best_ask_price, best_ask_size", market, exchange, start_s, end_s, seed=True)
+        trade_rows = _sqlite_rows(conn, "trades", "taker_side, price, amount", market, exchange, start_s, end_s, seed=False)
+        book_rows = _sqlite_book_rows(conn, market, exchange, start, end)
+
+    try:
+        merged = heapq.merge(
+            ((row[0], _BBA, row) for row in bba_rows),
+            ((row[0], _ORDERBOOK, row) for row in book_rows),
+            ((row[0], _TRADE, row) for row in trade_rows),
+            key=lambda item: (item[0], item[1]),
+        )
+        for ts_str, kind, row in merged:
+            ts = datetime.fromisoformat(ts_str)
+            if kind == _BBA:
+                yield BBA(ts, market, row[1], row[2], row[3], row[4])
+            elif kind == _ORDERBOOK:
+                yield Orderbook(ts, market, row[1], [])
+            else:
+                yield Trade(ts, market, Side[row[1]], row[2], row[3])
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def read_bars(
+    market: str,
+    resolution: int,
+    start: datetime,
+    end: datetime,
+    db_path: str | None = None,
+    exchange: str = DEFAULT_EXCHANGE,
+) -> list[Bar]:
+    """Recorded bars of one resolution (1, 60 or 3600 seconds) starting in [start, end), oldest first."""
+    conn = open_readonly(db_path or DB_PATH)
+    try:
+        rows = conn.execute(
+            """
+            SELECT start_ts, open, high, low, close, volume, quote_volume, trades, buy_volume, mid_close, spread_mean_bps, spread_max_bps, bba_updates
+            FROM bars WHERE exchange = ? AND market = ? AND resolution = ? AND start_ts >= ? AND start_ts < ?
+            ORDER BY start_ts ASC
+            """,
+            (exchange, market, resolution, int(start.timestamp()), int(end.timestamp())),
+        ).fetchall()
+    finally:
+        conn.close()
+    return [
+        Bar(market, resolution, datetime.fromtimestamp(row[0], tz=timezone.utc), *row[1:])
+        for row in rows
+    ]
@@ -0,0 +1,79 @@
+import argparse
+import itertools
+from datetime import datetime
+
+from analysis.data_source import DB_PATH, DEFAULT_EXCHANGE, list_markets, open_readonly
+from libraries.models.bba import BBA
+from libraries.models.side import Side
+from libraries.models.trade import Trade
+from libraries.storage.tick_store import TICK_DIR, TickStore, TickStoreWriter, from_us
+
+FLUSH_EVERY = 100_000  # rows packed in memory between appends
+
+
+def _resume_point(store: TickStore, stream: str) -> tuple[str, int]:
+    """Where to pick up a stream: the last stored timestamp, and how many rows at it are already stored."""
+    data = getattr(store, stream)
+    if not len(data):
+        return "", 0
+    last = int(data["ts"][-1])
+    return from_us(last).isoformat(), store.search(stream, last, side="right") - store.search(stream, last)
+
+
+def export_market(market: str, db_path: str = DB_PATH, root: str = TICK_DIR, exchange: str = DEFAULT_EXCHANGE) -> tuple[int, int]:
+    """
+    Appends a market's recorded BBA and trades to its tick store, continuing after the last record
+    already there, so running it again after copying a newer database only adds the new rows.
+    """
+    writer = TickStoreWriter(market, exchange, root)
+    store = TickStore(market, exchange, root)
+    conn = open_readonly(db_path)
+    try:
+        bba_since, skip = _resume_point(store, "bba")
+        rows = conn.execute(
+            """
+            SELECT ts, best_bid_price, best_bid_size, best_ask_price, best_ask_size FROM bba
+            WHERE exchange = ? AND market = ? AND ts >= ? ORDER BY ts ASC, id ASC
+            """,
+            (exchange, market, bba_since),
+        )
+        bba_count = 0
+        for row in itertools.islice(rows, skip, None):
+            writer.on_bba(BBA(datetime.fromisoformat(row[0]), market, row[1], row[2], row[3], row[4]))
+            bba_count += 1
+            if bba_count % FLUSH_EVERY == 0:
+                writer.flush()
+
+        trades_since, skip = _resume_point(store, "trades")
+        rows = conn.execute(
+            "SELECT ts, taker_side, price, amount FROM trades WHERE exchange = ? AND market = ? AND ts >= ? ORDER BY ts ASC, id ASC",
+            (exchange, market, trades_since),
+        )
+        trade_count = 0
+        for row in itertools.islice(rows, skip, None):
+            writer.on_trade(Trade(datetime.fromisoformat(row[0]), market, Side[row[1]], row[2], row[3]))
+            trade_count += 1
+            if trade_count % FLUSH_EVERY == 0:
+                writer.flush()
+    finally:
+        conn.close()
+    writer.flush()
+    return bba_count, trade_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append recorded BBA and trades from SQLite to per-market memory-mapped tick stores.")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--out", default=TICK_DIR)
+    parser.add_argument("--markets", nargs="+", help="Markets to export, e.g. XECUSDT (default: every recorded market)")
+    parser.add_argument("--exchange", default=DEFAULT_EXCHANGE)
+    args = parser.parse_args()
+
+    markets = [m.replace("-", "") for m in args.markets] if args.markets else list_markets(args.db, exchange=args.exchange)
+    for market in markets:
+        bba_count, trade_count = export_market(market, args.db, args.out, args.exchange)
+        print(f"[EXPORT] {market}: {bba_count} BBA and {trade_count} trades appended to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,74 +1,75 @@
-import sqlite3
+import argparse
+import os
 from datetime import datetime, timedelta, timezone
-import matplotlib.pyplot as plt
-import json
-from collections import defaultdict
 
-# --- Config ---
-DB_PATH = "output/arb_data.db"
-PAIR = "XECUSDT"
-FILTER_THRESHOLD = 0.95  # only count BBA trades consuming ≥95% of visible size
+from analysis.data_source import DB_PATH, DEFAULT_EXCHANGE
+from analysis.replay import replay_fill_stats
+from libraries.analytics.fill_stats import FILTER_THRESHOLD
 
-# --- Connect ---
-conn = sqlite3.connect(DB_PATH)
-cursor = conn.cursor()
 
-# --- Time cutoff ---
-cutoff_ts = (datetime.now(tz=timezone.utc) - timedelta(hours=24)).isoformat()
+def fill_levels(
+    market: str,
+    start: datetime,
+    end: datetime,
+    db_path: str | None = None,
+    parquet_dir: str | None = None,
+    exchange: str = DEFAULT_EXCHANGE,
+    filter_threshold: float = FILTER_THRESHOLD,
+) -> dict:
+    """USD filled by taker sells at each level below the best bid for one market over [start, end)."""
+    stats = replay_fill_stats(
+        market, start, end, db_path=db_path, parquet_dir=parquet_dir, exchange=exchange, filter_threshold=filter_threshold
+    )
+    return {
+        "market": market,
+        "exchange": exchange,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "filter_threshold": filter_threshold,
+        "fill_by_level": {int(level): usd for level, usd in stats.snapshot()["fill_by_level"].items()},
+    }
 
-# --- Step 1: Fetch sell trades ---
-cursor.execute("""
-SELECT ts, amount, price
-FROM trades
-WHERE market = ? AND taker_side = 'SELL' AND ts >= ?
-ORDER BY ts ASC
-""", (PAIR, cutoff_ts))
-trades = cursor.fetchall()
 
-# --- Step 2: Compute USD fill per level, skipping shallow BBA trades ---
-usd_fill_by_level = defaultdict(float)
+def plot_report(report: dict, path: str):
+    """Bar chart of USD filled per level, written to path."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
 
-for ts, amount, trade_price in trades:
-    # Get orderbook snapshot before the trade
-    cursor.execute("""
-    SELECT bids
-    FROM orderbook
-    WHERE market = ? AND ts <= ?
-    ORDER BY ts DESC
-    LIMIT 1
-    """, (PAIR, ts))
-    row = cursor.fetchone()
-    if not row:
-        continue
+    levels = sorted(report["fill_by_level"])
+    usd_values = [report["fill_by_level"][level] for level in levels]
 
-    bids = json.loads(row[0])  # list of [price, size]
-    best_bid_price, best_bid_size = bids[0]
+    fig = plt.figure(figsize=(10, 5))
+    plt.bar(levels, usd_values, color='mediumseagreen', edgecolor='black')
+    plt.title(f"{report['market']} USD Filled at Each Order Book Level (Filtered BBA < {int(report['filter_threshold']*100)}% of visible)")
+    plt.xlabel("Levels Below Best Bid")
+    plt.ylabel("Total USD Filled")
+    plt.xticks(levels)
+    plt.grid(True)
+    plt.tight_layout()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fig.savefig(path)
+    plt.close(fig)
 
-    # Skip BBA trades that didn't consume at least FILTER_THRESHOLD of visible size
-    if trade_price >= best_bid_price and amount < FILTER_THRESHOLD * best_bid_size:
-        continue
 
-    # Determine depth (levels below BBA)
-    depth = 0
-    for level_price, level_size in bids:
-        if trade_price >= level_price:
-            break
-        depth += 1
+def main():
+    parser = argparse.ArgumentParser(description="USD filled at each level below the best bid for one market.")
+    parser.add_argument("--pair", default="XECUSDT")
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--out", default=os.path.join("output", "analysis"), help="Directory for the chart")
+    args = parser.parse_args()
 
-    usd_fill_by_level[depth] += amount * trade_price
+    pair = args.pair.replace("-", "")
+    end = datetime.now(tz=timezone.utc)
+    report = fill_levels(pair, end - timedelta(hours=args.hours), end, db_path=args.db)
+    for level, usd in sorted(report["fill_by_level"].items()):
+        print(f"level {level}: ${usd:,.2f}")
 
-conn.close()
+    path = os.path.join(args.out, f"fill_levels_{pair}.png")
+    plot_report(report, path)
+    print(f"Chart written to {path}")
 
-# --- Step 3: Visualize USD fill per level ---
-levels = sorted(usd_fill_by_level.keys())
-usd_values = [usd_fill_by_level[level] for level in levels]
 
-plt.figure(figsize=(10, 5))
-plt.bar(levels, usd_values, color='mediumseagreen', edgecolor='black')
-plt.title(f"USD Filled at Each Order Book Level (Filtered BBA < {int(FILTER_THRESHOLD*100)}% of visible)")
-plt.xlabel("Levels Below Best Bid")
-plt.ylabel("Total USD Filled")
-plt.xticks(levels)
-plt.grid(True)
-plt.tight_layout()
-plt.show()
+if __name__ == "__main__":
+    main()
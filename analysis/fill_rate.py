@@ -1,76 +1,108 @@
-import sqlite3
+import argparse
 from datetime import datetime, timedelta, timezone
-from collections import defaultdict
-import pandas as pd
-
-# --- Config ---
-DB_PATH = "output/arb_data.db"
-PAIR = "XECUSDT"
-
-conn = sqlite3.connect(DB_PATH)
-cursor = conn.cursor()
-
-# --- Setup ---
-cutoff_ts = (datetime.now(tz=timezone.utc) - timedelta(hours=24)).isoformat()
-
-# Step 1: Fetch trades (SELL side) in the last 24h
-cursor.execute("""
-SELECT ts, amount, price
-FROM trades
-WHERE market = ? AND taker_side = 'SELL' AND ts >= ?
-ORDER BY ts ASC
-""", (PAIR, cutoff_ts))
-trades = cursor.fetchall()
-
-# Initialize aggregators
-total_usd_filled = 0.0
-total_overflow_usd = 0.0
-per_hour_fills = defaultdict(float)
-per_hour_overflow = defaultdict(float)
-
-# Step 2: For each trade, compute overflow and aggregate by hour
-for ts, amount, price in trades:
-    # Get matching BBA
-    cursor.execute("""
-    SELECT best_bid_size
-    FROM bba
-    WHERE market = ? AND ts <= ?
-    ORDER BY ts DESC
-    LIMIT 1
-    """, (PAIR, ts))
-    row = cursor.fetchone()
-    best_bid_size = row[0] if row else 0.0
-
-    overflow_amt = max(0.0, amount - best_bid_size)
-    usd_filled = amount * price
-    overflow_usd = overflow_amt * price
-
-    total_usd_filled += usd_filled
-    total_overflow_usd += overflow_usd
-
-    # Group by hour
-    hour_key = ts[:13]  # 'YYYY-MM-DDTHH'
-    per_hour_fills[hour_key] += usd_filled
-    per_hour_overflow[hour_key] += overflow_usd
-
-# Convert to DataFrame for nicer display
-df = pd.DataFrame([
-    {
-        "hour": hour,
-        "usd_filled": per_hour_fills[hour],
-        "overflow_usd": per_hour_overflow[hour]
+
+from analysis.data_source import DB_PATH, DEFAULT_EXCHANGE
+from analysis.replay import replay_fill_stats
+from libraries.analytics.fill_stats import hour_key
+from libraries.storage.tick_store import TICK_DIR, TickStore, from_us
+
+
+def fill_rate(
+    market: str,
+    start: datetime,
+    end: datetime,
+    db_path: str | None = None,
+    parquet_dir: str | None = None,
+    exchange: str = DEFAULT_EXCHANGE,
+) -> dict:
+    """
+    Taker-sell USD filled and overflow past the best bid for one market over [start, end),
+    in total and per hour.
+    """
+    snapshot = replay_fill_stats(market, start, end, db_path=db_path, parquet_dir=parquet_dir, exchange=exchange).snapshot()
+    return {
+        "market": market,
+        "exchange": exchange,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "total_usd_filled": snapshot["total_usd_filled"],
+        "total_overflow_usd": snapshot["total_overflow_usd"],
+        "avg_overflow_per_active_hour": snapshot["avg_overflow_per_active_hour"],
+        "per_hour": snapshot["per_hour"],
+    }
+
+
+def fill_rate_from_ticks(
+    market: str,
+    start: datetime,
+    end: datetime,
+    tick_dir: str = TICK_DIR,
+    exchange: str = DEFAULT_EXCHANGE,
+) -> dict:
+    """
+    Same report as fill_rate(), computed with array operations over a memory-mapped tick store
+    instead of replaying events one by one: each taker sell is matched to the BBA in force at its
+    time by one vectorized binary search.
+    """
+    import numpy as np
+
+    store = TickStore(market, exchange, tick_dir)
+    trades = store.trades_between(start, end)
+    sells = trades[trades["side"] == -1]
+    # Quotes from the one in force when the window opens, so the first sells aren't compared against nothing
+    bba = store.bba[max(0, store.search("bba", start, side="right") - 1):store.search("bba", end)]
+
+    quote = np.searchsorted(bba["ts"], sells["ts"], side="right") - 1
+    best_bid_size = np.where(quote >= 0, bba["bid_size"][np.maximum(quote, 0)] if len(bba) else 0.0, 0.0)
+    usd = sells["amount"] * sells["price"]
+    overflow = np.maximum(0.0, sells["amount"] - best_bid_size) * sells["price"]
+
+    hours, bucket = np.unique(sells["ts"] // 3_600_000_000, return_inverse=True)
+    usd_by_hour = np.bincount(bucket, usd, minlength=len(hours))
+    overflow_by_hour = np.bincount(bucket, overflow, minlength=len(hours))
+    trades_by_hour = np.bincount(bucket, minlength=len(hours))
+    per_hour = [
+        {"hour": hour_key(from_us(int(hour) * 3_600_000_000)), "usd_filled": float(u), "overflow_usd": float(o), "trades": int(n)}
+        for hour, u, o, n in zip(hours, usd_by_hour, overflow_by_hour, trades_by_hour)
+    ]
+
+    total_overflow = float(overflow_by_hour.sum())
+    return {
+        "market": market,
+        "exchange": exchange,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "total_usd_filled": float(usd_by_hour.sum()),
+        "total_overflow_usd": total_overflow,
+        "avg_overflow_per_active_hour": total_overflow / len(per_hour) if per_hour else 0.0,
+        "per_hour": per_hour,
     }
-    for hour in sorted(per_hour_fills)
-])
 
-# Average overflow per hour
-num_hours = len(per_hour_overflow)
-avg_overflow_per_hour = total_overflow_usd / num_hours if num_hours > 0 else 0.0
 
+def print_report(report: dict):
+    import pandas as pd
+
+    print(f"\nTotal USD filled (taker sells): ${report['total_usd_filled']:,.2f}")
+    print(f"Total overflow past best bid (USD): ${report['total_overflow_usd']:,.2f}\n")
+    print(f"Average overflow USD per active hour: ${report['avg_overflow_per_active_hour']:.2f}")
+    print(pd.DataFrame(report["per_hour"], columns=["hour", "usd_filled", "overflow_usd"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Taker-sell fill rate and overflow past the best bid for one market.")
+    parser.add_argument("--pair", default="XECUSDT")
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--tick_dir", help="Read a tick store (see analysis/export_ticks.py) instead of the database")
+    args = parser.parse_args()
+
+    end = datetime.now(tz=timezone.utc)
+    market = args.pair.replace("-", "")
+    if args.tick_dir:
+        print_report(fill_rate_from_ticks(market, end - timedelta(hours=args.hours), end, tick_dir=args.tick_dir))
+    else:
+        print_report(fill_rate(market, end - timedelta(hours=args.hours), end, db_path=args.db))
 
-print(f"\nTotal USD filled (taker sells): ${total_usd_filled:,.2f}")
-print(f"Total overflow past best bid (USD): ${total_overflow_usd:,.2f}\n")
-print(f"Average overflow USD per active hour: ${avg_overflow_per_hour:.2f}")
-print(df)
 
-conn.close()
+if __name__ == "__main__":
+    main()
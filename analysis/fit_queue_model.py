@@ -0,0 +1,66 @@
+import argparse
+import math
+from datetime import datetime, timedelta, timezone
+
+from analysis.data_source import DB_PATH, DEFAULT_EXCHANGE, iter_events
+from libraries.analytics.queue_model import HORIZONS, LEVELS, MODEL_DIR, QueueModel, model_path
+from libraries.models.orderbook import Orderbook
+from libraries.models.side import Side
+from libraries.models.trade import Trade
+
+
+def fit_queue_model(
+    market: str,
+    start: datetime,
+    end: datetime,
+    db_path: str | None = None,
+    parquet_dir: str | None = None,
+    exchange: str = DEFAULT_EXCHANGE,
+    levels: int = LEVELS,
+    horizons: tuple[float, ...] = HORIZONS,
+) -> QueueModel:
+    """Collects one market's taker sells and bid depth over [start, end) into arrays and fits a QueueModel on them."""
+    import numpy as np
+
+    sell_ts, sell_price, sell_amount = [], [], []
+    book_ts, book_bids = [], []
+    for event in iter_events(market, start, end, db_path=db_path, parquet_dir=parquet_dir, exchange=exchange):
+        if isinstance(event, Trade):
+            if event.taker_side == Side.SELL:
+                sell_ts.append(event.ts.timestamp())
+                sell_price.append(event.price)
+                sell_amount.append(event.amount)
+        elif isinstance(event, Orderbook):
+            prices = [price for price, _ in event.bids[:levels]]
+            book_ts.append(event.ts.timestamp())
+            book_bids.append(prices + [math.nan] * (levels - len(prices)))
+
+    return QueueModel.fit(
+        market,
+        np.array(sell_ts), np.array(sell_price), np.array(sell_amount),
+        np.array(book_ts), np.array(book_bids).reshape(len(book_ts), levels),
+        start.timestamp(), end.timestamp(), horizons,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit the queue-position / fill-time model the strategy loads at startup.")
+    parser.add_argument("--pair", default="XECUSDT")
+    parser.add_argument("--hours", type=float, default=72)
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--out", default=MODEL_DIR)
+    args = parser.parse_args()
+
+    market = args.pair.replace("-", "")
+    end = datetime.now(tz=timezone.utc)
+    model = fit_queue_model(market, end - timedelta(hours=args.hours), end, db_path=args.db)
+    path = model_path(market, args.out)
+    model.save(path)
+
+    print(f"[QUEUE MODEL] {market}: {args.hours:g}h fitted, written to {path}")
+    for level, rate in enumerate(model.rates):
+        print(f"  level {level}: {rate:,.4f}/s reaching it, P(fill 1 unit in {model.horizons[-1]:g}s) = {model.fill_probability(level, 0.0, 1.0, model.horizons[-1]):.2f}")
+
+
+if __name__ == "__main__":
+    main()
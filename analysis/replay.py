@@ -0,0 +1,31 @@
+import math
+from datetime import datetime
+
+from analysis.data_source import DEFAULT_EXCHANGE, iter_events
+from libraries.analytics.fill_stats import FILTER_THRESHOLD, FillStats
+from libraries.models.bba import BBA
+from libraries.models.orderbook import Orderbook
+
+
+def replay_fill_stats(
+    market: str,
+    start: datetime,
+    end: datetime,
+    db_path: str | None = None,
+    parquet_dir: str | None = None,
+    exchange: str = DEFAULT_EXCHANGE,
+    filter_threshold: float = FILTER_THRESHOLD,
+) -> FillStats:
+    """Runs recorded history through the same FillStats the live services use, so batch and live numbers agree."""
+    # Wide enough that nothing inside [start, end) is pruned as it streams past
+    window_hours = math.ceil((end - start).total_seconds() / 3600) + 1
+    stats = FillStats(market, window_hours=window_hours, filter_threshold=filter_threshold)
+
+    for event in iter_events(market, start, end, db_path=db_path, parquet_dir=parquet_dir, exchange=exchange):
+        if isinstance(event, BBA):
+            stats.on_bba(event)
+        elif isinstance(event, Orderbook):
+            stats.on_orderbook(event)
+        else:
+            stats.on_trade(event)
+    return stats
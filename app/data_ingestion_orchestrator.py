@@ -1,16 +1,27 @@
+import argparse
 import asyncio
 import sqlite3
 import os
+import json
+import signal
+from dataclasses import asdict
 
-from libraries.data_ingestion.coinex_data_feed import CoinexDataFeed
+from libraries.analytics.bar_builder import BarBuilder
+from libraries.analytics.fill_stats import FillStats
+from libraries.data_ingestion.coinex_data_feed import COINEX_WS, CoinexDataFeed
+from libraries.monitoring.feed_health import FeedHealthMonitor
+from libraries.monitoring.metrics_server import MetricsServer
+from libraries.monitoring.latency_tracer import tracer
+from libraries.storage.bba_store import CHANGE, BbaChangeFilter
+from libraries.storage.orderbook_store import OrderbookBlockWriter
+from libraries.storage.tick_store import TickStoreWriter
+from libraries.runtime import performance
 
 DB_DIR = "output"
 DB_PATH = os.path.join(DB_DIR, "arb_data.db")
-conn = sqlite3.connect(DB_PATH)
-conn.execute("PRAGMA journal_mode=WAL;")
-cursor = conn.cursor()
+DEFAULT_PAIRS = ["BTT-USDT", "XEC-USDT", "PENDLE-USDT"]
 
-cursor.executescript("""
+SCHEMA = """
 CREATE TABLE IF NOT EXISTS bba (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
   ts TEXT NOT NULL,
@@ -19,7 +30,8 @@ CREATE TABLE IF NOT EXISTS bba (
   best_bid_price REAL NOT NULL,
   best_bid_size REAL NOT NULL,
   best_ask_price REAL NOT NULL,
-  best_ask_size REAL NOT NULL
+  best_ask_size REAL NOT NULL,
+  kind TEXT NOT NULL DEFAULT 'change'  -- 'change' or 'snapshot', see libraries/storage/bba_store.py
 );
 
 CREATE TABLE IF NOT EXISTS trades (
@@ -40,71 +52,340 @@ CREATE TABLE IF NOT EXISTS orderbook (
   bids TEXT NOT NULL,
   asks TEXT NOT NULL
 );
-""")
-conn.commit()
 
-async def consume_bba(queue, exchange):
+-- Depth history as blocks: a keyframe plus per-update level deltas, zlib-compressed JSON (see libraries/storage/orderbook_store.py).
+-- The (exchange, market, start_ts) index maps a time to the block holding its keyframe.
+CREATE TABLE IF NOT EXISTS orderbook_blocks (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  exchange TEXT NOT NULL,
+  market TEXT NOT NULL,
+  start_ts TEXT NOT NULL,
+  end_ts TEXT NOT NULL,
+  updates INTEGER NOT NULL,
+  data BLOB NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS orderbook_blocks_market_start ON orderbook_blocks (exchange, market, start_ts);
+
+-- OHLCV and spread bars built from the rows above; start_ts is epoch seconds, resolution is seconds per bar
+CREATE TABLE IF NOT EXISTS bars (
+  exchange TEXT NOT NULL,
+  market TEXT NOT NULL,
+  resolution INTEGER NOT NULL,
+  start_ts INTEGER NOT NULL,
+  open REAL,
+  high REAL,
+  low REAL,
+  close REAL,
+  volume REAL NOT NULL,
+  quote_volume REAL NOT NULL,
+  trades INTEGER NOT NULL,
+  buy_volume REAL NOT NULL,
+  mid_close REAL,
+  spread_mean_bps REAL,
+  spread_max_bps REAL,
+  bba_updates INTEGER NOT NULL,
+  PRIMARY KEY (exchange, market, resolution, start_ts)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS gaps (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  exchange TEXT NOT NULL,
+  market TEXT NOT NULL,
+  started_at TEXT NOT NULL,
+  ended_at TEXT NOT NULL,
+  reason TEXT NOT NULL
+);
+"""
+
+# Applied after SCHEMA so databases created before these existed pick them up
+MIGRATIONS = [
+  ("bba", "kind", "ALTER TABLE bba ADD COLUMN kind TEXT NOT NULL DEFAULT 'change'"),
+]
+INDEXES = """
+CREATE INDEX IF NOT EXISTS bba_market_ts ON bba (exchange, market, ts);
+"""
+
+def open_db(path: str = DB_PATH) -> sqlite3.Connection:
+  conn = sqlite3.connect(path)
+  conn.execute("PRAGMA journal_mode=WAL;")
+  conn.executescript(SCHEMA)
+  for table, column, ddl in MIGRATIONS:
+    if column not in {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}:
+      conn.execute(ddl)
+  conn.executescript(INDEXES)
+  conn.commit()
+  return conn
+
+def insert_bba(cursor: sqlite3.Cursor, bba, exchange: str, kind: str = CHANGE):
+  cursor.execute(
+    """
+    INSERT INTO bba (ts, exchange, market, best_bid_price, best_bid_size, best_ask_price, best_ask_size, kind)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    (bba.ts.isoformat(), exchange, bba.market, bba.best_bid_price, bba.best_bid_size, bba.best_ask_price, bba.best_ask_size, kind)
+  )
+
+def insert_trade(cursor: sqlite3.Cursor, trade, exchange: str):
+  cursor.execute(
+    """
+    INSERT INTO trades (ts, exchange, market, taker_side, price, amount)
+    VALUES (?, ?, ?, ?, ?, ?)
+    """,
+    (trade.ts.isoformat(), exchange, trade.market, trade.taker_side.name, trade.price, trade.amount)
+  )
+
+def insert_orderbook(cursor: sqlite3.Cursor, ob, exchange: str):
+  bids_json = json.dumps(ob.bids)  # List of (price, size)
+  asks_json = json.dumps(ob.asks)
+
+  cursor.execute(
+    """
+    INSERT INTO orderbook (ts, exchange, market, bids, asks)
+    VALUES (?, ?, ?, ?, ?)
+    """,
+    (ob.ts.isoformat(), exchange, ob.market, bids_json, asks_json)
+  )
+
+def insert_orderbook_blocks(cursor: sqlite3.Cursor, rows: list[tuple]):
+  cursor.executemany(
+    """
+    INSERT OR REPLACE INTO orderbook_blocks (exchange, market, start_ts, end_ts, updates, data)
+    VALUES (?, ?, ?, ?, ?, ?)
+    """,
+    rows
+  )
+
+def insert_bars(cursor: sqlite3.Cursor, rows: list[tuple]):
+  # A bar closed again after a restart replaces the partial one written before it
+  cursor.executemany(
+    """
+    INSERT OR REPLACE INTO bars (exchange, market, resolution, start_ts, open, high, low, close, volume, quote_volume, trades, buy_volume, mid_close, spread_mean_bps, spread_max_bps, bba_updates)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    rows
+  )
+
+async def consume_bba(
+  queue, exchange, conn: sqlite3.Connection, stats: FillStats | None = None, bars: BarBuilder | None = None, bba_filter: BbaChangeFilter | None = None,
+  ticks: TickStoreWriter | None = None,
+):
+  """Stores every BBA, or with bba_filter only changes plus periodic snapshots. Stats and bars see every update either way."""
+  cursor = conn.cursor()
   while True:
     bba = await queue.get()
-    cursor.execute(
-      """
-      INSERT INTO bba (ts, exchange, market, best_bid_price, best_bid_size, best_ask_price, best_ask_size)
-      VALUES (?, ?, ?, ?, ?, ?, ?)
-      """,
-      (bba.ts.isoformat(), exchange, bba.market, bba.best_bid_price, bba.best_bid_size, bba.best_ask_price, bba.best_ask_size)
-    )
-    conn.commit()
+    kind = bba_filter.classify(bba) if bba_filter else CHANGE
+    if kind:
+      insert_bba(cursor, bba, exchange, kind)
+      conn.commit()
+      if ticks:
+        ticks.on_bba(bba)
+    if stats:
+      stats.on_bba(bba)
+    if bars:
+      bars.on_bba(bba)
 
-async def consume_trades(queue, exchange):
+async def consume_trades(
+  queue, exchange, conn: sqlite3.Connection, stats: FillStats | None = None, bars: BarBuilder | None = None, ticks: TickStoreWriter | None = None
+):
+  cursor = conn.cursor()
   while True:
     trade = await queue.get()
-    cursor.execute(
-      """
-      INSERT INTO trades (ts, exchange, market, taker_side, price, amount)
-      VALUES (?, ?, ?, ?, ?, ?)
-      """,
-      (trade.ts.isoformat(), exchange, trade.market, trade.taker_side.name, trade.price, trade.amount)
-    )
+    insert_trade(cursor, trade, exchange)
     conn.commit()
+    if ticks:
+      ticks.on_trade(trade)
+    if stats:
+      stats.on_trade(trade)
+    if bars:
+      bars.on_trade(trade)
 
-import json
-
-async def consume_orderbook(queue, exchange):
+async def consume_orderbook(queue, exchange, conn: sqlite3.Connection, stats: FillStats | None = None, blocks: OrderbookBlockWriter | None = None):
+  """Stores every update as a full snapshot row, or with `blocks` hands it to the block writer (persisted by persist_orderbook_blocks)."""
+  cursor = conn.cursor()
   while True:
     ob = await queue.get()
+    if blocks:
+      blocks.append(ob)
+    else:
+      insert_orderbook(cursor, ob, exchange)
+      conn.commit()
+    if stats:
+      stats.on_orderbook(ob)
 
-    bids_json = json.dumps(ob.bids)  # List of (price, size)
-    asks_json = json.dumps(ob.asks)
+async def consume_gaps(queue, conn: sqlite3.Connection):
+  """Records closed outage windows so analysis can exclude them instead of reading them as quiet markets."""
+  while True:
+    gap = await queue.get()
+    if gap.is_open:
+      continue
 
-    cursor.execute(
+    conn.execute(
       """
-      INSERT INTO orderbook (ts, exchange, market, bids, asks)
+      INSERT INTO gaps (exchange, market, started_at, ended_at, reason)
       VALUES (?, ?, ?, ?, ?)
       """,
-      (ob.ts.isoformat(), exchange, ob.market, bids_json, asks_json)
+      (gap.exchange, gap.market, gap.started_at.isoformat(), gap.ended_at.isoformat(), gap.reason)
     )
     conn.commit()
 
 
+async def persist_bars(bars: BarBuilder, conn: sqlite3.Connection, interval: float = 1.0):
+  """Closes bars whose period has ended and writes every closed bar, one transaction per interval."""
+  cursor = conn.cursor()
+  while True:
+    await asyncio.sleep(interval)
+    bars.flush()
+    rows = bars.take_pending()
+    if rows:
+      insert_bars(cursor, rows)
+      conn.commit()
+
+async def persist_orderbook_blocks(blocks: OrderbookBlockWriter, conn: sqlite3.Connection, interval: float = 1.0):
+  """Writes closed depth blocks, closing one whose interval has passed on a quiet market."""
+  cursor = conn.cursor()
+  while True:
+    await asyncio.sleep(interval)
+    blocks.flush()
+    rows = blocks.take_pending()
+    if rows:
+      insert_orderbook_blocks(cursor, rows)
+      conn.commit()
+
+def flush_writers(
+  conn: sqlite3.Connection, stats: list[FillStats], bars: list[BarBuilder], blocks: list[OrderbookBlockWriter], ticks: list[TickStoreWriter]
+):
+  """Writes out everything the persist timers hadn't yet, open depth blocks and bars included, so a restart loses nothing buffered."""
+  cursor = conn.cursor()
+  for builder in bars:
+    builder.close()
+    rows = builder.take_pending()
+    if rows:
+      insert_bars(cursor, rows)
+  for writer in blocks:
+    writer.close()
+    rows = writer.take_pending()
+    if rows:
+      insert_orderbook_blocks(cursor, rows)
+  conn.commit()
+  for tick_writer in ticks:
+    try:
+      tick_writer.flush()
+    except OSError as e:
+      print(f"[ERROR] Failed to flush tick store for {tick_writer.market}: {e}")
+  for fill_stats in stats:
+    fill_stats.save_checkpoint()
+
 # Launch for one pair
-async def run_pair(pair: str):
-  feed = CoinexDataFeed(pair)
+async def run_pair(
+  pair: str, health_monitor: FeedHealthMonitor, conn: sqlite3.Connection, stats: FillStats | None = None, bars: BarBuilder | None = None,
+  bba_filter: BbaChangeFilter | None = None, blocks: OrderbookBlockWriter | None = None, ticks: TickStoreWriter | None = None,
+  ws_url: str = COINEX_WS,
+):
+  feed = CoinexDataFeed(pair, ws_url=ws_url)
+  health_monitor.register(feed.health, feed.topics)
   task1 = asyncio.create_task(feed.run())
-  task2 = asyncio.create_task(consume_bba(feed.bba_queue, exchange=feed.exchange))
-  task3 = asyncio.create_task(consume_trades(feed.trade_queue, exchange=feed.exchange))
-  task4 = asyncio.create_task(consume_orderbook(feed.orderbook_queue, exchange=feed.exchange))
-  return [task1, task2, task3, task4]
+  task2 = asyncio.create_task(consume_bba(feed.bba_queue, exchange=feed.exchange, conn=conn, stats=stats, bars=bars, bba_filter=bba_filter, ticks=ticks))
+  task3 = asyncio.create_task(consume_trades(feed.trade_queue, exchange=feed.exchange, conn=conn, stats=stats, bars=bars, ticks=ticks))
+  task4 = asyncio.create_task(consume_orderbook(feed.orderbook_queue, exchange=feed.exchange, conn=conn, stats=stats, blocks=blocks))
+  task5 = asyncio.create_task(consume_gaps(feed.gap_queue, conn=conn))
+  tasks = [task1, task2, task3, task4, task5]
+  if stats:
+    tasks.append(asyncio.create_task(stats.run_checkpoints()))
+  if bars:
+    tasks.append(asyncio.create_task(persist_bars(bars, conn)))
+  if blocks:
+    tasks.append(asyncio.create_task(persist_orderbook_blocks(blocks, conn)))
+  if ticks:
+    tasks.append(asyncio.create_task(ticks.run_flush()))
+  return tasks
 
 # Entry point: run all pairs forever
-async def main():
-  PAIRS = ["BTT-USDT", "XEC-USDT", "PENDLE-USDT"]
-  all_tasks = []
+async def main(
+  bba_mode: str = "changes", orderbook_mode: str = "blocks", tick_dir: str | None = None,
+  pairs: list[str] | None = None, ws_url: str = COINEX_WS, db_path: str = DB_PATH,
+):
+  PAIRS = pairs or DEFAULT_PAIRS
+  conn = open_db(db_path)
+  health_monitor = FeedHealthMonitor()
+  metrics_server = MetricsServer(port=9101)
+  metrics_server.add_route("/metrics", health_monitor.render_prometheus)
+  metrics_server.add_route("/latency", tracer.dump)
+
+  # Rolling fill stats per pair, resumed from the last checkpoint
+  fill_stats = {pair: FillStats(pair) for pair in PAIRS}
+  for stats in fill_stats.values():
+    stats.load_checkpoint()
+  metrics_server.add_route("/fill_stats", lambda: json.dumps({pair: s.snapshot() for pair, s in fill_stats.items()}, indent=2))
+
+  # 1s/1m/1h bars per pair, written to the bars table as they close
+  bar_builders = {pair: BarBuilder(pair) for pair in PAIRS}
+  metrics_server.add_route("/bars", lambda: json.dumps(
+    {pair: [asdict(bar) for bar in b.bars(60, limit=60)] for pair, b in bar_builders.items()}, indent=2, default=str
+  ))
+
+  # Depth history per pair as keyframe + delta blocks
+  block_writers = {pair: OrderbookBlockWriter(pair) for pair in PAIRS} if orderbook_mode == "blocks" else {}
+  metrics_server.add_route("/orderbook_blocks", lambda: json.dumps(
+    {pair: {"updates": w.updates, "stored_bytes": w.stored_bytes} for pair, w in block_writers.items()}, indent=2
+  ))
+
+  all_tasks = [asyncio.create_task(health_monitor.run()), asyncio.create_task(metrics_server.run())]
+  tick_writers = []
   for pair in PAIRS:
-    tasks = await run_pair(pair)
+    bba_filter = BbaChangeFilter() if bba_mode == "changes" else None
+    ticks = TickStoreWriter(pair, root=tick_dir) if tick_dir else None
+    if ticks:
+      tick_writers.append(ticks)
+    tasks = await run_pair(pair, health_monitor, conn, fill_stats[pair], bar_builders[pair], bba_filter, block_writers.get(pair), ticks, ws_url)
     all_tasks.extend(tasks)
 
-  # Run everything forever
-  await asyncio.gather(*all_tasks)
+  # A restart's SIGTERM cancels like Ctrl-C does, so both reach the flush below
+  asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+
+  # Run everything until cancelled, then write out what is still buffered
+  try:
+    await asyncio.gather(*all_tasks)
+  except asyncio.CancelledError:
+    # How SIGTERM and Ctrl-C stop the recorder, not an error
+    pass
+  finally:
+    for task in all_tasks:
+      task.cancel()
+    flush_writers(conn, list(fill_stats.values()), list(bar_builders.values()), list(block_writers.values()), tick_writers)
+    conn.close()
+    print("[INFO] Flushed bars, depth blocks and ticks on shutdown")
 
 if __name__ == "__main__":
-  asyncio.run(main())
+  # fromfile_prefix_chars lets a long pair list come from a file: --pairs @output/mock_exchanges/pairs.txt
+  parser = argparse.ArgumentParser(description="Record CoinEx market data to SQLite.", fromfile_prefix_chars="@")
+  parser.add_argument(
+    "--perf_mode", action="store_true",
+    help=f"Run on uvloop with a frozen, retuned GC (also enabled by {performance.PERF_MODE_ENV}=1)"
+  )
+  parser.add_argument(
+    "--bba_mode", choices=["changes", "all"], default="changes",
+    help="changes: store a BBA only when price or size moved, plus a snapshot every minute; all: every update (default: changes)"
+  )
+  parser.add_argument(
+    "--orderbook_mode", choices=["blocks", "snapshots"], default="blocks",
+    help="blocks: depth as keyframes plus level deltas in orderbook_blocks; snapshots: a full JSON row per update in orderbook (default: blocks)"
+  )
+  parser.add_argument(
+    "--tick_dir", default=None,
+    help="Also append BBA and trades to a memory-mapped tick store under this directory for research, e.g. output/ticks"
+  )
+  parser.add_argument(
+    "--pairs", nargs="+", default=DEFAULT_PAIRS,
+    help=f"Pairs to record, one feed each (default: {' '.join(DEFAULT_PAIRS)})"
+  )
+  parser.add_argument(
+    "--coinex_ws_url", default=COINEX_WS,
+    help=f"CoinEx websocket to record from, e.g. a local mock_exchanges.launch (default: {COINEX_WS})"
+  )
+  parser.add_argument("--db", default=DB_PATH, help=f"SQLite database to record to (default: {DB_PATH})")
+  args = parser.parse_args()
+
+  performance.run(
+    main(args.bba_mode, args.orderbook_mode, args.tick_dir, args.pairs, args.coinex_ws_url, args.db),
+    perf_mode=performance.perf_mode_requested(args.perf_mode),
+  )
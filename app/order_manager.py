@@ -1,19 +1,56 @@
 import asyncio
+import json
 import os
+import signal
 from dotenv import load_dotenv
 import argparse
 
-from libraries.data_ingestion.coinex_data_feed import CoinexDataFeed
-from libraries.data_ingestion.mexc_data_feed import MexcDataFeed
+from libraries.analytics.fill_stats import FillStats
+from libraries.analytics.queue_model import QueueModel
+from libraries.data_ingestion.coinex_data_feed import COINEX_WS, CoinexDataFeed
+from libraries.data_ingestion.coinex_private_feed import CoinexPrivateFeed
+from libraries.data_ingestion.fan_out import Backpressure
+from libraries.data_ingestion.mexc_data_feed import MEXC_WS, MexcDataFeed
 from libraries.order_management.chase_bba import ChaseBBA
-from libraries.exchange_clients.coinex_exchange_client import CoinexExchangeClient
+from libraries.order_management.ladder_planner import LadderPlanner
+from libraries.portfolio.position_tracker import POSITIONS_DIR, PositionTracker
+from libraries.order_management.local_order_manager import LocalOrderManager
+from libraries.exchange_clients.coinex_exchange_client import COINEX_HTTP, CoinexExchangeClient
+from libraries.exchange_clients.coinex_request_scheduler import CoinexRequestScheduler
+from libraries.exchange_clients.mexc_exchange_client import MEXC_HTTP, MexcExchangeClient
+from libraries.order_management.hedger import Hedger
+from libraries.monitoring.feed_health import FeedHealthMonitor
+from libraries.monitoring.metrics_server import MetricsServer
+from libraries.monitoring.latency_tracer import tracer
+from libraries.runtime import performance
+from libraries.universe.pair_universe import CACHE_DIR, PairUniverse
 
 load_dotenv()
 
-async def main(pair: str, amount_usd: float, minimum_bps_threshold: float):
+async def main(
+  pair: str, amount_usd: float, minimum_bps_threshold: float, metrics_port: int, hedge: bool = False,
+  coinex_ws_url: str = COINEX_WS, mexc_ws_url: str = MEXC_WS, coinex_http_url: str = COINEX_HTTP, mexc_http_url: str = MEXC_HTTP,
+):
+  # only chase pairs that actually trade on both exchanges, and quote in their increments;
+  # metadata from other endpoints (a local mock) is cached apart so it never replaces the real listings
+  live = coinex_http_url == COINEX_HTTP and mexc_http_url == MEXC_HTTP
+  universe = PairUniverse(CACHE_DIR if live else os.path.join(CACHE_DIR, "local"), coinex_url=coinex_http_url, mexc_url=mexc_http_url)
+  if pair not in await asyncio.to_thread(universe.tradable_pairs):
+    print(f"{pair} is not trading on both CoinEx and MEXC")
+    return
+  market_info = universe.market("CoinEx", pair)
+
   # instantiate feeds
-  coinex_feed = CoinexDataFeed(pair)
-  mexc_feed  = MexcDataFeed(pair)
+  coinex_feed = CoinexDataFeed(pair, price_precision=market_info.price_precision if market_info else None, ws_url=coinex_ws_url)
+  mexc_feed  = MexcDataFeed(pair, ws_url=mexc_ws_url)
+
+  health_monitor = FeedHealthMonitor()
+  health_monitor.register(coinex_feed.health, coinex_feed.topics)
+  health_monitor.register(mexc_feed.health, mexc_feed.topics)
+  metrics_server = MetricsServer(port=metrics_port)
+  metrics_server.add_route("/latency", tracer.dump)
+  # `kill -USR1 <pid>` prints the latency histograms without stopping the process
+  asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, lambda: print(tracer.dump()))
 
   # schedule them
   task1 = asyncio.create_task(coinex_feed.run())
@@ -25,14 +62,62 @@ async def main(pair: str, amount_usd: float, minimum_bps_threshold: float):
     print("Access id or secret key for exchange client is incorrect")
     return
 
-  coinex_exchange_client = CoinexExchangeClient(access_id, secret_key)
+  coinex_exchange_client = CoinexExchangeClient(access_id, secret_key, coinex_http_url)
+  scheduler = CoinexRequestScheduler(coinex_exchange_client)
+  metrics_server.add_route("/metrics", lambda: health_monitor.render_prometheus() + scheduler.render_prometheus())
+
+  # local order state, fed by our private order stream and reconciled against REST
+  private_feed = CoinexPrivateFeed(pair, access_id, secret_key, ws_url=coinex_ws_url)
+  health_monitor.register(private_feed.health, private_feed.topics)
+  local_orders = LocalOrderManager()
+  task6 = asyncio.create_task(private_feed.run())
+  task7 = asyncio.create_task(local_orders.consume_order_updates(private_feed.order_update_queue))
+  task8 = asyncio.create_task(local_orders.run_reconciliation(scheduler, [pair]))
+  task9 = asyncio.create_task(local_orders.consume_gaps(private_feed.gap_queue, scheduler))
+
+  # rolling fill stats for the pair; checkpoints go to their own directory so they don't race the recorder's
+  fill_stats = FillStats(pair, checkpoint_dir=os.path.join("output", "fill_stats", "order_manager"))
+  fill_stats.load_checkpoint()
+  task10 = asyncio.create_task(fill_stats.run_checkpoints())
+
+  # inventory and PnL from our fills, marked to the MEXC book; one checkpoint file per pair process
+  positions = PositionTracker(os.path.join(POSITIONS_DIR, f"{pair.replace('-', '')}.json"))
+  positions.load_checkpoint()
+  local_orders.subscribe_fills(positions.on_fill)
+  task11 = asyncio.create_task(positions.consume_bba(mexc_feed.subscribe("bba", "positions")))
+  task12 = asyncio.create_task(positions.run_checkpoints())
+  metrics_server.add_route("/positions", lambda: json.dumps(positions.snapshot(), indent=2))
+
+  # sell every CoinEx fill on MEXC as it lands, batched up to MEXC's minimum notional
+  hedge_tasks = []
+  if hedge:
+    mexc_access_key = os.getenv('MEXC_ACCESS_KEY')
+    mexc_secret_key = os.getenv('MEXC_SECRET_KEY')
+    if not mexc_access_key or not mexc_secret_key:
+      print("Access key or secret key for the MEXC client is missing, can't hedge")
+      return
+    hedger = Hedger(pair, MexcExchangeClient(mexc_access_key, mexc_secret_key, mexc_http_url), universe.market("MexC", pair), positions)
+    local_orders.subscribe_fills(hedger.on_fill)
+    hedge_tasks = [
+      asyncio.create_task(hedger.consume_bba(mexc_feed.subscribe("bba", "hedger", Backpressure.LATEST))),
+      asyncio.create_task(hedger.run()),
+    ]
+    metrics_server.add_route("/hedger", lambda: json.dumps(hedger.snapshot(), indent=2))
+
+  # queue / fill-time model fitted offline by analysis/fit_queue_model.py, if one has been
+  queue_model = QueueModel.load(pair)
+  if queue_model:
+    print(f"Loaded queue model for {pair} fitted at {queue_model.fitted_at}")
+  planner = LadderPlanner(market_info=market_info, queue_model=queue_model)
 
   # schedule your manager
-  order_manager = ChaseBBA(pair, minimum_bps_threshold, coinex_feed, mexc_feed, coinex_exchange_client)
+  order_manager = ChaseBBA(pair, minimum_bps_threshold, coinex_feed, mexc_feed, coinex_exchange_client, health_monitor, local_orders, scheduler, planner, fill_stats=fill_stats, market_info=market_info)
   task3 = asyncio.create_task(order_manager.run(amount_usd))
+  task4 = asyncio.create_task(health_monitor.run())
+  task5 = asyncio.create_task(metrics_server.run())
 
   # wait forever (or until one task ends)
-  await asyncio.gather(task1, task2, task3)
+  await asyncio.gather(task1, task2, task3, task4, task5, task6, task7, task8, task9, task10, task11, task12, *hedge_tasks)
 
 
 if __name__ == "__main__":
@@ -43,7 +128,41 @@ if __name__ == "__main__":
     "--minimum_bps_threshold", type=float, default=30,
     help="Minimum Arb bps spread to place orders (default: 30)"
   )
+  parser.add_argument(
+    "--metrics_port", type=int, default=9100,
+    help="Local port serving feed health and REST scheduler stats at /metrics, latency histograms at /latency and inventory/PnL at /positions (default: 9100)"
+  )
+  parser.add_argument(
+    "--hedge", action="store_true",
+    help="Sell CoinEx fills on MEXC as they arrive (needs MEXC_ACCESS_KEY and MEXC_SECRET_KEY)"
+  )
+  parser.add_argument(
+    "--coinex_ws_url", type=str, default=COINEX_WS,
+    help=f"CoinEx websocket for market data and our order updates, e.g. a local mock_exchanges.launch (default: {COINEX_WS})"
+  )
+  parser.add_argument(
+    "--mexc_ws_url", type=str, default=MEXC_WS,
+    help=f"MEXC websocket for market data (default: {MEXC_WS})"
+  )
+  parser.add_argument(
+    "--coinex_http_url", type=str, default=COINEX_HTTP,
+    help=f"CoinEx REST endpoint for orders and market metadata (default: {COINEX_HTTP})"
+  )
+  parser.add_argument(
+    "--mexc_http_url", type=str, default=MEXC_HTTP,
+    help=f"MEXC REST endpoint for market metadata and the hedger's orders, e.g. a local mock_exchanges.mexc_rest (default: {MEXC_HTTP})"
+  )
+  parser.add_argument(
+    "--perf_mode", action="store_true",
+    help=f"Run on uvloop with a frozen, retuned GC (also enabled by {performance.PERF_MODE_ENV}=1)"
+  )
 
   args = parser.parse_args()
 
-  asyncio.run(main(args.pair, args.amount_usd, args.minimum_bps_threshold))
+  performance.run(
+    main(
+      args.pair, args.amount_usd, args.minimum_bps_threshold, args.metrics_port, args.hedge,
+      args.coinex_ws_url, args.mexc_ws_url, args.coinex_http_url, args.mexc_http_url,
+    ),
+    perf_mode=performance.perf_mode_requested(args.perf_mode),
+  )
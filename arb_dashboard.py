@@ -2,12 +2,17 @@ import streamlit as st
 import asyncio
 import threading
 from streamlit_autorefresh import st_autorefresh
-import pandas as pd
-import requests
+from typing import TYPE_CHECKING
 
+from libraries.analytics.fill_stats import load_snapshot
 from libraries.data_ingestion.coinex_data_feed import CoinexDataFeed
 from libraries.data_ingestion.mexc_data_feed import MexcDataFeed
 from libraries.models.bba import BBA
+from libraries.runtime import performance
+from libraries.universe.pair_universe import PairUniverse
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # --- Configuration ---
 DEFAULT_PAIRS = 300
@@ -15,23 +20,20 @@ LOWER_LIMIT = 0
 UPPER_LIMIT = 150
 REFRESH_MS = 1000  # Autorefresh interval in milliseconds
 
-# Fetch top USDT pairs by volume
+# Top USDT pairs by CoinEx volume that also trade on MEXC (metadata cached on disk, see PairUniverse)
 @st.cache_data(show_spinner=False)
 def fetch_assets_coinex(num_assets: int = DEFAULT_PAIRS) -> list[str]:
-    url = "https://api.coinex.com/v2/spot/ticker"
-    resp = requests.get(url)
-    resp.raise_for_status()
-    tickers = resp.json().get("data", [])
-    usdt = [t for t in tickers if t["market"].endswith("USDT")]
-    usdt.sort(key=lambda t: float(t["value"]), reverse=True)
-    return [f"{t['market'][:-4]}-USDT" for t in usdt[:num_assets]][LOWER_LIMIT:UPPER_LIMIT]
+    pairs = PairUniverse().tradable_pairs(quote="USDT")
+    return pairs[:num_assets][LOWER_LIMIT:UPPER_LIMIT]
 
 # Singleton state and background initialization
 @st.cache_resource
 def init_feeds(pairs: list[str]):
     # Shared state across reruns
     state: dict[str, dict[str, float]] = {pair: {} for pair in pairs}
-    loop = asyncio.new_event_loop()
+    # Set SPOT_ARB_PERF_MODE=1 before `streamlit run` to drive the feeds on uvloop with a tuned GC
+    perf_mode = performance.perf_mode_requested()
+    loop = performance.new_event_loop(perf_mode)
     threading.Thread(target=loop.run_forever, daemon=True).start()
 
     async def update_state_loop(pair: str, coinex_feed: CoinexDataFeed, mexc_feed: MexcDataFeed):
@@ -46,14 +48,12 @@ def init_feeds(pairs: list[str]):
                 state[pair]["illiquid_bid"] = bba.best_bid_price
                 state[pair]["illiquid_ask"] = bba.best_ask_price
 
-        # MexC poll consumer
+        # MexC queue consumer
         async def mexc_consumer():
             while True:
-                await asyncio.sleep(0.2)
-                bba = mexc_feed.bba
-                if bba:
-                    state[pair]["liquid_bid"] = bba.best_bid_price
-                    state[pair]["liquid_ask"] = bba.best_ask_price
+                bba: BBA = await mexc_feed.bba_queue.get()
+                state[pair]["liquid_bid"] = bba.best_bid_price
+                state[pair]["liquid_ask"] = bba.best_ask_price
 
         await asyncio.gather(coinex_consumer(), mexc_consumer())
 
@@ -66,10 +66,26 @@ def init_feeds(pairs: list[str]):
             update_state_loop(pair, coinex_feed, mexc_feed), loop
         )
 
+    if perf_mode:
+        loop.call_soon_threadsafe(loop.call_later, performance.STARTUP_SETTLE_SECONDS, performance.tune_gc)
+
     return state
 
+# Rolling taker-sell fill USD from the recorder's fill stats checkpoints (pairs it doesn't record are blank)
+@st.cache_data(ttl=30, show_spinner=False)
+def load_fill_usd(pairs: list[str]) -> dict[str, float | None]:
+    fills: dict[str, float | None] = {}
+    for pair in pairs:
+        snapshot = load_snapshot(pair)
+        fills[pair] = snapshot["total_usd_filled"] if snapshot else None
+    return fills
+
 # Build DataFrame from state
-def build_dataframe(state: dict[str, dict[str, float]]) -> pd.DataFrame:
+def build_dataframe(state: dict[str, dict[str, float]]) -> "pd.DataFrame":
+    # pandas is only needed once there's a table to draw, so it stays off the startup path
+    import pandas as pd
+
+    fills = load_fill_usd(list(state))
     records = []
     for pair, vals in state.items():
         ib = vals.get("illiquid_bid")
@@ -87,6 +103,7 @@ def build_dataframe(state: dict[str, dict[str, float]]) -> pd.DataFrame:
                 "Liq Bid": lb,
                 "Arb (bps)": arb_bps,
                 "Taker (bps)": taker_bps,
+                "Fill USD (24h)": fills.get(pair),
             })
         else:
             records.append({
@@ -97,6 +114,7 @@ def build_dataframe(state: dict[str, dict[str, float]]) -> pd.DataFrame:
                 "Liq Bid": None,
                 "Arb (bps)": None,
                 "Taker (bps)": None,
+                "Fill USD (24h)": fills.get(pair),
             })
     df = pd.DataFrame(records)
     return df
@@ -0,0 +1,125 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import random
+import time
+
+from benchmarks.harness import BenchResult, latency_result, time_each
+from libraries.exchange_clients.coinex_exchange_client import CoinexExchangeClient
+from libraries.exchange_clients.coinex_request_scheduler import ENDPOINT_LIMITS, CoinexRequestScheduler, Priority
+from libraries.monitoring.latency_tracer import tracer
+from libraries.models.coinex_place_order_request import CoinexPlaceOrderRequest
+
+SUITE = "client"
+
+def _legacy_prepare(access_id: str, secret_key: str, req: CoinexPlaceOrderRequest) -> tuple[str, dict]:
+  """The per-order work CoinexExchangeClient did before prepared requests, kept as the baseline."""
+  ts = str(int(time.time() * 1000))
+  body = {
+    "market": req.market.replace("-", ""),
+    "market_type": req.market_type,
+    "side": req.side,
+    "type": req.type,
+    "amount": req.amount,
+    "price": req.price,
+  }
+  if req.is_hide:
+    body["is_hide"] = True  # type: ignore
+  body_str = json.dumps(body, separators=(",", ":"))
+  to_sign = "POST" + "/v2/spot/order" + body_str + ts
+  signature = hmac.new(secret_key.encode("latin-1"), msg=to_sign.encode("latin-1"), digestmod=hashlib.sha256).hexdigest().lower()
+  headers = {
+    "X-COINEX-KEY": access_id,
+    "X-COINEX-SIGN": signature,
+    "X-COINEX-TIMESTAMP": ts,
+    "Content-Type": "application/json",
+  }
+  return body_str, headers
+
+def _requests(n: int, markets: int) -> list[CoinexPlaceOrderRequest]:
+  rng = random.Random(7)
+  names = [f"COIN{i}USDT" for i in range(markets)]
+  return [
+    CoinexPlaceOrderRequest(
+      market = rng.choice(names),
+      side = "buy",
+      amount = f"{rng.uniform(1e3, 1e6):.2f}",
+      price = f"{rng.uniform(1e-5, 1e-4):.10f}",
+      is_hide = rng.random() < 0.5,
+    )
+    for _ in range(n)
+  ]
+
+class _PacedClient:
+  """Stands in for the REST client: each call blocks like a round trip and is timestamped for rate checks."""
+  def __init__(self, rtt_seconds: float):
+    self.rtt_seconds = rtt_seconds
+    self.sent_at: list[float] = []
+
+  def call(self, _):
+    self.sent_at.append(time.monotonic())
+    time.sleep(self.rtt_seconds)
+
+def _max_per_second(stamps: list[float]) -> int:
+  """Most calls inside any sliding one second window."""
+  best, lo = 0, 0
+  for hi, t in enumerate(stamps):
+    while t - stamps[lo] >= 1.0:
+      lo += 1
+    best = max(best, hi - lo + 1)
+  return best
+
+async def _scheduler_throughput(seconds: float) -> BenchResult:
+  """Offers twice the place budget for `seconds` and measures how close the scheduler runs to its limit."""
+  rate, _ = ENDPOINT_LIMITS["place"]
+  client = _PacedClient(rtt_seconds=0.02)
+  scheduler = CoinexRequestScheduler(CoinexExchangeClient("bench", "bench"))
+  tracer.reset()
+
+  n = int(rate * seconds * 2)
+  start = time.perf_counter()
+  futures = [scheduler.submit("place", Priority.PLACE, client.call, i) for i in range(n)]
+  deadline = start + seconds
+  done = 0
+  for future in futures:
+    remaining = deadline - time.perf_counter()
+    if remaining <= 0:
+      break
+    try:
+      await asyncio.wait_for(asyncio.shield(future), remaining)
+      done += 1
+    except TimeoutError:
+      break
+  elapsed = time.perf_counter() - start
+  for future in futures:
+    future.cancel()
+
+  wait = tracer.snapshot().get("coinex_sched.queue_wait place", {})
+  return BenchResult(
+    suite = SUITE,
+    name = "scheduler_place_throughput",
+    shape = f"{n}_offered",
+    ops = done,
+    seconds = elapsed,
+    ops_per_sec = done / elapsed,
+    extra = {"limit_per_sec": rate, "max_in_any_second": _max_per_second(client.sent_at), "queue_wait": wait},
+  )
+
+def run(quick: bool = False) -> list[BenchResult]:
+  n = 20_000 if quick else 200_000
+  access_id, secret_key = "bench-access-id", "bench-secret-key-0123456789abcdef"
+  results = []
+  for markets in (1, 50):
+    reqs = _requests(n, markets)
+    shape = f"{markets}_markets"
+
+    seconds, histogram = time_each(lambda i: _legacy_prepare(access_id, secret_key, reqs[i]), n)
+    results.append(latency_result(SUITE, "place_order_prepare_legacy", shape, n, seconds, histogram))
+
+    client = CoinexExchangeClient(access_id, secret_key)
+    seconds, histogram = time_each(lambda i: client.prepare_order(reqs[i]), n)
+    results.append(latency_result(SUITE, "place_order_prepare", shape, n, seconds, histogram))
+
+  results.append(asyncio.run(_scheduler_throughput(2.0 if quick else 10.0)))
+  return results
@@ -0,0 +1,74 @@
+import subprocess
+import sys
+
+from benchmarks.harness import BenchResult
+
+SUITE = "import_time"
+
+# Entry points a restart or a new container has to import before it can do anything
+ENTRY_MODULES = [
+  "libraries.data_ingestion.coinex_data_feed",
+  "libraries.data_ingestion.mexc_data_feed",
+  "libraries.order_management.chase_bba",
+  "app.data_ingestion_orchestrator",
+  "app.order_manager",
+  "analysis.cli",
+  "arb_dashboard",
+]
+# Heavy packages that should only load when a code path actually uses them
+HEAVY_PACKAGES = ("google.protobuf", "pandas", "matplotlib", "numpy", "requests", "streamlit")
+# Entry points that must not pull a heavy package in at import time
+MUST_STAY_LAZY = {
+  "libraries.data_ingestion.coinex_data_feed": ("google.protobuf", "pandas", "requests"),
+  "libraries.data_ingestion.mexc_data_feed": ("google.protobuf", "pandas"),
+  "app.data_ingestion_orchestrator": ("google.protobuf", "pandas", "requests", "numpy"),
+  "analysis.cli": ("pandas", "matplotlib"),
+}
+
+def _import_once(module: str) -> tuple[int, set[str]] | None:
+  """
+  Cold import of `module` in a fresh interpreter, as (cumulative microseconds, modules loaded),
+  from the interpreter's own -X importtime report. None if the module can't be imported here.
+  """
+  proc = subprocess.run(
+    [sys.executable, "-X", "importtime", "-W", "ignore", "-c", f"import {module}"],
+    capture_output=True, text=True,
+  )
+  if proc.returncode != 0:
+    return None
+
+  total_us = 0
+  loaded = set()
+  for line in proc.stderr.splitlines():
+    if not line.startswith("import time:") or "|" not in line:
+      continue
+    _, cumulative, name = line[len("import time:"):].split("|")
+    if not cumulative.strip().isdigit():
+      continue  # header line
+    loaded.add(name.strip())
+    if name.strip() == module:
+      total_us = int(cumulative)
+  return total_us, loaded
+
+def run(quick: bool = False) -> list[BenchResult]:
+  repeat = 3 if quick else 10
+  results = []
+  for module in ENTRY_MODULES:
+    runs = [_import_once(module) for _ in range(repeat)]
+    if any(r is None for r in runs):
+      print(f"[BENCH] Skipping {module}: not importable in this environment")
+      continue
+
+    best_us = min(r[0] for r in runs)  # type: ignore[index]
+    loaded = runs[0][1]  # type: ignore[index]
+    heavy = sorted(p for p in HEAVY_PACKAGES if p in loaded)
+    leaked = sorted(p for p in MUST_STAY_LAZY.get(module, ()) if p in loaded)
+    if leaked:
+      print(f"[BENCH] {module} imports {', '.join(leaked)} at startup, which should load lazily")
+
+    results.append(BenchResult(
+      SUITE, "cold_import", module, repeat, best_us * repeat / 1e6, 1e6 / best_us if best_us else 0.0,
+      p50_us = float(best_us),
+      extra = {"heavy_packages": heavy, "leaked_lazy_imports": leaked, "modules_loaded": len(loaded)},
+    ))
+  return results
@@ -0,0 +1,71 @@
+import asyncio
+
+from benchmarks.harness import BenchResult, throughput_result, time_batch_async
+from libraries.data_ingestion.fan_out import Topic
+from libraries.models.bba import BBA
+from datetime import datetime, timezone
+
+SUITE = "queue"
+
+def _items(n: int) -> list[BBA]:
+  ts = datetime.now(tz=timezone.utc)
+  return [BBA(ts, "XECUSDT", 0.00002, 1e8, 0.0000201, 1e8) for _ in range(n)]
+
+async def _producer_consumer(items: list[BBA], maxsize: int):
+  """One producer and one consumer task, the shape every feed -> consumer pair has today."""
+  queue: asyncio.Queue[BBA] = asyncio.Queue(maxsize=maxsize)
+
+  async def consume():
+    for _ in range(len(items)):
+      await queue.get()
+
+  consumer = asyncio.create_task(consume())
+  for item in items:
+    await queue.put(item)
+  await consumer
+
+async def _nowait_burst(items: list[BBA]):
+  """Producer publishes a whole frame's worth before yielding, consumer drains with get_nowait."""
+  queue: asyncio.Queue[BBA] = asyncio.Queue()
+  for start in range(0, len(items), 100):
+    for item in items[start:start + 100]:
+      queue.put_nowait(item)
+    while not queue.empty():
+      queue.get_nowait()
+
+async def _fan_out(items: list[BBA], subscribers: int):
+  """One feed topic, several consumer tasks each reading every item through its own cursor."""
+  topic: Topic[BBA] = Topic("bench", capacity=len(items))
+
+  async def consume(name: str):
+    subscription = topic.subscribe(name)
+    for _ in range(len(items)):
+      await subscription.get()
+
+  consumers = [asyncio.create_task(consume(f"sub_{i}")) for i in range(subscribers)]
+  await asyncio.sleep(0)
+  for start in range(0, len(items), 100):
+    for item in items[start:start + 100]:
+      topic.publish(item)
+    await asyncio.sleep(0)
+  await asyncio.gather(*consumers)
+
+def run(quick: bool = False) -> list[BenchResult]:
+  n = 20_000 if quick else 200_000
+  items = _items(n)
+
+  async def main() -> list[BenchResult]:
+    results = []
+    for maxsize, shape in ((0, "unbounded"), (1000, "bounded_1000"), (1, "bounded_1")):
+      seconds = await time_batch_async(lambda: _producer_consumer(items, maxsize))
+      results.append(throughput_result(SUITE, "asyncio_queue_put_get", shape, n, seconds))
+
+    seconds = await time_batch_async(lambda: _nowait_burst(items))
+    results.append(throughput_result(SUITE, "asyncio_queue_nowait", "burst_100", n, seconds))
+
+    for subscribers in (1, 4):
+      seconds = await time_batch_async(lambda: _fan_out(items, subscribers))
+      results.append(throughput_result(SUITE, "topic_fan_out", f"subscribers_{subscribers}", n, seconds))
+    return results
+
+  return asyncio.run(main())
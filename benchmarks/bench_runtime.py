@@ -0,0 +1,112 @@
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+from collections import deque
+from dataclasses import asdict
+
+from benchmarks import synthetic
+from benchmarks.harness import BenchResult, latency_result, print_results
+from libraries.data_ingestion.coinex_data_feed import CoinexDataFeed
+from libraries.monitoring.latency_tracer import LatencyHistogram, tracer
+from libraries.runtime import performance
+
+SUITE = "runtime"
+# Objects consumers keep alive, like the dashboard state and rolling analytics windows.
+# This is what makes full collections expensive in the real processes.
+RETAINED_OBJECTS = 200_000
+
+def _frames(n: int) -> list[bytes]:
+  """Interleaved bbo / deals / depth frames, roughly the mix one busy CoinEx market produces."""
+  bbo = synthetic.coinex_bbo_frames(n)
+  deals = synthetic.coinex_deals_frames(n // 2, 5)
+  depth = synthetic.coinex_depth_frames(n // 2, 5)
+  frames = []
+  for i in range(n):
+    frames.append(bbo[i])
+    if i % 2 == 0:
+      frames.append(deals[i // 2])
+      frames.append(depth[i // 2])
+  return frames
+
+async def _replay(frames: list[bytes], bba_count: int) -> tuple[float, LatencyHistogram]:
+  """Feeds frames through decode and publish, measuring frame receive to consumer pickup for every BBA."""
+  feed = CoinexDataFeed("XEC-USDT")
+  histogram = LatencyHistogram()
+  retained: deque = deque(maxlen=RETAINED_OBJECTS)
+
+  async def consume_bba():
+    for _ in range(bba_count):
+      bba = await feed.bba_queue.get()
+      histogram.record(time.perf_counter_ns() - bba.recv_ns)
+      retained.append(bba)
+
+  async def consume(queue):
+    while True:
+      retained.append(await queue.get())
+
+  others = [asyncio.create_task(consume(feed.trade_queue)), asyncio.create_task(consume(feed.orderbook_queue))]
+  consumer = asyncio.create_task(consume_bba())
+
+  started = time.perf_counter()
+  for i, raw in enumerate(frames):
+    recv_ns = time.perf_counter_ns()
+    await feed._dispatch(feed._decode(raw), recv_ns)
+    # Yield like a socket read would every few frames so consumers interleave with the producer
+    if i % 8 == 0:
+      await asyncio.sleep(0)
+  await consumer
+  seconds = time.perf_counter() - started
+
+  for task in others:
+    task.cancel()
+  return seconds, histogram
+
+def _child(mode: str, n: int):
+  perf_mode = mode == "perf"
+  performance.trace_gc_pauses()
+  frames = _frames(n)
+  if perf_mode:
+    # Frames, feed modules and protobuf descriptors now exist, the equivalent of startup having settled
+    performance.tune_gc()
+
+  with asyncio.Runner(loop_factory=lambda: performance.new_event_loop(perf_mode)) as runner:
+    seconds, histogram = runner.run(_replay(frames, n))
+
+  gc_pauses = {stage: s["count"] for stage, s in tracer.snapshot().items() if stage.startswith("gc.")}
+  gc_max_us = max((s["max_us"] for stage, s in tracer.snapshot().items() if stage.startswith("gc.")), default=0.0)
+  loop_name = "uvloop" if perf_mode and "uvloop" in sys.modules else "asyncio"
+  result = latency_result(
+    SUITE, "bba_recv_to_consumer", mode, n, seconds, histogram,
+    loop=loop_name, max_us=histogram.max_ns / 1e3, gc_collections=gc_pauses, gc_max_pause_us=gc_max_us,
+  )
+  print(json.dumps(asdict(result)))
+
+def run(quick: bool = False) -> list[BenchResult]:
+  """Runs default and perf modes in separate processes, since the loop policy and GC state are process-wide."""
+  n = 20_000 if quick else 200_000
+  results = []
+  for mode in ("default", "perf"):
+    out = subprocess.run(
+      [sys.executable, "-m", "benchmarks.bench_runtime", "--child", mode, "--n", str(n)],
+      capture_output=True, text=True, check=True,
+    ).stdout
+    results.append(BenchResult(**json.loads(out.strip().splitlines()[-1])))
+  return results
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Tail latency of replayed feed load with and without the performance runtime.")
+  parser.add_argument("--child", type=str, choices=["default", "perf"], default=None, help=argparse.SUPPRESS)
+  parser.add_argument("--n", type=int, default=200_000, help="BBA frames to replay")
+  parser.add_argument("--quick", action="store_true")
+  args = parser.parse_args()
+
+  if args.child:
+    _child(args.child, args.n)
+  else:
+    results = run(args.quick)
+    print_results(results)
+    for r in results:
+      print(f"{r.shape:<8} p99.9 {r.p999_us:.1f}us  max {r.extra['max_us']:.1f}us  loop {r.extra['loop']}  gc {r.extra['gc_collections']}")
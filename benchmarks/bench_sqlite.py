@@ -0,0 +1,165 @@
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from app.data_ingestion_orchestrator import open_db, insert_bba, insert_trade, insert_orderbook, insert_orderbook_blocks
+from benchmarks.harness import BenchResult, throughput_result, time_batch
+from libraries.models.bba import BBA
+from libraries.models.orderbook import Orderbook
+from libraries.models.side import Side
+from libraries.models.trade import Trade
+from libraries.storage.bba_store import BbaChangeFilter
+from libraries.storage.orderbook_store import OrderbookBlockWriter, OrderbookHistory
+
+SUITE = "sqlite_insert"
+
+def _bbas(n: int, rng: random.Random) -> list[BBA]:
+  start = datetime.now(tz=timezone.utc)
+  return [
+    BBA(start + timedelta(milliseconds=i), "XECUSDT", rng.uniform(1, 2), rng.uniform(1, 1e6), rng.uniform(2, 3), rng.uniform(1, 1e6))
+    for i in range(n)
+  ]
+
+def _quiet_bbas(n: int, rng: random.Random, change_prob: float = 0.1) -> list[BBA]:
+  """BBA pushes as CoinEx sends them for a quiet pair: most repeat the previous quote unchanged."""
+  start = datetime.now(tz=timezone.utc)
+  quote = (1.0, 1e5, 1.1, 1e5)
+  bbas = []
+  for i in range(n):
+    if rng.random() < change_prob:
+      quote = (rng.uniform(1, 1.05), rng.uniform(1, 1e6), 1.1, rng.uniform(1, 1e6))
+    bbas.append(BBA(start + timedelta(milliseconds=i), "XECUSDT", *quote))
+  return bbas
+
+def _trades(n: int, rng: random.Random) -> list[Trade]:
+  start = datetime.now(tz=timezone.utc)
+  return [
+    Trade(start + timedelta(milliseconds=i), "XECUSDT", rng.choice([Side.BUY, Side.SELL]), rng.uniform(1, 2), rng.uniform(1, 1e6))
+    for i in range(n)
+  ]
+
+def _books(n: int, levels: int, rng: random.Random) -> list[Orderbook]:
+  start = datetime.now(tz=timezone.utc)
+  return [
+    Orderbook(
+      start + timedelta(milliseconds=i), "XECUSDT",
+      [(1 - 0.001 * k, rng.uniform(1, 1e6)) for k in range(levels)],
+      [(1 + 0.001 * k, rng.uniform(1, 1e6)) for k in range(levels)],
+    )
+    for i in range(n)
+  ]
+
+def _evolving_books(n: int, levels: int, rng: random.Random) -> list[Orderbook]:
+  """Depth updates as a live book produces them: each one resizes a few levels, now and then the top moves."""
+  start = datetime.now(tz=timezone.utc)
+  bids = {round(1 - 0.001 * k, 3): rng.uniform(1, 1e6) for k in range(1, levels + 1)}
+  asks = {round(1 + 0.001 * k, 3): rng.uniform(1, 1e6) for k in range(1, levels + 1)}
+  books = []
+  for i in range(n):
+    for _ in range(rng.randint(1, 3)):
+      side = rng.choice([bids, asks])
+      side[rng.choice(list(side))] = rng.uniform(1, 1e6)
+    if rng.random() < 0.05:
+      del bids[max(bids)]
+      bids[round(min(bids) - 0.001, 3)] = rng.uniform(1, 1e6)
+    books.append(Orderbook(start + timedelta(milliseconds=100 * i), "XECUSDT", sorted(bids.items(), reverse=True), sorted(asks.items())))
+  return books
+
+def _bench_orderbook_storage(books: list[Orderbook], shape: str) -> list[BenchResult]:
+  """Snapshot rows vs keyframe + delta blocks for the same updates: write rate, bytes on disk, book_at() latency."""
+  results = []
+  with tempfile.TemporaryDirectory() as tmp:
+    counter = iter(range(1_000_000))
+
+    def write_snapshots():
+      conn = open_db(os.path.join(tmp, f"snapshots_{next(counter)}.db"))
+      cursor = conn.cursor()
+      for ob in books:
+        insert_orderbook(cursor, ob, "CoinEx")
+      conn.commit()
+      conn.close()
+
+    def write_blocks():
+      conn = open_db(os.path.join(tmp, f"blocks_{next(counter)}.db"))
+      writer = OrderbookBlockWriter("XECUSDT")
+      for ob in books:
+        writer.append(ob)
+      writer.close()
+      insert_orderbook_blocks(conn.cursor(), writer.take_pending())
+      conn.commit()
+      conn.close()
+
+    seconds = time_batch(write_snapshots)
+    conn = open_db(os.path.join(tmp, "snapshots_0.db"))
+    snapshot_bytes = conn.execute("SELECT SUM(LENGTH(bids) + LENGTH(asks)) FROM orderbook").fetchone()[0]
+    conn.close()
+    results.append(throughput_result(SUITE, "orderbook_snapshots", shape, len(books), seconds, bytes_per_update=snapshot_bytes / len(books)))
+
+    seconds = time_batch(write_blocks)
+    conn = open_db(os.path.join(tmp, f"blocks_{next(counter) - 1}.db"))
+    block_bytes = conn.execute("SELECT SUM(LENGTH(data)) FROM orderbook_blocks").fetchone()[0]
+    results.append(throughput_result(
+      SUITE, "orderbook_blocks", shape, len(books), seconds,
+      bytes_per_update=block_bytes / len(books), compression_vs_snapshots=snapshot_bytes / block_bytes,
+    ))
+
+    history = OrderbookHistory(conn, "XECUSDT")
+    rng = random.Random(7)
+    lookups = [books[rng.randrange(len(books))].ts for _ in range(500)]
+    seconds = time_batch(lambda: [history.book_at(ts) for ts in lookups])
+    results.append(throughput_result(SUITE, "orderbook_book_at", f"{shape}_random", len(lookups), seconds))
+    lookups.sort()
+    seconds = time_batch(lambda: [history.book_at(ts) for ts in lookups])
+    results.append(throughput_result(SUITE, "orderbook_book_at", f"{shape}_in_time_order", len(lookups), seconds))
+    conn.close()
+  return results
+
+def _bench_inserts(name: str, shape: str, rows: list, insert, commit_every: int) -> BenchResult:
+  with tempfile.TemporaryDirectory() as tmp:
+    counter = iter(range(1_000_000))
+
+    def insert_all():
+      # A fresh file per pass so later passes don't measure a bigger B-tree
+      conn = open_db(os.path.join(tmp, f"bench_{next(counter)}.db"))
+      cursor = conn.cursor()
+      for i, row in enumerate(rows, start=1):
+        insert(cursor, row, "CoinEx")
+        if i % commit_every == 0:
+          conn.commit()
+      conn.commit()
+      conn.close()
+
+    seconds = time_batch(insert_all)
+  return throughput_result(SUITE, name, f"{shape}_commit_every_{commit_every}", len(rows), seconds)
+
+def _filtered_bba_insert():
+  bba_filter = BbaChangeFilter()
+
+  def insert(cursor, bba, exchange):
+    kind = bba_filter.classify(bba)
+    if kind:
+      insert_bba(cursor, bba, exchange, kind)
+  return insert
+
+def run(quick: bool = False) -> list[BenchResult]:
+  rng = random.Random(5)
+  n = 2_000 if quick else 20_000
+  bbas = _bbas(n, rng)
+  quiet_bbas = _quiet_bbas(n, rng)
+  trades = _trades(n, rng)
+  books_5 = _books(n, 5, rng)
+  books_50 = _books(n // 4, 50, rng)
+
+  results = []
+  # commit_every=1 is what the orchestrator does today
+  for commit_every in (1, 100):
+    results.append(_bench_inserts("bba", "row", bbas, insert_bba, commit_every))
+    # Same stream shape the recorder sees on a quiet pair, every push vs change-only (--bba_mode)
+    results.append(_bench_inserts("bba", "quiet_all", quiet_bbas, insert_bba, commit_every))
+    results.append(_bench_inserts("bba", "quiet_changes", quiet_bbas, _filtered_bba_insert(), commit_every))
+    results.append(_bench_inserts("trades", "row", trades, insert_trade, commit_every))
+    results.append(_bench_inserts("orderbook", "depth_5", books_5, insert_orderbook, commit_every))
+    results.append(_bench_inserts("orderbook", "depth_50", books_50, insert_orderbook, commit_every))
+  results.extend(_bench_orderbook_storage(_evolving_books(n, 20, rng), "depth_20_evolving"))
+  return results
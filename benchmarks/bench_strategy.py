@@ -0,0 +1,94 @@
+import random
+from datetime import datetime, timezone
+
+from benchmarks.harness import BenchResult, latency_result, time_each
+from libraries.data_ingestion.coinex_data_feed import CoinexDataFeed
+from libraries.data_ingestion.mexc_data_feed import MexcDataFeed
+from libraries.exchange_clients.coinex_exchange_client import CoinexExchangeClient
+from libraries.models.bba import BBA
+from libraries.models.market_info import MarketInfo
+from libraries.models.order_status import OrderStatus
+from libraries.models.orderbook import Orderbook
+from libraries.models.tracked_order import TrackedOrder
+from libraries.order_management.chase_bba import ChaseBBA
+from utils.fixed_point import float_to_ticks
+
+SUITE = "strategy"
+
+SCENARIOS = 1_000
+XEC_USDT = MarketInfo("CoinEx", "XECUSDT", "XEC", "USDT", 10, 2, 1.0, 0.0, 0.0, True)
+
+def _orderbook(bba: BBA) -> Orderbook:
+  tick = 1e-10
+  return Orderbook(bba.ts, bba.market, [(bba.best_bid_price - i * tick, 1e8) for i in range(5)], [(bba.best_ask_price + i * tick, 1e8) for i in range(5)])
+
+def _resting_ladder(strategy: ChaseBBA, offset_ticks: int) -> dict[str, TrackedOrder]:
+  """Live orders for the ladder the strategy wants right now, with every price moved by `offset_ticks`."""
+  targets = strategy.planner.targets(
+    strategy.coinex_bba.best_bid_price, strategy.mexc_bba.best_bid_price, # type: ignore[union-attr]
+    strategy.minimum_bps_threshold, strategy.orderbook, strategy.limit_amount_usd,
+    coinex_bid_ticks=strategy.coinex_bba.best_bid_ticks, # type: ignore[union-attr]
+  )
+  orders = {}
+  for i, t in enumerate(targets):
+    # Price strings as the exchange reports them; the planner parses each one to ticks once
+    order = TrackedOrder(
+      client_id=f"bench_{i}", market="XECUSDT", side="buy", price=XEC_USDT.format_price_ticks(t.price_ticks + offset_ticks),
+      amount=XEC_USDT.format_amount_lots(t.amount_lots), is_hide=t.is_hide, status=OrderStatus.OPEN, order_id=i,
+    )
+    orders[order.client_id] = order
+  return orders
+
+def _strategy() -> ChaseBBA:
+  strategy = ChaseBBA(
+    "XEC-USDT", 30,
+    CoinexDataFeed("XEC-USDT"), MexcDataFeed("XEC-USDT"),
+    CoinexExchangeClient("bench", "bench"), market_info=XEC_USDT,
+  )
+  strategy.limit_amount_usd = 1_000
+  return strategy
+
+def _bbas(n: int, rng: random.Random, mexc_premium_bps: float) -> tuple[list[BBA], list[BBA]]:
+  now = datetime.now(tz=timezone.utc)
+  coinex, mexc = [], []
+  for _ in range(n):
+    bid = round(rng.uniform(0.0000199, 0.0000201), 10)
+    coinex.append(BBA(now, "XECUSDT", bid, 1e8, bid * 1.001, 1e8, best_bid_ticks=float_to_ticks(bid, XEC_USDT.price_precision)))
+    mexc_bid = bid * (1 + mexc_premium_bps / 10_000)
+    mexc.append(BBA(now, "XECUSDT", mexc_bid, 1e8, mexc_bid * 1.001, 1e8))
+  return coinex, mexc
+
+def run(quick: bool = False) -> list[BenchResult]:
+  rng = random.Random(6)
+  n = 20_000 if quick else 200_000
+  results = []
+
+  # shape -> (mexc premium in bps, ticks between resting orders and the planned ladder, None for no orders)
+  shapes = {
+    "no_orders": (50, None),
+    "hold": (50, 0),
+    "requote": (50, -10),
+    "below_threshold": (10, 0),
+  }
+  for shape, (premium, offset) in shapes.items():
+    strategy = _strategy()
+    coinex, mexc = _bbas(SCENARIOS, rng, premium)
+    books = [_orderbook(b) for b in coinex]
+    resting = []
+    if offset is not None:
+      for i in range(SCENARIOS):
+        strategy.coinex_bba, strategy.mexc_bba, strategy.orderbook = coinex[i], mexc[i], books[i]
+        resting.append(_resting_ladder(strategy, offset))
+
+    def step(i: int):
+      i %= SCENARIOS
+      strategy.coinex_bba = coinex[i]
+      strategy.mexc_bba = mexc[i]
+      strategy.orderbook = books[i]
+      if resting:
+        strategy.order_manager.orders = resting[i]
+      return strategy.decide()
+
+    seconds, histogram = time_each(step, n)
+    results.append(latency_result(SUITE, "chase_bba_decide", shape, n, seconds, histogram, action=step(0).value))
+  return results
@@ -0,0 +1,38 @@
+import argparse
+import sys
+
+from benchmarks.harness import load_results
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Compare two benchmark result files and flag regressions.")
+  parser.add_argument("baseline", type=str)
+  parser.add_argument("candidate", type=str)
+  parser.add_argument(
+    "--threshold_pct", type=float, default=10.0,
+    help="Throughput drop or p99 increase that counts as a regression (default: 10)"
+  )
+  args = parser.parse_args()
+
+  baseline = load_results(args.baseline)
+  candidate = load_results(args.candidate)
+
+  regressions = []
+  print(f"{'benchmark':<60}{'base ops/s':>14}{'new ops/s':>14}{'change':>10}")
+  for key in sorted(baseline.keys() & candidate.keys()):
+    old, new = baseline[key], candidate[key]
+    change = (new["ops_per_sec"] - old["ops_per_sec"]) / old["ops_per_sec"] * 100 if old["ops_per_sec"] else 0.0
+    flag = ""
+    if change < -args.threshold_pct:
+      flag = "  REGRESSION"
+    elif old.get("p99_us") and new.get("p99_us") and (new["p99_us"] - old["p99_us"]) / old["p99_us"] * 100 > args.threshold_pct:
+      flag = "  REGRESSION (p99)"
+    if flag:
+      regressions.append(key)
+    print(f"{key:<60}{old['ops_per_sec']:>14,.0f}{new['ops_per_sec']:>14,.0f}{change:>9.1f}%{flag}")
+
+  for key in sorted(baseline.keys() - candidate.keys()):
+    print(f"{key:<60} missing from candidate")
+
+  if regressions:
+    print(f"\n{len(regressions)} regression(s) over {args.threshold_pct}%")
+    sys.exit(1)
@@ -0,0 +1,139 @@
+import json
+import os
+import platform
+import struct
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timezone
+from typing import Callable, Awaitable
+
+from libraries.monitoring.latency_tracer import LatencyHistogram
+
+RESULTS_DIR = os.path.join("output", "benchmarks")
+
+@dataclass
+class BenchResult:
+  suite: str
+  name: str
+  shape: str
+  ops: int
+  seconds: float
+  ops_per_sec: float
+  p50_us: float | None = None
+  p99_us: float | None = None
+  p999_us: float | None = None
+  extra: dict = field(default_factory=dict)
+
+  @property
+  def key(self) -> str:
+    return f"{self.suite}/{self.name}[{self.shape}]"
+
+
+def time_batch(fn: Callable[[], None], repeat: int = 3) -> float:
+  """Best-of-repeat wall time for fn, which should run the whole batch itself."""
+  best = float("inf")
+  for _ in range(repeat):
+    start = time.perf_counter()
+    fn()
+    best = min(best, time.perf_counter() - start)
+  return best
+
+async def time_batch_async(fn: Callable[[], Awaitable[None]], repeat: int = 3) -> float:
+  best = float("inf")
+  for _ in range(repeat):
+    start = time.perf_counter()
+    await fn()
+    best = min(best, time.perf_counter() - start)
+  return best
+
+def time_each(fn: Callable[[int], object], ops: int) -> tuple[float, LatencyHistogram]:
+  """Times every call of fn(i) individually, for per-operation latency percentiles."""
+  histogram = LatencyHistogram()
+  clock = time.perf_counter_ns
+  started = clock()
+  for i in range(ops):
+    t0 = clock()
+    fn(i)
+    histogram.record(clock() - t0)
+  return (clock() - started) / 1e9, histogram
+
+def throughput_result(suite: str, name: str, shape: str, ops: int, seconds: float, **extra) -> BenchResult:
+  return BenchResult(suite, name, shape, ops, seconds, ops / seconds if seconds else 0.0, extra=extra)
+
+def latency_result(suite: str, name: str, shape: str, ops: int, seconds: float, histogram: LatencyHistogram, **extra) -> BenchResult:
+  summary = histogram.summary()
+  return BenchResult(
+    suite, name, shape, ops, seconds, ops / seconds if seconds else 0.0,
+    p50_us = summary["p50_us"],
+    p99_us = summary["p99_us"],
+    p999_us = summary["p999_us"],
+    extra = extra,
+  )
+
+
+# Recorded frames are stored as a 4-byte big-endian length followed by the raw websocket payload
+def write_frames(path: str, frames: list[bytes]):
+  with open(path, "wb") as f:
+    for frame in frames:
+      f.write(struct.pack(">I", len(frame)))
+      f.write(frame)
+
+def read_frames(path: str) -> list[bytes]:
+  frames = []
+  with open(path, "rb") as f:
+    data = f.read()
+  offset = 0
+  while offset < len(data):
+    (length,) = struct.unpack_from(">I", data, offset)
+    offset += 4
+    frames.append(data[offset:offset + length])
+    offset += length
+  return frames
+
+
+def _git_commit() -> str | None:
+  try:
+    return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+  except Exception:
+    return None
+
+def _protobuf_backend() -> str | None:
+  try:
+    from google.protobuf.internal import api_implementation
+    return api_implementation.Type()
+  except Exception:
+    return None
+
+def metadata() -> dict:
+  return {
+    "timestamp": datetime.now(tz=timezone.utc).isoformat(),
+    "git_commit": _git_commit(),
+    "python": sys.version.split()[0],
+    "implementation": platform.python_implementation(),
+    "platform": platform.platform(),
+    "machine": platform.machine(),
+    "cpu_count": os.cpu_count(),
+    "protobuf_backend": _protobuf_backend(),
+  }
+
+def write_results(results: list[BenchResult], out_dir: str = RESULTS_DIR, tag: str | None = None) -> str:
+  os.makedirs(out_dir, exist_ok=True)
+  stamp = datetime.now(tz=timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+  path = os.path.join(out_dir, f"{stamp}{'-' + tag if tag else ''}.json")
+  with open(path, "w") as f:
+    json.dump({"meta": metadata(), "results": [asdict(r) for r in results]}, f, indent=2)
+  return path
+
+def load_results(path: str) -> dict[str, dict]:
+  with open(path) as f:
+    payload = json.load(f)
+  return {f"{r['suite']}/{r['name']}[{r['shape']}]": r for r in payload["results"]}
+
+def print_results(results: list[BenchResult]):
+  print(f"{'benchmark':<60}{'ops/s':>14}{'p50 us':>10}{'p99 us':>10}")
+  for r in results:
+    p50 = f"{r.p50_us:.2f}" if r.p50_us is not None else "-"
+    p99 = f"{r.p99_us:.2f}" if r.p99_us is not None else "-"
+    print(f"{r.key:<60}{r.ops_per_sec:>14,.0f}{p50:>10}{p99:>10}")
@@ -0,0 +1,32 @@
+import argparse
+
+from benchmarks import bench_client, bench_feed_decode, bench_import_time, bench_queue, bench_runtime, bench_sqlite, bench_strategy
+from benchmarks.harness import RESULTS_DIR, print_results, write_results
+
+SUITES = {
+  "feed_decode": lambda args: bench_feed_decode.run(args.quick, args.frames_dir),
+  "queue": lambda args: bench_queue.run(args.quick),
+  "sqlite_insert": lambda args: bench_sqlite.run(args.quick),
+  "strategy": lambda args: bench_strategy.run(args.quick),
+  "runtime": lambda args: bench_runtime.run(args.quick),
+  "client": lambda args: bench_client.run(args.quick),
+  "import_time": lambda args: bench_import_time.run(args.quick),
+}
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Run the offline hot-path benchmarks and write results as JSON.")
+  parser.add_argument("--only", type=str, default=None, help=f"Comma separated suites to run (default: all of {', '.join(SUITES)})")
+  parser.add_argument("--quick", action="store_true", help="Smaller inputs for a fast smoke run")
+  parser.add_argument("--frames_dir", type=str, default=None, help="Directory with recorded coinex.frames / mexc.frames to add as a shape")
+  parser.add_argument("--out", type=str, default=RESULTS_DIR, help=f"Results directory (default: {RESULTS_DIR})")
+  parser.add_argument("--tag", type=str, default=None, help="Suffix for the results file name, e.g. a branch name")
+  args = parser.parse_args()
+
+  selected = args.only.split(",") if args.only else list(SUITES)
+  results = []
+  for suite in selected:
+    print(f"[BENCH] Running {suite}...")
+    results.extend(SUITES[suite](args))
+
+  print_results(results)
+  print(f"[BENCH] Results written to {write_results(results, args.out, args.tag)}")
@@ -0,0 +1,125 @@
+import gzip
+import json
+import random
+
+BASE_TS_MS = 1_750_000_000_000
+MARKET = "XECUSDT"
+
+def _price(mid: float, rng: random.Random) -> float:
+  return round(mid * (1 + rng.uniform(-0.001, 0.001)), 10)
+
+def coinex_bbo_frames(n: int, seed: int = 1) -> list[bytes]:
+  rng = random.Random(seed)
+  frames = []
+  for i in range(n):
+    bid = _price(0.00002, rng)
+    msg = {
+      "method": "bbo.update",
+      "data": {
+        "market": MARKET,
+        "updated_at": BASE_TS_MS + i,
+        "best_bid_price": f"{bid:.10f}",
+        "best_bid_size": f"{rng.uniform(1e6, 1e9):.2f}",
+        "best_ask_price": f"{bid * 1.001:.10f}",
+        "best_ask_size": f"{rng.uniform(1e6, 1e9):.2f}",
+      },
+      "id": None,
+    }
+    frames.append(gzip.compress(json.dumps(msg).encode()))
+  return frames
+
+def coinex_deals_frames(n: int, deals_per_frame: int, seed: int = 2) -> list[bytes]:
+  rng = random.Random(seed)
+  frames = []
+  deal_id = 1
+  for i in range(n):
+    deal_list = []
+    for _ in range(deals_per_frame):
+      deal_list.append({
+        "deal_id": deal_id,
+        "created_at": BASE_TS_MS + i,
+        "side": rng.choice(["buy", "sell"]),
+        "price": f"{_price(0.00002, rng):.10f}",
+        "amount": f"{rng.uniform(1e3, 1e8):.2f}",
+      })
+      deal_id += 1
+    msg = {"method": "deals.update", "data": {"market": MARKET, "deal_list": deal_list}, "id": None}
+    frames.append(gzip.compress(json.dumps(msg).encode()))
+  return frames
+
+def coinex_depth_frames(n: int, levels: int, seed: int = 3) -> list[bytes]:
+  rng = random.Random(seed)
+  frames = []
+  for i in range(n):
+    mid = _price(0.00002, rng)
+    bids = [[f"{mid * (1 - 0.0005 * (k + 1)):.10f}", f"{rng.uniform(1e5, 1e9):.2f}"] for k in range(levels)]
+    asks = [[f"{mid * (1 + 0.0005 * (k + 1)):.10f}", f"{rng.uniform(1e5, 1e9):.2f}"] for k in range(levels)]
+    msg = {
+      "method": "depth.update",
+      "data": {
+        "market": MARKET,
+        "is_full": True,
+        "depth": {"asks": asks, "bids": bids, "last": f"{mid:.10f}", "updated_at": BASE_TS_MS + i, "checksum": 0},
+      },
+      "id": None,
+    }
+    frames.append(gzip.compress(json.dumps(msg).encode()))
+  return frames
+
+def mexc_book_ticker_frames(n: int, seed: int = 4) -> list[bytes]:
+  from protos.PushDataV3ApiWrapper_pb2 import PushDataV3ApiWrapper # type: ignore
+
+  rng = random.Random(seed)
+  frames = []
+  for i in range(n):
+    bid = _price(0.00002, rng)
+    msg = PushDataV3ApiWrapper()
+    msg.channel = f"spot@public.aggre.bookTicker.v3.api.pb@100ms@{MARKET}"
+    msg.symbol = MARKET
+    msg.sendTime = BASE_TS_MS + i
+    msg.publicAggreBookTicker.bidPrice = f"{bid:.10f}"
+    msg.publicAggreBookTicker.bidQuantity = f"{rng.uniform(1e6, 1e9):.2f}"
+    msg.publicAggreBookTicker.askPrice = f"{bid * 1.001:.10f}"
+    msg.publicAggreBookTicker.askQuantity = f"{rng.uniform(1e6, 1e9):.2f}"
+    frames.append(msg.SerializeToString())
+  return frames
+
+def mexc_deals_frames(n: int, deals_per_frame: int, seed: int = 5) -> list[bytes]:
+  from protos.PushDataV3ApiWrapper_pb2 import PushDataV3ApiWrapper # type: ignore
+
+  rng = random.Random(seed)
+  frames = []
+  for i in range(n):
+    msg = PushDataV3ApiWrapper()
+    msg.channel = f"spot@public.aggre.deals.v3.api.pb@100ms@{MARKET}"
+    msg.symbol = MARKET
+    msg.sendTime = BASE_TS_MS + i
+    for _ in range(deals_per_frame):
+      deal = msg.publicAggreDeals.deals.add()
+      deal.price = f"{_price(0.00002, rng):.10f}"
+      deal.quantity = f"{rng.uniform(1e3, 1e8):.2f}"
+      deal.tradeType = rng.choice((1, 2))
+      deal.time = BASE_TS_MS + i
+    frames.append(msg.SerializeToString())
+  return frames
+
+def mexc_depth_frames(n: int, levels: int, seed: int = 6) -> list[bytes]:
+  from protos.PushDataV3ApiWrapper_pb2 import PushDataV3ApiWrapper # type: ignore
+
+  rng = random.Random(seed)
+  frames = []
+  for i in range(n):
+    bid = _price(0.00002, rng)
+    msg = PushDataV3ApiWrapper()
+    msg.channel = f"spot@public.limit.depth.v3.api.pb@{MARKET}@{levels}"
+    msg.symbol = MARKET
+    msg.sendTime = BASE_TS_MS + i
+    for k in range(levels):
+      level = msg.publicLimitDepths.bids.add()
+      level.price = f"{bid - k * 1e-10:.10f}"
+      level.quantity = f"{rng.uniform(1e6, 1e9):.2f}"
+      level = msg.publicLimitDepths.asks.add()
+      level.price = f"{bid * 1.001 + k * 1e-10:.10f}"
+      level.quantity = f"{rng.uniform(1e6, 1e9):.2f}"
+    frames.append(msg.SerializeToString())
+  return frames
@@ -0,0 +1,57 @@
+import asyncio
+import argparse
+import random
+from datetime import datetime, timezone
+
+from libraries.exchange_clients.mexc_exchange_client import MexcExchangeClient
+from libraries.models.bba import BBA
+from libraries.models.fill import Fill
+from libraries.models.market_info import MarketInfo
+from libraries.models.side import Side
+from libraries.monitoring.latency_tracer import tracer
+from libraries.order_management.hedger import Hedger
+from libraries.portfolio.position_tracker import PositionTracker
+from mock_exchanges.mexc_rest import MOCK_KEY, MOCK_SECRET, MockMexcExchange
+from mock_exchanges.rest_server import serve
+
+async def main(fills: int, price: float, fill_usd: float, min_notional: float, latency_ms: float, new_reads: int):
+  exchange = MockMexcExchange(price, latency_ms=latency_ms, new_reads=new_reads)
+  server = serve(exchange)
+  client = MexcExchangeClient(MOCK_KEY, MOCK_SECRET, http_url=f"http://127.0.0.1:{server.server_port}")
+
+  market_info = MarketInfo("MexC", "XECUSDT", "XEC", "USDT", 10, 2, 1.0, min_notional, 0.0, True)
+  positions = PositionTracker(snapshot_path="/dev/null")
+  hedger = Hedger("XEC-USDT", client, market_info, positions)
+  runner = asyncio.create_task(hedger.run())
+
+  now = datetime.now(tz=timezone.utc)
+  bba = BBA(now, "XECUSDT", exchange.bid, 1e9, exchange.ask, 1e9)
+  hedger.on_bba(bba)
+  for _ in range(fills):
+    # CoinEx bids filling at a discount to MEXC, in random sizes around fill_usd
+    amount = round(fill_usd * random.uniform(0.2, 1.8) / price, 2)
+    fill = Fill(datetime.now(tz=timezone.utc), "CoinEx", "XECUSDT", Side.BUY, price * 0.997, amount, 0.0, amount * price * 0.997 * 0.001, True)
+    positions.on_fill(fill)
+    positions.on_bba(bba)
+    hedger.on_fill(fill)
+    await asyncio.sleep(random.expovariate(20))
+
+  await asyncio.sleep(0.5 + latency_ms / 1000)
+  runner.cancel()
+  server.shutdown()
+
+  print(f"{fills} CoinEx fills hedged in {hedger.hedges} MEXC orders, {hedger.pending:g} XEC still pending, {len(hedger.unconfirmed)} unconfirmed")
+  print(positions.snapshot()["positions"]["XECUSDT"])
+  print(tracer.dump())
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Run the hedger against the local MEXC mock with synthetic CoinEx fills and print its latency.")
+  parser.add_argument("--fills", type=int, default=200)
+  parser.add_argument("--price", type=float, default=0.00003)
+  parser.add_argument("--fill_usd", type=float, default=2.0, help="Typical CoinEx fill size, below MEXC's minimum so fills get batched")
+  parser.add_argument("--min_notional", type=float, default=5.0)
+  parser.add_argument("--latency_ms", type=float, default=0.0, help="Delay the mock adds to every response")
+  parser.add_argument("--new_reads", type=int, default=2, help="Reads of each hedge that show it NEW before it executes, as MEXC can right after the ack")
+  args = parser.parse_args()
+
+  asyncio.run(main(args.fills, args.price, args.fill_usd, args.min_notional, args.latency_ms, args.new_reads))
@@ -0,0 +1,42 @@
+import asyncio
+import argparse
+import os
+import time
+
+from benchmarks.harness import write_frames
+from libraries.data_ingestion.mexc_data_feed import MexcDataFeed
+
+async def record_pair(pair: str, frames: list[bytes], deadline: float):
+  feed = MexcDataFeed(pair)
+  ws = await feed._open_connection()
+  try:
+    while time.monotonic() < deadline:
+      try:
+        raw = await asyncio.wait_for(ws.recv(), timeout=max(0.0, deadline - time.monotonic()))
+      except TimeoutError:
+        break
+      # JSON frames are acks and pongs; only the protobuf pushes are worth replaying
+      if isinstance(raw, bytes):
+        frames.append(raw)
+  finally:
+    await ws.close()
+
+async def main(pairs: list[str], seconds: float, out_dir: str):
+  frames: list[bytes] = []
+  deadline = time.monotonic() + seconds
+  await asyncio.gather(*(record_pair(pair, frames, deadline) for pair in pairs))
+
+  os.makedirs(out_dir, exist_ok=True)
+  path = os.path.join(out_dir, "mexc.frames")
+  write_frames(path, frames)
+  print(f"Recorded {len(frames)} frames from {len(pairs)} pairs to {path}")
+  print(f"Benchmark them with: python -m benchmarks.run_all --only feed_decode --frames_dir {out_dir}")
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Record raw MEXC book ticker, deals and depth frames for the decode benchmark.")
+  parser.add_argument("--pairs", nargs="+", default=["XEC-USDT"], help="Pairs to record (e.g. XEC-USDT BTC-USDT)")
+  parser.add_argument("--seconds", type=float, default=60)
+  parser.add_argument("--out", type=str, default=os.path.join("output", "frames"))
+  args = parser.parse_args()
+
+  asyncio.run(main(args.pairs, args.seconds, args.out))
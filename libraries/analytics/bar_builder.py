@@ -0,0 +1,231 @@
+import asyncio
+import math
+from array import array
+from datetime import datetime, timezone
+
+from libraries.models.bar import Bar
+from libraries.models.bba import BBA
+from libraries.models.side import Side
+from libraries.models.trade import Trade
+
+RESOLUTIONS = (1, 60, 3600)  # 1s, 1m, 1h
+MAX_BARS = 86_400            # closed bars kept in memory per resolution (a day of 1s bars)
+FLUSH_GRACE_SECONDS = 1.0   # how long flush() waits past a period's end for late updates (CoinEx deals lag 100-300ms)
+
+# Column layout of a closed bar, in the order the bars table and Bar take them
+FLOAT_COLUMNS = ("open", "high", "low", "close", "volume", "quote_volume", "buy_volume", "mid_close", "spread_mean_bps", "spread_max_bps")
+INT_COLUMNS = ("start", "trades", "bba_updates")
+
+class _OpenBar:
+  __slots__ = ("start", "open", "high", "low", "close", "volume", "quote_volume", "buy_volume", "trades", "mid_close", "spread_sum", "spread_max", "bba_updates")
+
+  def __init__(self, start: int):
+    self.start = start
+    self.open = self.high = self.low = self.close = math.nan
+    self.volume = self.quote_volume = self.buy_volume = 0.0
+    self.trades = 0
+    self.mid_close = math.nan
+    self.spread_sum = 0.0
+    self.spread_max = math.nan
+    self.bba_updates = 0
+
+class _BarColumns:
+  '''Closed bars of one resolution as parallel typed arrays: 8 bytes per field, no per-bar objects.'''
+  def __init__(self):
+    self.columns: dict[str, array] = {name: array("d") for name in FLOAT_COLUMNS}
+    self.columns.update({name: array("q") for name in INT_COLUMNS})
+
+  def __len__(self) -> int:
+    return len(self.columns["start"])
+
+  def append(self, bar: _OpenBar):
+    c = self.columns
+    c["start"].append(bar.start)
+    c["open"].append(bar.open)
+    c["high"].append(bar.high)
+    c["low"].append(bar.low)
+    c["close"].append(bar.close)
+    c["volume"].append(bar.volume)
+    c["quote_volume"].append(bar.quote_volume)
+    c["buy_volume"].append(bar.buy_volume)
+    c["trades"].append(bar.trades)
+    c["mid_close"].append(bar.mid_close)
+    c["spread_mean_bps"].append(bar.spread_sum / bar.bba_updates if bar.bba_updates else math.nan)
+    c["spread_max_bps"].append(bar.spread_max)
+    c["bba_updates"].append(bar.bba_updates)
+
+  def replace_last(self, bar: _OpenBar):
+    for column in self.columns.values():
+      column.pop()
+    self.append(bar)
+
+  def trim(self, keep: int):
+    drop = len(self) - keep
+    if drop > 0:
+      for column in self.columns.values():
+        del column[:drop]
+
+def _nan_to_none(value: float) -> float | None:
+  return None if math.isnan(value) else value
+
+class BarBuilder:
+  '''
+  Incremental OHLCV and spread bars for one market at several resolutions (1s/1m/1h by default),
+  fed from the same trade and BBA updates the recorder stores. Each update touches one open bar
+  per resolution; a bar closes when the first update of a later period arrives (or on flush(),
+  a grace period after its end). Closed bars are kept in typed arrays for in-process readers and
+  queued in `pending` as rows for the bars table, so research and dashboards can read bars instead
+  of scanning ticks. An update that arrives late for the most recently closed bar is merged into it
+  and the whole bar queued again, so the table's INSERT OR REPLACE keeps the complete bar; anything
+  older than that is dropped and counted in `late_updates`. Trade OHLC is NaN (NULL in SQLite) for a
+  period with quotes but no trades.
+  '''
+  def __init__(self, market: str, exchange: str = "CoinEx", resolutions: tuple[int, ...] = RESOLUTIONS, max_bars: int = MAX_BARS):
+    self.market = market.replace('-', '')
+    self.exchange = exchange
+    self.resolutions = resolutions
+    self.max_bars = max_bars
+    self._open: dict[int, _OpenBar | None] = {res: None for res in resolutions}
+    self._closed: dict[int, _BarColumns] = {res: _BarColumns() for res in resolutions}
+    self._last_closed: dict[int, _OpenBar | None] = {res: None for res in resolutions}
+    self.pending: list[tuple] = []  # closed bars as bars table rows, waiting to be persisted
+    self.late_updates = 0           # updates dropped because their bar was closed before the last one
+
+  def _bar(self, resolution: int, epoch: int) -> _OpenBar | None:
+    """The bar an update at `epoch` belongs in: the open one, a new one, or the last closed one if it arrived late."""
+    start = epoch - epoch % resolution
+    bar = self._open[resolution]
+    if bar is not None and start >= bar.start:
+      if start > bar.start:
+        self._close(resolution, bar)
+        bar = self._open[resolution] = _OpenBar(start)
+      return bar
+
+    last = self._last_closed[resolution]
+    if last is not None and start <= last.start:
+      if start == last.start:
+        return last
+      self.late_updates += 1
+      return None
+    if bar is None:
+      bar = self._open[resolution] = _OpenBar(start)
+    # An update from a period with no bar of its own (out of order across streams) folds into the open bar
+    return bar
+
+  def _close(self, resolution: int, bar: _OpenBar):
+    closed = self._closed[resolution]
+    closed.append(bar)
+    if len(closed) >= 2 * self.max_bars:
+      closed.trim(self.max_bars)
+    self._last_closed[resolution] = bar
+    self.pending.append(self._row(resolution, bar))
+
+  def _amend(self, resolution: int, bar: _OpenBar):
+    """Re-queues the last closed bar after a late update, so the row written replaces the earlier one whole."""
+    self._closed[resolution].replace_last(bar)
+    self.pending.append(self._row(resolution, bar))
+
+  def _row(self, resolution: int, bar: _OpenBar) -> tuple:
+    return (
+      self.exchange, self.market, resolution, bar.start,
+      _nan_to_none(bar.open), _nan_to_none(bar.high), _nan_to_none(bar.low), _nan_to_none(bar.close),
+      bar.volume, bar.quote_volume, bar.trades, bar.buy_volume,
+      _nan_to_none(bar.mid_close), bar.spread_sum / bar.bba_updates if bar.bba_updates else None, _nan_to_none(bar.spread_max), bar.bba_updates,
+    )
+
+  def on_trade(self, trade: Trade):
+    epoch = int(trade.ts.timestamp())
+    price, amount = trade.price, trade.amount
+    is_buy = trade.taker_side == Side.BUY
+    for resolution in self.resolutions:
+      bar = self._bar(resolution, epoch)
+      if bar is None:
+        continue
+      if bar.trades == 0:
+        bar.open = bar.high = bar.low = price
+      elif price > bar.high:
+        bar.high = price
+      elif price < bar.low:
+        bar.low = price
+      bar.close = price
+      bar.volume += amount
+      bar.quote_volume += amount * price
+      if is_buy:
+        bar.buy_volume += amount
+      bar.trades += 1
+      if bar is self._last_closed[resolution]:
+        self._amend(resolution, bar)
+
+  def on_bba(self, bba: BBA):
+    bid, ask = bba.best_bid_price, bba.best_ask_price
+    if bid <= 0 or ask <= 0:
+      return
+    epoch = int(bba.ts.timestamp())
+    mid = (bid + ask) / 2
+    spread_bps = (ask - bid) / mid * 10_000
+    for resolution in self.resolutions:
+      bar = self._bar(resolution, epoch)
+      if bar is None:
+        continue
+      bar.mid_close = mid
+      bar.spread_sum += spread_bps
+      if not spread_bps <= bar.spread_max:  # also true while spread_max is still NaN
+        bar.spread_max = spread_bps
+      bar.bba_updates += 1
+      if bar is self._last_closed[resolution]:
+        self._amend(resolution, bar)
+
+  def flush(self, now: datetime | None = None, grace_seconds: float = FLUSH_GRACE_SECONDS):
+    """Closes every open bar whose period ended at least `grace_seconds` before `now`, so quiet markets still get their bars out."""
+    epoch = (now or datetime.now(tz=timezone.utc)).timestamp()
+    for resolution in self.resolutions:
+      bar = self._open[resolution]
+      if bar is not None and epoch >= bar.start + resolution + grace_seconds:
+        self._close(resolution, bar)
+        self._open[resolution] = None
+
+  def close(self):
+    """Closes every open bar regardless of its age, e.g. on shutdown."""
+    for resolution in self.resolutions:
+      bar = self._open[resolution]
+      if bar is not None:
+        self._close(resolution, bar)
+        self._open[resolution] = None
+
+  def take_pending(self) -> list[tuple]:
+    rows, self.pending = self.pending, []
+    return rows
+
+  def columns(self, resolution: int) -> dict[str, array]:
+    """Closed bars of one resolution as typed arrays (start is epoch seconds), oldest first."""
+    return self._closed[resolution].columns
+
+  def bars(self, resolution: int, limit: int | None = None) -> list[Bar]:
+    c = self._closed[resolution].columns
+    n = len(c["start"])
+    first = max(0, n - limit) if limit else 0
+    return [
+      Bar(
+        market = self.market,
+        resolution = resolution,
+        start = datetime.fromtimestamp(c["start"][i], tz=timezone.utc),
+        open = _nan_to_none(c["open"][i]),
+        high = _nan_to_none(c["high"][i]),
+        low = _nan_to_none(c["low"][i]),
+        close = _nan_to_none(c["close"][i]),
+        volume = c["volume"][i],
+        quote_volume = c["quote_volume"][i],
+        trades = c["trades"][i],
+        buy_volume = c["buy_volume"][i],
+        mid_close = _nan_to_none(c["mid_close"][i]),
+        spread_mean_bps = _nan_to_none(c["spread_mean_bps"][i]),
+        spread_max_bps = _nan_to_none(c["spread_max_bps"][i]),
+        bba_updates = c["bba_updates"][i],
+      )
+      for i in range(first, n)
+    ]
+
+  async def run_flush(self, interval: float = 1.0):
+    while True:
+      await asyncio.sleep(interval)
+      self.flush()
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+from libraries.models.bba import BBA
+from libraries.models.orderbook import Orderbook
+from libraries.models.side import Side
+from libraries.models.trade import Trade
+
+CHECKPOINT_DIR = os.path.join("output", "fill_stats")
+FILTER_THRESHOLD = 0.95  # only count BBA trades consuming ≥95% of visible size
+
+def hour_key(ts: datetime) -> str:
+  """'YYYY-MM-DDTHH' in UTC, the same bucket the analysis scripts cut from ISO timestamps."""
+  return ts.astimezone(timezone.utc).isoformat()[:13]
+
+def overflow_amount(amount: float, best_bid_size: float) -> float:
+  """Part of a taker sell that went past the size resting at the best bid."""
+  return max(0.0, amount - best_bid_size)
+
+def fill_level(trade_price: float, amount: float, bids: list, filter_threshold: float = FILTER_THRESHOLD) -> int | None:
+  """
+  Levels below the best bid a taker sell reached, or None when it is a BBA trade that consumed
+  less than filter_threshold of the visible size (too shallow to tell us anything about depth).
+  """
+  if not bids:
+    return None
+  best_bid_price, best_bid_size = bids[0]
+  if trade_price >= best_bid_price and amount < filter_threshold * best_bid_size:
+    return None
+
+  depth = 0
+  for level_price, _ in bids:
+    if trade_price >= level_price:
+      break
+    depth += 1
+  return depth
+
+def checkpoint_path(market: str, directory: str = CHECKPOINT_DIR) -> str:
+  return os.path.join(directory, f"{market.replace('-', '')}.json")
+
+def load_snapshot(market: str, directory: str = CHECKPOINT_DIR) -> dict | None:
+  """Latest checkpointed snapshot for a market, for readers in another process such as the dashboard."""
+  try:
+    with open(checkpoint_path(market, directory)) as f:
+      return json.load(f)["snapshot"]
+  except (OSError, ValueError, KeyError):
+    return None
+
+class FillStats:
+  '''
+  Streaming version of analysis/fill_rate.py and analysis/fill_levels.py for one market.
+  Feed it the live BBA, depth and trade updates and it keeps per-hour taker-sell fill USD,
+  overflow past the best bid and USD filled by book level over a rolling window. Every update
+  is O(book depth), so current numbers are always available, and the hourly buckets are
+  checkpointed to JSON so a restart picks up where it left off.
+  '''
+  def __init__(self, market: str, window_hours: int = 24, filter_threshold: float = FILTER_THRESHOLD, checkpoint_dir: str = CHECKPOINT_DIR):
+    self.market = market.replace('-', '')
+    self.window_hours = window_hours
+    self.filter_threshold = filter_threshold
+    self.checkpoint_dir = checkpoint_dir
+
+    self.best_bid_size = 0.0
+    self.bids: list = []
+    # hour key -> {"usd_filled", "overflow_usd", "trades", "level_usd": {level: usd}}
+    self.hours: dict[str, dict] = {}
+
+  def on_bba(self, bba: BBA):
+    self.best_bid_size = bba.best_bid_size
+
+  def on_orderbook(self, ob: Orderbook):
+    self.bids = ob.bids
+
+  def on_trade(self, trade: Trade):
+    if trade.taker_side != Side.SELL:
+      return
+
+    key = hour_key(trade.ts)
+    bucket = self.hours.get(key)
+    if bucket is None:
+      bucket = self.hours[key] = {"usd_filled": 0.0, "overflow_usd": 0.0, "trades": 0, "level_usd": {}}
+      self._prune(trade.ts)
+
+    bucket["usd_filled"] += trade.amount * trade.price
+    bucket["overflow_usd"] += overflow_amount(trade.amount, self.best_bid_size) * trade.price
+    bucket["trades"] += 1
+
+    level = fill_level(trade.price, trade.amount, self.bids, self.filter_threshold)
+    if level is not None:
+      level_usd = bucket["level_usd"]
+      level_usd[level] = level_usd.get(level, 0.0) + trade.amount * trade.price
+
+  def _prune(self, now: datetime):
+    cutoff = hour_key(now - timedelta(hours=self.window_hours))
+    for key in [k for k in self.hours if k < cutoff]:
+      del self.hours[key]
+
+  def snapshot(self) -> dict:
+    per_hour = [
+      {"hour": key, "usd_filled": b["usd_filled"], "overflow_usd": b["overflow_usd"], "trades": b["trades"]}
+      for key, b in sorted(self.hours.items())
+    ]
+    fill_by_level: dict[int, float] = {}
+    for b in self.hours.values():
+      for level, usd in b["level_usd"].items():
+        fill_by_level[level] = fill_by_level.get(level, 0.0) + usd
+
+    total_overflow = sum(h["overflow_usd"] for h in per_hour)
+    return {
+      "market": self.market,
+      "window_hours": self.window_hours,
+      "total_usd_filled": sum(h["usd_filled"] for h in per_hour),
+      "total_overflow_usd": total_overflow,
+      "avg_overflow_per_active_hour": total_overflow / len(per_hour) if per_hour else 0.0,
+      "per_hour": per_hour,
+      "fill_by_level": {str(level): fill_by_level[level] for level in sorted(fill_by_level)},
+    }
+
+  def save_checkpoint(self):
+    path = checkpoint_path(self.market, self.checkpoint_dir)
+    os.makedirs(self.checkpoint_dir, exist_ok=True)
+    state = {
+      "saved_at": datetime.now(tz=timezone.utc).isoformat(),
+      "hours": {key: {**b, "level_usd": {str(k): v for k, v in b["level_usd"].items()}} for key, b in self.hours.items()},
+      "snapshot": self.snapshot(),
+    }
+    # Write-then-rename so a reader never sees a half-written file
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+      json.dump(state, f)
+    os.replace(tmp_path, path)
+
+  def load_checkpoint(self) -> bool:
+    try:
+      with open(checkpoint_path(self.market, self.checkpoint_dir)) as f:
+        state = json.load(f)
+    except (OSError, ValueError):
+      return False
+
+    self.hours = {
+      key: {**b, "level_usd": {int(k): v for k, v in b["level_usd"].items()}}
+      for key, b in state.get("hours", {}).items()
+    }
+    self._prune(datetime.now(tz=timezone.utc))
+    return True
+
+  async def consume_trades(self, queue):
+    while True:
+      self.on_trade(await queue.get())
+
+  async def run_checkpoints(self, interval: float = 60.0):
+    while True:
+      await asyncio.sleep(interval)
+      try:
+        self.save_checkpoint()
+      except OSError as e:
+        print(f"[ERROR] Failed to checkpoint fill stats for {self.market}: {e}")
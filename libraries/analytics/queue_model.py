@@ -0,0 +1,144 @@
+import bisect
+import json
+import math
+import os
+from datetime import datetime, timezone
+
+from libraries.models.orderbook import Orderbook
+
+MODEL_DIR = os.path.join("output", "queue_model")
+LEVELS = 5                               # book levels below (and including) the best bid the model covers
+HORIZONS = (5.0, 30.0, 120.0, 600.0)     # seconds; fill probabilities are tabulated for each
+QUANTILES = 101                          # points kept of each level's windowed flow distribution
+
+def model_path(market: str, directory: str = MODEL_DIR) -> str:
+  return os.path.join(directory, f"{market.replace('-', '')}.json")
+
+class QueueModel:
+  '''
+  Queue-position and fill-time model for resting bids on one market, fitted from recorded taker
+  sells and depth. The flow that reaches book level L is every sell printed at or below that
+  level's price: it is what works through a queue resting there, first the size ahead of us and
+  then our own order. fit() measures that flow per level over history with array operations,
+  as a mean rate and as the distribution of flow per window for each horizon; lookups against
+  the fitted tables are a division or a binary search, cheap enough for every requote.
+
+  A visible order joins the back of the visible queue at its price. A hidden order at the same
+  price fills only after every visible order there, ours included, so its queue ahead is the whole
+  visible size. Cancels ahead of us also move us up but aren't recorded, so estimates err long.
+  '''
+  def __init__(self, market: str, rates: list[float], horizons: list[float], flow_quantiles: list[list[list[float]]], seconds: float, fitted_at: str = ""):
+    self.market = market.replace('-', '')
+    self.rates = rates                      # per level: base amount per second reaching it
+    self.horizons = horizons
+    self.flow_quantiles = flow_quantiles    # per level, per horizon: sorted quantiles of the flow in a window that long
+    self.seconds = seconds                  # length of history fitted
+    self.fitted_at = fitted_at
+
+  @classmethod
+  def fit(
+    cls,
+    market: str,
+    sell_ts,
+    sell_price,
+    sell_amount,
+    book_ts,
+    book_bids,
+    start: float,
+    end: float,
+    horizons: tuple[float, ...] = HORIZONS,
+  ) -> "QueueModel":
+    """
+    Fits from NumPy arrays: taker sells (epoch seconds, price, amount) and depth snapshots (epoch
+    seconds, and a books x levels array of bid prices, best first, NaN where the book was shallower).
+    Both sorted by time. [start, end) is the span of history they cover, in epoch seconds.
+    """
+    import numpy as np
+
+    sell_ts = np.asarray(sell_ts, dtype=float)
+    book_bids = np.asarray(book_bids, dtype=float).reshape(len(book_ts), -1)
+    levels = book_bids.shape[1]
+    seconds = max(end - start, 1e-9)
+
+    # The book in force at each sell; sells before the first book can't be placed against a level
+    book = np.searchsorted(np.asarray(book_ts, dtype=float), sell_ts, side="right") - 1
+    known = book >= 0
+    level_prices = np.full((len(sell_ts), levels), np.nan)
+    level_prices[known] = book_bids[book[known]]
+    with np.errstate(invalid="ignore"):
+      reach = np.asarray(sell_amount, dtype=float)[:, None] * (np.asarray(sell_price, dtype=float)[:, None] <= level_prices)
+
+    rates = (reach.sum(axis=0) / seconds).tolist()
+    cumulative = np.vstack([np.zeros((1, levels)), np.cumsum(reach, axis=0)])
+    probs = np.linspace(0.0, 1.0, QUANTILES)
+    flow_quantiles: list[list[list[float]]] = [[] for _ in range(levels)]
+    for horizon in horizons:
+      # Overlapping windows every half horizon (at least every second) across the history
+      step = max(1.0, horizon / 2)
+      window_starts = np.arange(start, max(start, end - horizon) + 1e-9, step)
+      first = np.searchsorted(sell_ts, window_starts, side="left")
+      last = np.searchsorted(sell_ts, window_starts + horizon, side="left")
+      flows = cumulative[last] - cumulative[first]  # windows x levels
+      for level in range(levels):
+        flow_quantiles[level].append(np.quantile(flows[:, level], probs).tolist() if len(flows) else [0.0] * QUANTILES)
+
+    return cls(market, rates, list(horizons), flow_quantiles, seconds, datetime.now(tz=timezone.utc).isoformat())
+
+  @staticmethod
+  def book_level(orderbook: Orderbook, price: float) -> int:
+    """Level index our price queues at: how many book bid prices are better than it."""
+    return sum(1 for bid_price, _ in orderbook.bids if bid_price > price)
+
+  @staticmethod
+  def queue_ahead(orderbook: Orderbook, price: float, is_hide: bool, our_visible: float = 0.0) -> float:
+    """
+    Size that trades before our order at `price`. Visible joins behind the visible size there; hidden
+    waits for all of it plus our own visible order at that price.
+    """
+    visible = sum(size for bid_price, size in orderbook.bids if math.isclose(bid_price, price, rel_tol=1e-12))
+    return visible + our_visible if is_hide else visible
+
+  def _level(self, level: int) -> int:
+    # A level deeper than the model covers gets the deepest fitted one
+    return min(level, len(self.rates) - 1)
+
+  def expected_fill_seconds(self, level: int, queue_ahead: float, amount: float) -> float:
+    """Mean time for the flow reaching `level` to work through the queue ahead and our order; inf with no flow."""
+    rate = self.rates[self._level(level)]
+    return (queue_ahead + amount) / rate if rate > 0 else math.inf
+
+  def fill_probability(self, level: int, queue_ahead: float, amount: float, horizon: float) -> float:
+    """
+    Share of historical windows of `horizon` seconds (the nearest fitted one at or above it) in
+    which enough flow reached `level` to fill our order completely.
+    """
+    h = min(bisect.bisect_left(self.horizons, horizon), len(self.horizons) - 1)
+    quantiles = self.flow_quantiles[self._level(level)][h]
+    need = queue_ahead + amount
+    return (len(quantiles) - bisect.bisect_left(quantiles, need)) / len(quantiles)
+
+  def save(self, path: str | None = None):
+    path = path or model_path(self.market)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    state = {
+      "market": self.market,
+      "fitted_at": self.fitted_at,
+      "seconds": self.seconds,
+      "rates": self.rates,
+      "horizons": self.horizons,
+      "flow_quantiles": self.flow_quantiles,
+    }
+    # Write-then-rename so a strategy starting up never reads a half-written model
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+      json.dump(state, f)
+    os.replace(tmp_path, path)
+
+  @classmethod
+  def load(cls, market: str, path: str | None = None) -> "QueueModel | None":
+    try:
+      with open(path or model_path(market)) as f:
+        state = json.load(f)
+    except (OSError, ValueError):
+      return None
+    return cls(state["market"], state["rates"], state["horizons"], state["flow_quantiles"], state["seconds"], state.get("fitted_at", ""))
@@ -1,18 +1,62 @@
 from abc import ABC, abstractmethod
+from dataclasses import replace
+from datetime import datetime, timezone
 from typing import Optional, List
 from websockets.asyncio.client import ClientConnection
 import asyncio
+import time
+import traceback
 
+from libraries.data_ingestion.fan_out import Backpressure, Subscription, Topic
+from libraries.data_ingestion.reconnect import Backoff, ROLLOVER_SECONDS, HEALTHY_CONNECTION_SECONDS
 from libraries.models.bba import BBA
+from libraries.models.gap_event import GapEvent
+from libraries.models.orderbook import Orderbook
 from libraries.models.trade import Trade
+from libraries.monitoring.feed_health import FeedHealth
 
 class BaseDataFeed(ABC):
   exchange: str
   pair: str
   ws_url: str
   ws: Optional[ClientConnection]
-  bba_queue: asyncio.Queue[BBA]
-  trade_queue: asyncio.Queue[Trade]
+  topics: dict[str, Topic]  # stream name ("bba", "trades", "orderbook", "gaps", ...) -> fan-out buffer
+  gap: Optional[GapEvent]
+  last_msg_time: float  # epoch seconds; a float stamp is far cheaper per frame than datetime.now
+  health: FeedHealth
+
+  def _init_topics(self, *names: str):
+    self.topics = {name: Topic(f"{self.exchange} {self.pair} {name}") for name in names}
+
+  def subscribe(self, topic: str, name: str, policy: Backpressure = Backpressure.DROP_OLDEST) -> Subscription:
+    """
+    An independent reader of one of this feed's streams. Every subscriber sees every update from one
+    shared buffer, so adding a consumer doesn't add a connection or copy messages.
+    """
+    return self.topics[topic].subscribe(name, policy)
+
+  def _default_subscription(self, topic: str) -> Subscription:
+    # Starts at the oldest buffered item, so what was published before the consumer attached isn't lost
+    return self.topics[topic].subscribe("default", Backpressure.LOSSLESS, from_oldest=True)
+
+  # Queue-like default readers in place of the old unbounded per-stream queues, and lossless like
+  # them: the recorder stores every row even when it falls behind. Two consumers sharing one of
+  # these split the stream between them; each should subscribe() under its own name instead.
+  @property
+  def bba_queue(self) -> Subscription[BBA]:
+    return self._default_subscription("bba")
+
+  @property
+  def trade_queue(self) -> Subscription[Trade]:
+    return self._default_subscription("trades")
+
+  @property
+  def orderbook_queue(self) -> Subscription[Orderbook]:
+    return self._default_subscription("orderbook")
+
+  @property
+  def gap_queue(self) -> Subscription[GapEvent]:
+    return self._default_subscription("gaps")
 
   @abstractmethod
   async def run(self):
@@ -23,3 +67,110 @@ class BaseDataFeed(ABC):
   async def _ping(self):
     """Creates loop that sends ping to WebSocket. Return True if response sent back."""
     pass
+
+  @abstractmethod
+  async def _open_connection(self) -> ClientConnection:
+    """Connects a new websocket and subscribes every channel on it. Raises if either step fails."""
+    pass
+
+  @abstractmethod
+  async def _streamer(self, ws: ClientConnection):
+    """Reads frames from ws and publishes them until the connection closes."""
+    pass
+
+  def _open_gap(self, reason: str):
+    self.health.connected = False
+    if self.gap:
+      return
+
+    self.gap = GapEvent(
+      exchange = self.exchange,
+      market = self.pair,
+      started_at = datetime.fromtimestamp(self.last_msg_time, tz=timezone.utc),
+      ended_at = None,
+      reason = reason,
+    )
+    self.topics["gaps"].publish(self.gap)
+
+  def _close_gap(self):
+    if not self.gap:
+      return
+
+    closed = replace(self.gap, ended_at=datetime.now(tz=timezone.utc))
+    self.gap = None
+    print(f"[INFO {self.exchange}] Feed resumed after {(closed.ended_at - closed.started_at).total_seconds():.2f}s gap") # type: ignore[operator]
+    self.topics["gaps"].publish(closed)
+
+  async def _rollover(self, reader_task: asyncio.Task) -> asyncio.Task:
+    """
+    Make-before-break swap: subscribe a standby connection while the current one keeps streaming,
+    then move the reader over and close the old socket. Frames both sockets deliver during the
+    overlap are dropped by each feed's sequence guards.
+    """
+    try:
+      standby = await self._open_connection()
+    except Exception as e:
+      print(f"[ERROR {self.exchange}] Standby connection failed, keeping current one: {e}")
+      return reader_task
+
+    old_ws = self.ws
+    self.ws = standby
+    new_reader_task = asyncio.create_task(self._streamer(standby))
+    reader_task.cancel()
+    if old_ws:
+      await old_ws.close()
+    print(f"[INFO {self.exchange}] Rolled over to standby connection")
+    return new_reader_task
+
+  async def _run_with_reconnect(self):
+    """
+    Keeps a subscribed connection streaming forever. Every ROLLOVER_SECONDS the connection is
+    swapped for a pre-warmed standby, and unexpected failures reconnect with jittered backoff,
+    publishing a GapEvent on the gaps topic when the outage starts and again when it ends.
+    """
+    backoff = Backoff()
+    while True:
+      if not self.ws:
+        try:
+          self.ws = await self._open_connection()
+        except Exception as e:
+          delay = backoff.next_delay()
+          print(f"[ERROR {self.exchange}] Failed to connect or subscribe: {e}, retrying in {delay:.2f}s")
+          await asyncio.sleep(delay)
+          continue
+        self.health.connected = True
+        self._close_gap()
+
+      connected_at = time.monotonic()
+      ping_task = asyncio.create_task(self._ping())
+      reader_task = asyncio.create_task(self._streamer(self.ws))
+
+      try:
+        while True:
+          done, _ = await asyncio.wait(
+            [ping_task, reader_task],
+            timeout=ROLLOVER_SECONDS,
+            return_when=asyncio.FIRST_COMPLETED
+          )
+          if done:
+            break
+          reader_task = await self._rollover(reader_task)
+
+        for task in done:
+          exc = task.exception()
+          if exc:
+            print(f"[ERROR {self.exchange}] Task failed with: {exc}")
+            traceback.print_exception(type(exc), exc, exc.__traceback__)
+        self._open_gap("connection lost")
+
+      finally:
+        print(f"[INFO {self.exchange}] Reconnecting WebSocket...")
+        ping_task.cancel()
+        reader_task.cancel()
+        if self.ws:
+          await self.ws.close()
+        self.ws = None
+
+      if time.monotonic() - connected_at > HEALTHY_CONNECTION_SECONDS:
+        backoff.reset()
+      await asyncio.sleep(backoff.next_delay())
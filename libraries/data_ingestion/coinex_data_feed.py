@@ -3,16 +3,23 @@ import websockets
 import asyncio
 from datetime import datetime, timezone
 import gzip
+import time
 from typing import override
-import traceback
+from websockets.asyncio.client import ClientConnection
 
 from libraries.data_ingestion.base_data_feed import BaseDataFeed
+from libraries.data_ingestion.reconnect import SUBSCRIBE_TIMEOUT_SECONDS
 from libraries.models.bba import BBA
+from libraries.models.gap_event import GapEvent
 from libraries.models.side import Side
 from libraries.models.trade import Trade
 from libraries.models.orderbook import Orderbook
+from libraries.monitoring.feed_health import FeedHealth
+from libraries.monitoring.latency_tracer import tracer
+from utils.fixed_point import str_to_ticks
 
 COINEX_WS = "wss://socket.coinex.com/v2/spot"
+PING_INTERVAL_SECONDS = 20
 
 class CoinexDataFeed(BaseDataFeed):
   '''
@@ -20,98 +27,84 @@ class CoinexDataFeed(BaseDataFeed):
   All you need to do is call the run function as a background task and whenever you need the best_bid call the get_best_bid getter.
   (Or manually access the BBA object)
   '''
-  def __init__(self, pair: str):
+  def __init__(self, pair: str, price_precision: int | None = None, ws_url: str = COINEX_WS):
     self.exchange = "CoinEx"
     self.pair = pair.replace('-', '')
-    self.ws_url = COINEX_WS
+    # With the market's price precision, BBAs also carry exact integer tick prices
+    self.price_precision = price_precision
+    # Overridable so the feed can run against a local stand-in (mock_exchanges.coinex_ws)
+    self.ws_url = ws_url
     self.ws = None
-    self.bba_queue: asyncio.Queue[BBA] = asyncio.Queue()
-    self.trade_queue: asyncio.Queue[Trade] = asyncio.Queue()
-    self.orderbook_queue: asyncio.Queue[Orderbook] = asyncio.Queue()
-    self.last_msg_time = datetime.now(tz=timezone.utc)
-
-  async def _connect_websocket(self):
-    try:
-      self.ws = None
-      self.ws = await websockets.connect(uri=self.ws_url, compression=None, ping_interval=None)
-      print(f"[CONNECTED {self.exchange}] Connected to WS")
-      return True
-
-    except Exception as e:
-      print(f"[ERROR {self.exchange}] Failed to connect to CoinEx WS or subscribe to BBA channel: {e}")
-      return False
-
-  async def _subscribe_bba(self) -> bool:
-    if not self.ws:
-      await self._connect_websocket()
-
-    sub_msg = {
-      "method": "bbo.subscribe",
-      "params": {
-        "market_list": [self.pair]
-      },
-      "id": 1
+    self._init_topics("bba", "trades", "orderbook", "gaps")
+    self.gap: GapEvent | None = None
+    self.last_msg_time = time.time()
+    # Pongs arrive at least every ping interval, so a socket silent for longer than that is dead
+    self.health = FeedHealth(self.exchange, self.pair, stale_after_seconds=PING_INTERVAL_SECONDS * 1.5)
+
+    # Sequence guards: a standby connection replays the latest state on subscribe, so anything behind
+    # what was already published is dropped, and so is a repeat of it at the same timestamp. Distinct
+    # updates within one millisecond are common, so a timestamp alone can't mark a replay
+    self._last_bba_ms = 0
+    self._last_bba_payload: dict | None = None
+    self._last_depth_ms = 0
+    self._last_depth_payload: dict | None = None
+    self._last_deal_id = 0
+
+    # Built once so dispatch is a single dict lookup per frame
+    self._handlers = {
+      "bbo.update": self._stream_bba,
+      "deals.update": self._stream_trades,
+      "depth.update": self._stream_depth,
     }
 
-    try:
-      if self.ws:
-        await self.ws.send(json.dumps(sub_msg))
-        await self.ws.recv()
-        print(f"[SUBSCRIBED {self.exchange}] Subscribed to BBA channel")
-        return True
-
-    except Exception as e:
-      print(f"[ERROR {self.exchange}] Failed to connect to CoinEx WS or subscribe to BBA channel: {e}")
-      return False
+  def _subscriptions(self) -> list[tuple[str, dict]]:
+    return [
+      ("bbo.subscribe", {"market_list": [self.pair]}),
+      ("deals.subscribe", {"market_list": [self.pair]}),
+      ("depth.subscribe", {"market_list": [[self.pair, 5, "0", True]]}),  # 5 levels, no price merge, full depth
+    ]
 
-    print("Shouldn't get here")
-    return False
-
-  async def _subscribe_trades(self) -> bool:
-    if not self.ws:
-      await self._connect_websocket()
-
-    sub_msg = {
-      "method": "deals.subscribe",
-      "params": {
-        "market_list": [self.pair]
-      },
-      "id": 1
-    }
-
-    try:
-      if self.ws:
-        await self.ws.send(json.dumps(sub_msg))
-        await self.ws.recv()
-      print(f"[SUBSCRIBED {self.exchange}] Subscribed to Trades channel")
-      return True
-
-    except Exception as e:
-      print(f"[ERROR {self.exchange}] Failed to connect to CoinEx WS or subscribe to Trades channel: {e}")
-      return False
-
-  async def _subscribe_depth(self) -> bool:
-    if not self.ws:
-      await self._connect_websocket()
-
-    sub_msg = {
-      "method": "depth.subscribe",
-      "params": {
-        "market_list": [[self.pair, 5, "0", True]]  # 10 levels, no price merge, full depth
-      },
-      "id": 1
-    }
+  def _decode(self, raw) -> dict:
+    if isinstance(raw, str):
+      return json.loads(raw)
+    return json.loads(gzip.decompress(raw).decode('utf-8'))
 
+  @override
+  async def _open_connection(self) -> ClientConnection:
+    ws = await websockets.connect(uri=self.ws_url, compression=None, ping_interval=None)
+    print(f"[CONNECTED {self.exchange}] Connected to WS")
     try:
-      if self.ws:
-        await self.ws.send(json.dumps(sub_msg))
-        await self.ws.recv()
-      print(f"[SUBSCRIBED {self.exchange}] Subscribed to Depth channel")
-      return True
-
-    except Exception as e:
-      print(f"[ERROR {self.exchange}] Failed to subscribe to Depth channel: {e}")
-      return False
+      await self._subscribe_all(ws)
+    except BaseException:
+      await ws.close()
+      raise
+    return ws
+
+  async def _subscribe_all(self, ws: ClientConnection):
+    """
+    Pipelines every subscription: all requests go out back to back, then acks are matched by id.
+    Data frames that arrive before the last ack are dispatched as normal.
+    """
+    pending: dict[int, str] = {}
+    for req_id, (method, params) in enumerate(self._subscriptions(), start=1):
+      pending[req_id] = method
+      await ws.send(json.dumps({"method": method, "params": params, "id": req_id}))
+
+    async with asyncio.timeout(SUBSCRIBE_TIMEOUT_SECONDS):
+      while pending:
+        data = self._decode(await ws.recv())
+        if data.get("method"):
+          self.last_msg_time = time.time()
+          self.health.on_frame()
+          await self._dispatch(data)
+          continue
+
+        method = pending.pop(data.get("id"), None)
+        if method is None:
+          continue
+        if data.get("code") != 0:
+          raise RuntimeError(f"{method} rejected: {data.get('message')}")
+        print(f"[SUBSCRIBED {self.exchange}] Subscribed via {method}")
 
   @override
   async def _ping(self):
@@ -128,33 +121,39 @@ class CoinexDataFeed(BaseDataFeed):
       await self.ws.send(json.dumps(payload))
       json_id += 1   # avoid re-using the same ID
 
-      await asyncio.sleep(20)
+      await asyncio.sleep(PING_INTERVAL_SECONDS)
 
-  async def _streamer(self):
-    if not self.ws:
-      print("[ERROR] No CoinEx Websocket connection found")
+  @override
+  async def _streamer(self, ws: ClientConnection):
+    async for raw in ws:
+      recv_ns = time.perf_counter_ns()
+      self.last_msg_time = time.time()
+      self.health.on_frame()
+      data = self._decode(raw)
+      tracer.since("coinex.decode", recv_ns)
+      await self._dispatch(data, recv_ns)
+
+  async def _dispatch(self, data: dict, recv_ns: int = 0):
+    handler = self._handlers.get(data.get("method"))
+    if handler:
+      await handler(data, recv_ns)
+
+  async def _stream_bba(self, data, recv_ns: int = 0):
+    payload = data.get("data")
+    updated_at = int(payload.get("updated_at"))
+    if updated_at < self._last_bba_ms or (updated_at == self._last_bba_ms and payload == self._last_bba_payload):
       return
+    self._last_bba_ms, self._last_bba_payload = updated_at, payload
+    self.health.on_update(updated_at)
+    tracer.record("coinex.exchange_to_recv", time.time_ns() - updated_at * 1_000_000)
 
-    async for raw in self.ws:
-      self.last_msg_time = datetime.now(tz=timezone.utc)
-      if isinstance(raw, str):
-        continue
-      decompressed = gzip.decompress(raw).decode('utf-8')
-      data = json.loads(decompressed)
-      if data.get("method") == "bbo.update":
-        await self._stream_bba(data)
-      elif data.get("method") == "deals.update":
-        await self._stream_trades(data)
-      elif data.get("method") == "depth.update":
-        await self._stream_depth(data)
-
-  async def _stream_bba(self, data):
-    payload = data.get("data")
-    unix_ts = float(payload.get("updated_at"))
+    unix_ts = float(updated_at)
     ts = datetime.fromtimestamp(unix_ts / 1000, tz=timezone.utc)
-    best_bid_price = float(payload.get("best_bid_price"))
+    raw_bid_price = payload.get("best_bid_price")
+    raw_ask_price = payload.get("best_ask_price")
+    best_bid_price = float(raw_bid_price)
     best_bid_size = float(payload.get("best_bid_size"))
-    best_ask_price = float(payload.get("best_ask_price"))
+    best_ask_price = float(raw_ask_price)
     best_ask_size = float(payload.get("best_ask_size"))
 
     bba = BBA(
@@ -164,15 +163,28 @@ class CoinexDataFeed(BaseDataFeed):
       best_bid_size = best_bid_size,
       best_ask_price = best_ask_price,
       best_ask_size = best_ask_size,
+      recv_ns = recv_ns,
     )
+    if self.price_precision is not None:
+      bba.best_bid_ticks = str_to_ticks(raw_bid_price, self.price_precision)
+      bba.best_ask_ticks = str_to_ticks(raw_ask_price, self.price_precision)
 
-    await self.bba_queue.put(bba)
+    self.topics["bba"].publish(bba)
+    tracer.since("coinex.bba_recv_to_queue_put", recv_ns)
 
-  async def _stream_trades(self, data):
+  async def _stream_trades(self, data, recv_ns: int = 0):
     payload = data.get("data")
     market = payload["market"]
+    last_deal_id = self._last_deal_id
+    trades = self.topics["trades"]
     for trade in payload["deal_list"]:
+      deal_id = int(trade["deal_id"])
+      if deal_id <= last_deal_id:
+        continue
+      self._last_deal_id = max(self._last_deal_id, deal_id)
+
       unix_ts = float(trade["created_at"])
+      self.health.on_update(int(trade["created_at"]))
       ts = datetime.fromtimestamp(unix_ts / 1000, tz=timezone.utc)
       taker_side = Side.BUY if trade["side"] == 'buy' else Side.SELL
       price = float(trade["price"])
@@ -186,12 +198,19 @@ class CoinexDataFeed(BaseDataFeed):
         amount = amount
       )
 
-      await self.trade_queue.put(trade)
+      trades.publish(trade)
+    tracer.since("coinex.trades_recv_to_queue_put", recv_ns)
 
-  async def _stream_depth(self, data):
+  async def _stream_depth(self, data, recv_ns: int = 0):
     payload = data.get("data")
     depth = payload.get("depth")
-    unix_ts = float(depth["updated_at"])
+    updated_at = int(depth["updated_at"])
+    if updated_at < self._last_depth_ms or (updated_at == self._last_depth_ms and payload == self._last_depth_payload):
+      return
+    self._last_depth_ms, self._last_depth_payload = updated_at, payload
+    self.health.on_update(updated_at)
+
+    unix_ts = float(updated_at)
     ts = datetime.fromtimestamp(unix_ts / 1000, tz=timezone.utc)
     market = payload.get("market")
 
@@ -205,46 +224,13 @@ class CoinexDataFeed(BaseDataFeed):
       asks=asks,
     )
 
-    await self.orderbook_queue.put(orderbook)
+    self.topics["orderbook"].publish(orderbook)
+    tracer.since("coinex.depth_recv_to_queue_put", recv_ns)
 
   @override
   async def run(self):
-    """Connect, then keep reading & pinging until the socket dies then reconnects."""
-    while True:
-      # Sub to websockets
-      success_bba = await self._subscribe_bba()
-      success_trades = await self._subscribe_trades()
-      success_depth = await self._subscribe_depth()
-
-      if not success_bba or not success_trades or not success_depth:
-        raise RuntimeError(f"[FATAL {self.exchange}] Failed to subscribe to required channels")
-
-      # Create background tasks
-      ping_task = asyncio.create_task(self._ping())
-      reader_task = asyncio.create_task(self._streamer())
-
-      # Run for one hour or until task fails, then restart
-      try:
-        done, _ = await asyncio.wait(
-          [ping_task, reader_task],
-          timeout=3600,
-          return_when=asyncio.FIRST_EXCEPTION
-        )
-
-        for task in done:
-          if task.exception():
-            print(f"[ERROR {self.exchange}] Task failed with: {task.exception()}")
-            exc = task.exception()
-            if exc:
-              traceback.print_exception(type(exc), exc, exc.__traceback__)
-      finally:
-        print(f"[INFO {self.exchange}] Reconnecting WebSocket...")
-        if self.ws:
-          await self.ws.close() # type: ignore[optional]
-        self.ws = None
-        ping_task.cancel()
-        reader_task.cancel()
-        await asyncio.sleep(2)
+    """Connect, then keep reading & pinging, rolling over to a standby connection hourly and reconnecting on failure."""
+    await self._run_with_reconnect()
 
 async def consume_bba(queue):
   while True:
@@ -0,0 +1,46 @@
+import hashlib
+import hmac
+import time
+from typing import override
+
+from libraries.data_ingestion.coinex_data_feed import COINEX_WS, CoinexDataFeed
+from libraries.data_ingestion.fan_out import Subscription
+from libraries.models.coinex_order_data import CoinexOrderData
+
+class CoinexPrivateFeed(CoinexDataFeed):
+  '''
+  Authenticated CoinEx stream for our own order updates. Reuses the public feed's connection,
+  ping and reconnect handling; only the subscriptions and handlers differ.
+  Each update is published on the order_updates topic (read through order_update_queue) as (event, CoinexOrderData), where event is
+  one of put, update, modify or finish.
+  '''
+  def __init__(self, pair: str, access_id: str, secret_key: str, ws_url: str = COINEX_WS):
+    super().__init__(pair, ws_url=ws_url)
+    self.exchange = "CoinEx-private"
+    self.health.exchange = self.exchange
+    self.access_id = access_id
+    self.secret_key = secret_key
+    self._init_topics("order_updates", "gaps")
+    self._handlers = {
+      "order.update": self._stream_order,
+    }
+
+  @property
+  def order_update_queue(self) -> Subscription[tuple[str, CoinexOrderData]]:
+    return self._default_subscription("order_updates")
+
+  @override
+  def _subscriptions(self) -> list[tuple[str, dict]]:
+    # Requests on one connection are handled in order, so the sign completes before the subscribe
+    ts = int(time.time() * 1000)
+    signed_str = hmac.new(self.secret_key.encode("latin-1"), str(ts).encode("latin-1"), hashlib.sha256).hexdigest().lower()
+    return [
+      ("server.sign", {"access_id": self.access_id, "signed_str": signed_str, "timestamp": ts}),
+      ("order.subscribe", {"market_list": [self.pair]}),
+    ]
+
+  async def _stream_order(self, data, recv_ns: int = 0):
+    payload = data.get("data")
+    order = CoinexOrderData.from_dict(payload["order"])
+    self.health.on_update(order.updated_at or None)
+    self.topics["order_updates"].publish((payload["event"], order))
@@ -0,0 +1,142 @@
+import asyncio
+from enum import Enum
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_CAPACITY = 4096
+
+class Backpressure(Enum):
+  DROP_OLDEST = "drop_oldest"  # a subscriber that falls a full buffer behind skips to the oldest retained item
+  LATEST = "latest"            # a subscriber only ever sees the newest item, skipping whatever it missed
+  LOSSLESS = "lossless"        # the buffer grows rather than let this subscriber miss an item
+
+class Topic(Generic[T]):
+  '''
+  One stream of a feed (BBA, trades, depth, gaps) published once into a ring buffer and read by any
+  number of subscriptions, each holding nothing but a cursor into it. Publishing never waits on
+  subscribers: one that falls more than `capacity` items behind loses the oldest, so a slow consumer
+  can't stall the socket reader. The exception is a LOSSLESS subscriber (recorders, order updates),
+  for which the buffer doubles instead, trading memory for completeness as an unbounded queue would.
+  Callbacks run inline on publish for consumers that only need to look at each item.
+  '''
+  def __init__(self, name: str, capacity: int = DEFAULT_CAPACITY):
+    self.name = name
+    self.capacity = capacity
+    self._buffer: list[T | None] = [None] * capacity
+    self.next_seq = 0  # sequence number the next published item gets
+    self._waiters: list[asyncio.Future] = []
+    self._subscriptions: dict[str, Subscription[T]] = {}
+    self._lossless: list[Subscription[T]] = []
+    self._callbacks: list[Callable[[T], None]] = []
+
+  @property
+  def oldest_seq(self) -> int:
+    return max(0, self.next_seq - self.capacity)
+
+  def publish(self, item: T):
+    if self._lossless and self.next_seq - min(s.cursor for s in self._lossless) >= self.capacity:
+      self._grow()
+    self._buffer[self.next_seq % self.capacity] = item
+    self.next_seq += 1
+
+    for callback in self._callbacks:
+      try:
+        callback(item)
+      except Exception as e:
+        print(f"[ERROR] {self.name} subscriber callback failed: {e}")
+
+    if self._waiters:
+      waiters, self._waiters = self._waiters, []
+      for waiter in waiters:
+        if not waiter.done():
+          waiter.set_result(None)
+
+  def _grow(self):
+    capacity = self.capacity * 2
+    buffer: list[T | None] = [None] * capacity
+    for seq in range(self.oldest_seq, self.next_seq):
+      buffer[seq % capacity] = self._buffer[seq % self.capacity]
+    self._buffer, self.capacity = buffer, capacity
+    laggard = min(self._lossless, key=lambda s: s.cursor)
+    print(f"[WARN] {self.name} buffer grown to {capacity} items, {laggard.name} is {self.next_seq - laggard.cursor} behind")
+
+  def item(self, seq: int) -> T:
+    return self._buffer[seq % self.capacity]  # type: ignore[return-value]
+
+  def subscribe(self, name: str, policy: Backpressure = Backpressure.DROP_OLDEST, from_oldest: bool = False) -> "Subscription[T]":
+    """
+    New cursor over this topic. It sees items published from now on, or everything still in the
+    buffer with from_oldest. Subscribing again under the same name returns the existing cursor.
+    """
+    if name not in self._subscriptions:
+      subscription = Subscription(self, name, policy, self.oldest_seq if from_oldest else self.next_seq)
+      self._subscriptions[name] = subscription
+      if policy == Backpressure.LOSSLESS:
+        self._lossless.append(subscription)
+    return self._subscriptions[name]
+
+  def unsubscribe(self, subscription: "Subscription[T]"):
+    if self._subscriptions.pop(subscription.name, None) is not None and subscription in self._lossless:
+      self._lossless.remove(subscription)
+
+  def add_callback(self, callback: Callable[[T], None]):
+    self._callbacks.append(callback)
+
+  def remove_callback(self, callback: Callable[[T], None]):
+    self._callbacks.remove(callback)
+
+  def subscriptions(self) -> list["Subscription[T]"]:
+    return list(self._subscriptions.values())
+
+  async def _wait(self):
+    waiter = asyncio.get_running_loop().create_future()
+    self._waiters.append(waiter)
+    await waiter
+
+class Subscription(Generic[T]):
+  '''
+  A subscriber's cursor into a Topic. Reads like an asyncio.Queue (get, get_nowait, qsize, empty),
+  but only a LOSSLESS subscription keeps the old per-stream queues' guarantee of seeing every item;
+  the others count what they skip in `dropped`.
+  '''
+  def __init__(self, topic: Topic[T], name: str, policy: Backpressure, cursor: int):
+    self.topic = topic
+    self.name = name
+    self.policy = policy
+    self.cursor = cursor
+    self.dropped = 0  # items this subscriber never saw because it fell behind (or skipped them, for LATEST)
+
+  def qsize(self) -> int:
+    return min(self.topic.next_seq - self.cursor, self.topic.capacity)
+
+  def empty(self) -> bool:
+    return self.cursor >= self.topic.next_seq
+
+  def get_nowait(self) -> T:
+    topic = self.topic
+    if self.cursor >= topic.next_seq:
+      raise asyncio.QueueEmpty
+
+    if self.policy == Backpressure.LATEST:
+      skip_to = topic.next_seq - 1
+    else:
+      skip_to = max(self.cursor, topic.oldest_seq)
+    self.dropped += skip_to - self.cursor
+
+    self.cursor = skip_to + 1
+    return topic.item(skip_to)
+
+  async def get(self) -> T:
+    while self.cursor >= self.topic.next_seq:
+      await self.topic._wait()
+    return self.get_nowait()
+
+  def close(self):
+    self.topic.unsubscribe(self)
+
+  def __aiter__(self):
+    return self
+
+  async def __anext__(self) -> T:
+    return await self.get()
@@ -2,110 +2,219 @@ from datetime import datetime, timezone
 import websockets
 import json
 import asyncio
+import time
 from typing import override, Optional
+from websockets.asyncio.client import ClientConnection
 
 from libraries.models.bba import BBA
+from libraries.models.gap_event import GapEvent
+from libraries.models.orderbook import Orderbook
+from libraries.models.side import Side
+from libraries.models.trade import Trade
 from libraries.data_ingestion.base_data_feed import BaseDataFeed
-from protos.PushDataV3ApiWrapper_pb2 import PushDataV3ApiWrapper # type: ignore
+from libraries.data_ingestion.reconnect import SUBSCRIBE_TIMEOUT_SECONDS
+from libraries.monitoring.feed_health import FeedHealth
 
 MEXC_WS = "wss://wbs-api.mexc.com/ws"
-PARTIAL_DEPTH_WS_ENDPOINT = "spot@public.aggre.bookTicker.v3.api.pb@100ms"
+BOOK_TICKER_WS_ENDPOINT = "spot@public.aggre.bookTicker.v3.api.pb@100ms"
+DEALS_WS_ENDPOINT = "spot@public.aggre.deals.v3.api.pb@100ms"
+LIMIT_DEPTH_WS_ENDPOINT = "spot@public.limit.depth.v3.api.pb"
+DEPTH_LEVELS = 5
+PING_INTERVAL_SECONDS = 10
+TRADE_TYPE_BUY = 1  # PublicAggreDealsV3ApiItem.tradeType: 1 taker buy, 2 taker sell
+
+_wrapper_type = None
+
+def _push_wrapper_type():
+  """
+  The generated wrapper class, imported on first use: it pulls in every protos/*_pb2 module and the
+  protobuf runtime, which processes that only import this module for its types shouldn't pay for.
+  """
+  global _wrapper_type
+  if _wrapper_type is None:
+    from google.protobuf.internal import api_implementation
+    from protos.PushDataV3ApiWrapper_pb2 import PushDataV3ApiWrapper # type: ignore
+    backend = api_implementation.Type()
+    if backend == "python":
+      print("[WARN MexC] protobuf is running its pure-Python backend, decoding will be several times slower; install the protobuf wheel for this platform (upb)")
+    elif backend != "upb":
+      print(f"[INFO MexC] protobuf backend: {backend}")
+    _wrapper_type = PushDataV3ApiWrapper
+  return _wrapper_type
 
 class MexcDataFeed(BaseDataFeed):
-  def __init__(self, pair: str):
+  '''
+  MEXC protobuf stream for one pair, publishing on the same topics as CoinexDataFeed: BBA with
+  sizes from the aggregated book ticker, taker trades from aggregated deals and the top
+  DEPTH_LEVELS of the book. Consumers await bba_queue / trade_queue / orderbook_queue (or their
+  own subscribe()) exactly as they do for CoinEx.
+  '''
+  def __init__(self, pair: str, ws_url: str = MEXC_WS):
     self.exchange = "MexC"
-    self.ws_url = MEXC_WS
+    # Overridable so the feed can run against a local stand-in (mock_exchanges.mexc_ws)
+    self.ws_url = ws_url
     self.pair = pair.replace('-', '')
     self.ws = None
-    self.bba: BBA | None = None
-
-  async def _subscribe_depth(self) -> bool:
-    channel = f"{PARTIAL_DEPTH_WS_ENDPOINT}@{self.pair}"
-    sub_msg = {"method": "SUBSCRIPTION", "params": [channel]}
+    self._init_topics("bba", "trades", "orderbook", "gaps")
+    self.gap: GapEvent | None = None
+    self.last_msg_time = time.time()
+    # PONG replies arrive at least every ping interval, so a socket silent for longer than that is dead
+    self.health = FeedHealth(self.exchange, self.pair, stale_after_seconds=PING_INTERVAL_SECONDS * 1.5)
+
+    # One wrapper message parsed into for every frame; ParseFromString clears it first
+    self._msg = None
+
+    # Sequence guards on the wrapper's sendTime per channel, so the standby connection's first
+    # frames can't go backwards or publish anything twice. Quotes and depth can change several times
+    # within one millisecond, so those are only dropped as replays when their content repeats too
+    self._last_bba_ms = 0
+    self._last_bba_quote: tuple[str, str, str, str] | None = None
+    self._last_deals_ms = 0
+    self._last_depth_ms = 0
+    self._last_depth_levels: tuple[list, list] | None = None
+
+    # Keyed by the wrapper's oneof body field, so dispatch is a WhichOneof and one dict lookup
+    # without decoding the channel string
+    self._handlers = {
+      "publicAggreBookTicker": self._stream_bba,
+      "publicAggreDeals": self._stream_trades,
+      "publicLimitDepths": self._stream_depth,
+    }
+
+  def _channels(self) -> list[str]:
+    return [
+      f"{BOOK_TICKER_WS_ENDPOINT}@{self.pair}",
+      f"{DEALS_WS_ENDPOINT}@{self.pair}",
+      f"{LIMIT_DEPTH_WS_ENDPOINT}@{self.pair}@{DEPTH_LEVELS}",
+    ]
 
+  @override
+  async def _open_connection(self) -> ClientConnection:
+    ws = await websockets.connect(self.ws_url, ping_interval=None)
     try:
-      self.ws = await websockets.connect(self.ws_url, ping_interval=None)
-      await self.ws.send(json.dumps(sub_msg))
-      return True
+      await self._subscribe_all(ws)
+    except BaseException:
+      await ws.close()
+      raise
+    return ws
+
+  async def _subscribe_all(self, ws: ClientConnection):
+    """Subscribes every channel in a single request and waits for the JSON ack, dispatching any data frames meanwhile."""
+    channels = self._channels()
+    await ws.send(json.dumps({"method": "SUBSCRIPTION", "params": channels}))
+
+    async with asyncio.timeout(SUBSCRIBE_TIMEOUT_SECONDS):
+      while True:
+        raw = await ws.recv()
+        self.health.on_frame()
+        if isinstance(raw, bytes):
+          self.last_msg_time = time.time()
+          self._handle_frame(raw)
+          continue
 
-    except Exception as e:
-      print(f"[ERROR] Failed to connect or subscribe: {e}")
-      return False
+        ack = json.loads(raw)
+        if ack.get("code") != 0 or "Not Subscribed" in str(ack.get("msg")):
+          raise RuntimeError(f"Subscription rejected: {ack}")
+        print(f"[SUBSCRIBED {self.exchange}] Subscribed to {', '.join(channels)}")
+        return
 
   @override
   async def _ping(self):
-    async def ping_event() -> bool:
+    while True:
+      await asyncio.sleep(PING_INTERVAL_SECONDS)
       if not self.ws:
         print("[ERROR] No Websocket connection found in _ping")
-        return False
-
-      ping_msg = {"method": "PING"}
-      try:
-        await self.ws.send(json.dumps(ping_msg))
-      except websockets.ConnectionClosed as e:
-        # this will tell you what the server sent (or None/None if it was unclean)
-        print(f"[INFO] WebSocket closed — code: {e.code!r}, reason: {e.reason!r}")
-      return True
-
-    while True:
-      await asyncio.sleep(10)
-      ok = await ping_event()
-      if not ok:
-        print("[PING LOOP] websocket closed, stopping ping loop")
-        break
-
-  async def _update_bba(self):
-    if not self.ws:
-      print("[ERROR] No websocket connection when streaming bba")
-      return None
-
-    async with self.ws as ws:
-      async for raw in ws:
-        # If we get a json response skip it
-        if isinstance(raw, str):
-          continue
+        return
 
-        try:
-          msg = PushDataV3ApiWrapper()
-          msg.ParseFromString(raw)
-        except Exception as e:
-          print(f"[ERROR] Ignoring non‐protobuf frame: {e}")
-          continue
+      # A closed socket raises here, which ends the task and triggers a reconnect
+      await self.ws.send(json.dumps({"method": "PING"}))
 
-        pb = msg.publicAggreBookTicker
-        bid = float(pb.bidPrice)
-        ask = float(pb.askPrice)
-        self.bba = BBA(
-            ts = datetime.now(timezone.utc),
-            market = self.pair,
-            best_bid_price=bid,
-            best_bid_size=0,
-            best_ask_price=ask,
-            best_ask_size=0
-        )
+  @override
+  async def _streamer(self, ws: ClientConnection):
+    async for raw in ws:
+      self.health.on_frame()
+      # If we get a json response skip it
+      if isinstance(raw, str):
+        continue
+      self.last_msg_time = time.time()
+      self._handle_frame(raw)
+
+  def _handle_frame(self, raw: bytes):
+    msg = self._msg
+    if msg is None:
+      msg = self._msg = _push_wrapper_type()()
+    try:
+      msg.ParseFromString(raw)
+    except Exception as e:
+      print(f"[ERROR] Ignoring non‐protobuf frame: {e}")
+      return
+
+    body = msg.WhichOneof("body")
+    handler = self._handlers.get(body) # type: ignore[arg-type]
+    if handler is None:
+      return
+    # Handlers copy what they need out of the body; it is overwritten by the next frame
+    handler(getattr(msg, body), msg.sendTime) # type: ignore[arg-type]
+
+  def _ts(self, ms: int) -> datetime:
+    # Stamp with MEXC's time so consumers can tell how old the update is; fall back to local time
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc) if ms else datetime.now(timezone.utc)
+
+  def _stream_bba(self, ticker, send_time_ms: int):
+    quote = (ticker.bidPrice, ticker.bidQuantity, ticker.askPrice, ticker.askQuantity)
+    if send_time_ms:
+      if send_time_ms < self._last_bba_ms or (send_time_ms == self._last_bba_ms and quote == self._last_bba_quote):
+        return
+      self._last_bba_ms, self._last_bba_quote = send_time_ms, quote
+    self.health.on_update(send_time_ms or None)
+
+    bid_price, bid_size, ask_price, ask_size = quote
+    bba = BBA(
+      ts = self._ts(send_time_ms),
+      market = self.pair,
+      best_bid_price = float(bid_price),
+      best_bid_size = float(bid_size),
+      best_ask_price = float(ask_price),
+      best_ask_size = float(ask_size),
+    )
+    self.topics["bba"].publish(bba)
+
+  def _stream_trades(self, deals, send_time_ms: int):
+    if send_time_ms:
+      # Deals are batched per push, so a batch with the same send time was already published
+      if send_time_ms <= self._last_deals_ms:
+        return
+      self._last_deals_ms = send_time_ms
+    self.health.on_update(send_time_ms or None)
+
+    trades = self.topics["trades"]
+    for deal in deals.deals:
+      trades.publish(Trade(
+        ts = self._ts(deal.time),
+        market = self.pair,
+        taker_side = Side.BUY if deal.tradeType == TRADE_TYPE_BUY else Side.SELL,
+        price = float(deal.price),
+        amount = float(deal.quantity),
+      ))
+
+  def _stream_depth(self, depth, send_time_ms: int):
+    bids = [(float(level.price), float(level.quantity)) for level in depth.bids]
+    asks = [(float(level.price), float(level.quantity)) for level in depth.asks]
+    if send_time_ms:
+      if send_time_ms < self._last_depth_ms or (send_time_ms == self._last_depth_ms and (bids, asks) == self._last_depth_levels):
+        return
+      self._last_depth_ms, self._last_depth_levels = send_time_ms, (bids, asks)
+    self.health.on_update(send_time_ms or None)
+
+    orderbook = Orderbook(
+      ts = self._ts(send_time_ms),
+      market = self.pair,
+      bids = bids,
+      asks = asks,
+    )
+    self.topics["orderbook"].publish(orderbook)
 
+  @override
   async def run(self):
     """Starts up all processes to run data feed"""
-    await self._subscribe_depth()
-    asyncio.create_task(self._ping())
-
-    while True:
-      await self._subscribe_depth()
-
-      # Create background tasks
-      ping_task = asyncio.create_task(self._ping())
-      update_bba_task = asyncio.create_task(self._update_bba())
-
-      # Run for one hour or until task fails, then restart
-      try:
-        await asyncio.wait(
-          [ping_task, update_bba_task],
-          timeout=3600,
-          return_when=asyncio.FIRST_EXCEPTION
-        )
-      finally:
-        print(f"[INFO {self.exchange}] Reconnecting Websocket ...")
-        await self.ws.close() # type: ignore[optional]
-        ping_task.cancel()
-        update_bba_task.cancel()
-        await asyncio.sleep(2)
+    await self._run_with_reconnect()
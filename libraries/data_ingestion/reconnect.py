@@ -0,0 +1,27 @@
+import random
+
+# Scheduled connection lifetime before a make-before-break rollover
+ROLLOVER_SECONDS = 3600
+# How long to wait for every subscription ack on a fresh connection
+SUBSCRIBE_TIMEOUT_SECONDS = 10
+# A connection that stayed up this long resets the backoff
+HEALTHY_CONNECTION_SECONDS = 60
+
+class Backoff:
+  '''
+  Exponential backoff with full jitter: each delay is uniform in [0, min(cap, base * factor ** attempt)].
+  Jitter keeps many feeds that drop together (exchange restart, VM network blip) from reconnecting in lockstep.
+  '''
+  def __init__(self, base: float = 0.25, cap: float = 30.0, factor: float = 2.0):
+    self.base = base
+    self.cap = cap
+    self.factor = factor
+    self.attempt = 0
+
+  def next_delay(self) -> float:
+    ceiling = min(self.cap, self.base * self.factor ** self.attempt)
+    self.attempt += 1
+    return random.uniform(0, ceiling)
+
+  def reset(self):
+    self.attempt = 0
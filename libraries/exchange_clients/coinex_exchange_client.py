@@ -1,6 +1,7 @@
 import time
 import hmac
 import hashlib
+import threading
 import requests
 import json
 from urllib.parse import urlencode
@@ -12,17 +13,62 @@ from libraries.models.coinex_cancel_all_orders_request import CoinexCancelAllOrd
 from libraries.models.coinex_empty_response import CoinexEmptyResponse
 from libraries.models.coinex_cancel_order_request import CoinexCancelOrderRequest
 from libraries.models.coinex_cancel_order_response import CoinexCancelOrderResponse
+from libraries.monitoring.latency_tracer import tracer
 
 COINEX_HTTP = 'https://api.coinex.com'
 
 
+# Placeholders rendered into cached order body templates; json.dumps escapes the NUL so they can't collide with real values
+_AMOUNT = "\x00amount"
+_PRICE = "\x00price"
+_CLIENT_ID = "\x00client_id"
+
+
 class CoinexExchangeClient:
 
-  def __init__(self, access_id: str, secret_key: str):
-    self.http_url = COINEX_HTTP
+  def __init__(self, access_id: str, secret_key: str, http_url: str = COINEX_HTTP):
+    self.http_url = http_url
     self.access_id = access_id
     self.secret_key = secret_key
 
+    # Keyed HMAC state is built once; every request signs a copy of it
+    self._hmac = hmac.new(secret_key.encode("latin-1"), digestmod=hashlib.sha256)
+    self._base_headers = {
+      "X-COINEX-KEY": access_id,
+      "Content-Type": "application/json",
+    }
+    self._order_templates: dict[tuple, tuple[str, ...]] = {}
+    # Pooled keep-alive connections so requotes don't pay a TCP + TLS handshake.
+    # Requests run on to_thread workers and a Session isn't thread-safe, so each
+    # worker thread gets its own.
+    self._local = threading.local()
+
+  @property
+  def session(self) -> requests.Session:
+    session = getattr(self._local, "session", None)
+    if session is None:
+      session = self._local.session = requests.Session()
+    return session
+
+  def _signed_headers(self, to_sign: bytes, ts: str) -> dict:
+    signer = self._hmac.copy()
+    signer.update(to_sign)
+    signer.update(ts.encode("latin-1"))
+
+    headers = self._base_headers.copy()
+    headers["X-COINEX-SIGN"] = signer.hexdigest()
+    headers["X-COINEX-TIMESTAMP"] = ts
+    return headers
+
+  def _send(self, method: str, path: str, qs: str, body: bytes, headers: dict, start_ns: int) -> dict:
+    url = self.http_url + path + qs
+    send_ns = time.perf_counter_ns()
+    tracer.record("coinex_rest.build", send_ns - start_ns)
+    resp = self.session.request(method, url, headers=headers, data=body)
+    tracer.since("coinex_rest.send_to_response " + path, send_ns)
+    resp.raise_for_status()
+    return resp.json()
+
   def _request(
     self,
     method: str,
@@ -37,6 +83,7 @@ class CoinexExchangeClient:
     params: query parameters to include in URL
     body: JSON‐serializable body for POST/PUT
     """
+    start_ns = time.perf_counter_ns()
     ts = str(int(time.time() * 1000))
 
     # build query string for signing & URL
@@ -44,65 +91,81 @@ class CoinexExchangeClient:
     if params:
       qs = "?" + urlencode(params)
 
-    body_str = json.dumps(body, separators=(",", ":")) if body else ""
-    to_sign = method.upper() + path + qs + body_str + ts
-
-    signature = (
-      hmac.new(
-        self.secret_key.encode("latin-1"),
-        msg=to_sign.encode("latin-1"),
-        digestmod=hashlib.sha256,
-      )
-      .hexdigest()
-      .lower()
-    )
-
-    headers = {
-      "X-COINEX-KEY": self.access_id,
-      "X-COINEX-SIGN": signature,
-      "X-COINEX-TIMESTAMP": ts,
-      "Content-Type": "application/json",
-    }
-
-    url = self.http_url + path + qs
-    resp = requests.request(method, url, headers=headers, data=body_str)
-    resp.raise_for_status()
-    return resp.json()
+    body_bytes = json.dumps(body, separators=(",", ":")).encode("latin-1") if body else b""
+    headers = self._signed_headers((method.upper() + path + qs).encode("latin-1") + body_bytes, ts)
+    return self._send(method, path, qs, body_bytes, headers, start_ns)
 
-  def get_account_info(self) -> dict:
-    '''Get account information'''
-    return self._request("GET", "/v2/account/info")
-
-  def place_order(self, req: CoinexPlaceOrderRequest) -> CoinexPlaceOrderResponse:
+  def _order_body(self, req: CoinexPlaceOrderRequest, amount: str, price: str, client_id: str | None) -> dict:
     body = {
       "market": req.market.replace("-", ""),
       "market_type": req.market_type,
       "side": req.side,
       "type": req.type,
-      "amount": req.amount,
-      "price": req.price,
+      "amount": amount,
+      "price": price,
     }
 
     # Optional fields
     if req.ccy is not None:
       body["ccy"] = req.ccy
-    if req.client_id is not None:
-      body["client_id"] = req.client_id
+    if client_id is not None:
+      body["client_id"] = client_id
     if req.is_hide:
       body["is_hide"] = True  # type: ignore
     if req.stp_mode is not None:
       body["stp_mode"] = req.stp_mode
+    return body
 
-    resp_dict = self._request("POST", "/v2/spot/order", body=body)
+  def _order_template(self, req: CoinexPlaceOrderRequest) -> tuple[str, ...]:
+    """
+    Pre-serialized body for everything about an order except amount, price and client_id, split
+    around those slots. Templates are cached per market/side/flags, so a requote only joins strings.
+    """
+    key = (req.market, req.market_type, req.side, req.type, req.ccy, bool(req.is_hide), req.stp_mode, req.client_id is not None)
+    template = self._order_templates.get(key)
+    if template is None:
+      client_id = _CLIENT_ID if req.client_id is not None else None
+      dumped = json.dumps(self._order_body(req, _AMOUNT, _PRICE, client_id), separators=(",", ":"))
+      head, rest = dumped.split(json.dumps(_AMOUNT), 1)
+      mid, tail = rest.split(json.dumps(_PRICE), 1)
+      if client_id is None:
+        template = (head, mid, tail)
+      else:
+        between, tail = tail.split(json.dumps(_CLIENT_ID), 1)
+        template = (head, mid, between, tail)
+      self._order_templates[key] = template
+    return template
+
+  def _render_order_body(self, req: CoinexPlaceOrderRequest) -> bytes:
+    # amount and price are plain decimal strings, so quoting them directly matches json.dumps
+    template = self._order_template(req)
+    if len(template) == 3:
+      head, mid, tail = template
+      body = head + '"' + req.amount + '"' + mid + '"' + req.price + '"' + tail
+    else:
+      head, mid, between, tail = template
+      body = head + '"' + req.amount + '"' + mid + '"' + req.price + '"' + between + json.dumps(req.client_id) + tail
+    return body.encode("latin-1")
+
+  def prepare_order(self, req: CoinexPlaceOrderRequest) -> tuple[bytes, dict]:
+    """Body and signed headers for a place-order call, without sending it."""
+    ts = str(int(time.time() * 1000))
+    body = self._render_order_body(req)
+    return body, self._signed_headers(b"POST/v2/spot/order" + body, ts)
+
+  def get_account_info(self) -> dict:
+    '''Get account information'''
+    return self._request("GET", "/v2/account/info")
+
+  def place_order(self, req: CoinexPlaceOrderRequest) -> CoinexPlaceOrderResponse:
+    start_ns = time.perf_counter_ns()
+    body, headers = self.prepare_order(req)
+    resp_dict = self._send("POST", "/v2/spot/order", "", body, headers, start_ns)
 
     data = None
     if "data" in resp_dict and isinstance(resp_dict["data"], dict) and resp_dict["data"]:
-      try:
-        data = CoinexOrderData(**resp_dict["data"])
-      except TypeError as e:
-        print(f"[ERROR] Failed to parse CoinexOrderData: {e}")
-        print(f"[DEBUG] resp_dict['data']: {resp_dict['data']}")
-        raise
+      # Tolerant of keys CoinEx adds or leaves out, like the cancel and order-list paths
+      data = CoinexOrderData.from_dict(resp_dict["data"])
 
     return CoinexPlaceOrderResponse(
       code=resp_dict["code"],
@@ -132,5 +195,23 @@ class CoinexExchangeClient:
     return CoinexCancelOrderResponse(
       code=resp["code"],
       message=resp["message"],
-      data=CoinexOrderData(**resp["data"])
+      data=CoinexOrderData.from_dict(resp["data"]) if resp.get("data") else None
     )
+
+  def _get_orders(self, path: str, market: str, limit: int, max_pages: int) -> list[CoinexOrderData]:
+    orders = []
+    for page in range(1, max_pages + 1):
+      params = {"market": market.replace("-", ""), "market_type": "SPOT", "page": page, "limit": limit}
+      resp = self._request("GET", path, params=params)
+      orders.extend(CoinexOrderData.from_dict(d) for d in resp.get("data") or [])
+      if not (resp.get("pagination") or {}).get("has_next"):
+        break
+    return orders
+
+  def get_pending_orders(self, market: str, limit: int = 100, max_pages: int = 10) -> list[CoinexOrderData]:
+    '''All open orders in a market, following pagination'''
+    return self._get_orders("/v2/spot/pending-order", market, limit, max_pages)
+
+  def get_finished_orders(self, market: str, limit: int = 100) -> list[CoinexOrderData]:
+    '''Most recently finished (filled or cancelled) orders in a market'''
+    return self._get_orders("/v2/spot/finished-order", market, limit, max_pages=1)
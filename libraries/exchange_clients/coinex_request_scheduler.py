@@ -0,0 +1,236 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Callable
+
+import requests
+
+from libraries.exchange_clients.coinex_exchange_client import CoinexExchangeClient
+from libraries.models.coinex_cancel_all_orders_request import CoinexCancelAllOrdersRequest
+from libraries.models.coinex_cancel_order_request import CoinexCancelOrderRequest
+from libraries.models.coinex_cancel_order_response import CoinexCancelOrderResponse
+from libraries.models.coinex_empty_response import CoinexEmptyResponse
+from libraries.models.coinex_order_data import CoinexOrderData
+from libraries.models.coinex_place_order_request import CoinexPlaceOrderRequest
+from libraries.models.coinex_place_order_response import CoinexPlaceOrderResponse
+from libraries.monitoring.latency_tracer import tracer
+
+# Budgets per endpoint as (tokens per second, burst). The most a bucket can release in any one
+# second is rate + burst, which is kept just under CoinEx's published per-user limit.
+ENDPOINT_LIMITS: dict[str, tuple[float, float]] = {
+  "place": (26.0, 3.0),     # published: 30/s
+  "cancel": (54.0, 5.0),    # published: 60/s
+  "query": (8.0, 1.0),      # published: 10/s for order lists
+}
+RATE_LIMITED_CODE = 4213
+RATE_LIMIT_PENALTY_SECONDS = 1.0
+MAX_RATE_LIMIT_RETRIES = 3
+
+class Priority(IntEnum):
+  CANCEL = 0
+  PLACE = 1
+  QUERY = 2
+
+class RequestSuperseded(Exception):
+  '''Raised to the caller of a queued place_order that a newer requote for the same market replaced before it was sent.'''
+
+class TokenBucket:
+  def __init__(self, rate: float, capacity: float):
+    self.rate = rate
+    self.capacity = capacity
+    self.tokens = capacity
+    self.updated = time.monotonic()
+
+  def _refill(self, now: float):
+    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+    self.updated = now
+
+  def wait_time(self) -> float:
+    """Seconds until a token is available, 0 if one is available now."""
+    now = time.monotonic()
+    self._refill(now)
+    if self.tokens >= 1:
+      return 0.0
+    return (1 - self.tokens) / self.rate
+
+  def take(self):
+    self.tokens -= 1
+
+  def penalize(self, seconds: float):
+    """Empties the bucket so nothing is sent on this endpoint for roughly `seconds`."""
+    self._refill(time.monotonic())
+    self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+@dataclass
+class _Job:
+  endpoint: str
+  priority: Priority
+  fn: Callable[..., Any]
+  args: tuple
+  future: asyncio.Future
+  coalesce_key: tuple | None = None
+  enqueued_ns: int = field(default_factory=time.perf_counter_ns)
+  retries: int = 0
+
+class CoinexRequestScheduler:
+  '''
+  Async front for CoinexExchangeClient that keeps every endpoint inside its CoinEx rate limit.
+  Requests wait in per-priority queues (cancels before places before queries) and are released
+  as their endpoint's token bucket allows, running the blocking client call on a worker thread.
+  A place_order still queued when a newer one for the same market/side/visibility/slot arrives
+  is dropped in its favour. Rate-limit responses empty the bucket and requeue the request at the front.
+  Queue wait per endpoint is recorded in the latency tracer as coinex_sched.queue_wait <endpoint>.
+  '''
+  def __init__(self, client: CoinexExchangeClient, limits: dict[str, tuple[float, float]] | None = None, max_in_flight: int = 8):
+    self.client = client
+    self.buckets = {endpoint: TokenBucket(rate, burst) for endpoint, (rate, burst) in (limits or ENDPOINT_LIMITS).items()}
+    self.max_in_flight = max_in_flight
+
+    self._queues: dict[Priority, deque[_Job]] = {priority: deque() for priority in Priority}
+    self._queued_places: dict[tuple, _Job] = {}
+    self._wakeup = asyncio.Event()
+    self._in_flight = 0
+    self._dispatcher: asyncio.Task | None = None
+
+    self.sent_total: dict[str, int] = {endpoint: 0 for endpoint in self.buckets}
+    self.rate_limited_total: dict[str, int] = {endpoint: 0 for endpoint in self.buckets}
+    self.coalesced_total = 0
+
+  def queue_depth(self) -> int:
+    return sum(len(q) for q in self._queues.values())
+
+  def submit(self, endpoint: str, priority: Priority, fn: Callable[..., Any], *args, coalesce_key: tuple | None = None) -> asyncio.Future:
+    if self._dispatcher is None or self._dispatcher.done():
+      self._dispatcher = asyncio.create_task(self._dispatch())
+
+    future = asyncio.get_running_loop().create_future()
+    job = _Job(endpoint, priority, fn, args, future, coalesce_key)
+
+    if coalesce_key is not None:
+      stale = self._queued_places.get(coalesce_key)
+      if stale is not None and not stale.future.done():
+        # The newer request takes over the stale one's place in line, so a requote storm can't starve itself
+        stale.future.set_exception(RequestSuperseded(f"replaced by a newer {endpoint} for {coalesce_key}"))
+        stale.fn, stale.args, stale.future, stale.enqueued_ns = fn, args, future, job.enqueued_ns
+        self.coalesced_total += 1
+        return future
+      self._queued_places[coalesce_key] = job
+
+    self._queues[priority].append(job)
+    self._wakeup.set()
+    return future
+
+  def _next_ready(self) -> tuple[_Job | None, float]:
+    """Highest-priority job whose endpoint has a token, or the shortest wait until one will."""
+    min_wait = float("inf")
+    for priority in Priority:
+      queue = self._queues[priority]
+      if not queue:
+        continue
+      wait = self.buckets[queue[0].endpoint].wait_time()
+      if wait == 0:
+        return queue.popleft(), 0.0
+      min_wait = min(min_wait, wait)
+    return None, min_wait
+
+  async def _dispatch(self):
+    while True:
+      if self._in_flight >= self.max_in_flight:
+        self._wakeup.clear()
+        await self._wakeup.wait()
+        continue
+
+      job, wait = self._next_ready()
+      if job is None:
+        self._wakeup.clear()
+        try:
+          await asyncio.wait_for(self._wakeup.wait(), timeout=None if wait == float("inf") else wait)
+        except TimeoutError:
+          pass
+        continue
+
+      if job.coalesce_key is not None and self._queued_places.get(job.coalesce_key) is job:
+        del self._queued_places[job.coalesce_key]
+      if job.future.done():
+        # Caller gave up (cancelled) while it was queued
+        continue
+
+      self.buckets[job.endpoint].take()
+      self._in_flight += 1
+      asyncio.create_task(self._execute(job))
+
+  async def _execute(self, job: _Job):
+    tracer.since(f"coinex_sched.queue_wait {job.endpoint}", job.enqueued_ns)
+    self.sent_total[job.endpoint] += 1
+    try:
+      result = await asyncio.to_thread(job.fn, *job.args)
+    except requests.HTTPError as e:
+      if e.response is not None and e.response.status_code == 429 and self._retry_rate_limited(job):
+        return
+      self._resolve(job, exc=e)
+    except Exception as e:
+      self._resolve(job, exc=e)
+    else:
+      if getattr(result, "code", 0) == RATE_LIMITED_CODE and self._retry_rate_limited(job):
+        return
+      self._resolve(job, result=result)
+    finally:
+      self._in_flight -= 1
+      self._wakeup.set()
+
+  def _retry_rate_limited(self, job: _Job) -> bool:
+    self.rate_limited_total[job.endpoint] += 1
+    self.buckets[job.endpoint].penalize(RATE_LIMIT_PENALTY_SECONDS)
+    if job.retries >= MAX_RATE_LIMIT_RETRIES:
+      return False
+
+    print(f"[RATE LIMITED CoinEx] {job.endpoint} throttled, retrying in ~{RATE_LIMIT_PENALTY_SECONDS:.1f}s")
+    job.retries += 1
+    self._queues[job.priority].appendleft(job)
+    return True
+
+  def _resolve(self, job: _Job, result: Any = None, exc: BaseException | None = None):
+    if job.future.done():
+      return
+    if exc is not None:
+      job.future.set_exception(exc)
+    else:
+      job.future.set_result(result)
+
+  async def place_order(self, req: CoinexPlaceOrderRequest, slot: object = None) -> CoinexPlaceOrderResponse:
+    """`slot` tells apart orders that may rest side by side, such as ladder levels; only a newer place for the same slot supersedes."""
+    key = (req.market.replace("-", ""), req.side, bool(req.is_hide), slot)
+    return await self.submit("place", Priority.PLACE, self.client.place_order, req, coalesce_key=key)
+
+  async def cancel_all_orders(self, req: CoinexCancelAllOrdersRequest) -> CoinexEmptyResponse:
+    return await self.submit("cancel", Priority.CANCEL, self.client.cancel_all_orders, req)
+
+  async def cancel_order(self, req: CoinexCancelOrderRequest) -> CoinexCancelOrderResponse:
+    return await self.submit("cancel", Priority.CANCEL, self.client.cancel_order, req)
+
+  async def get_pending_orders(self, market: str) -> list[CoinexOrderData]:
+    return await self.submit("query", Priority.QUERY, self.client.get_pending_orders, market)
+
+  async def get_finished_orders(self, market: str) -> list[CoinexOrderData]:
+    return await self.submit("query", Priority.QUERY, self.client.get_finished_orders, market)
+
+  def render_prometheus(self) -> str:
+    lines = [
+      "# HELP spot_arb_rest_queue_depth Requests waiting for a rate limit token",
+      "# TYPE spot_arb_rest_queue_depth gauge",
+      f"spot_arb_rest_queue_depth {self.queue_depth()}",
+      "# HELP spot_arb_rest_coalesced_total Queued requotes replaced by a newer one before sending",
+      "# TYPE spot_arb_rest_coalesced_total counter",
+      f"spot_arb_rest_coalesced_total {self.coalesced_total}",
+    ]
+    for name, help_text, values in (
+      ("spot_arb_rest_sent_total", "Requests sent to CoinEx", self.sent_total),
+      ("spot_arb_rest_rate_limited_total", "Requests CoinEx rejected for rate limiting", self.rate_limited_total),
+    ):
+      lines.append(f"# HELP {name} {help_text}")
+      lines.append(f"# TYPE {name} counter")
+      for endpoint, v in values.items():
+        lines.append(f'{name}{{endpoint="{endpoint}"}} {v}')
+    return "\n".join(lines) + "\n"
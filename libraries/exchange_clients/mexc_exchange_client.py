@@ -0,0 +1,99 @@
+import time
+import hmac
+import hashlib
+import requests
+from urllib.parse import urlencode
+
+from libraries.models.mexc_order_data import MexcOrderData
+from libraries.models.mexc_place_order_request import MexcPlaceOrderRequest
+from libraries.monitoring.latency_tracer import tracer
+
+MEXC_HTTP = 'https://api.mexc.com'
+RECV_WINDOW = 5000  # ms a signed request stays valid after its timestamp
+
+
+class MexcApiError(Exception):
+  '''A MEXC error response: HTTP 4xx/5xx with a JSON {"code", "msg"} body.'''
+  def __init__(self, status: int, code: int | None, msg: str):
+    super().__init__(f"HTTP {status}, code {code}: {msg}")
+    self.status = status
+    self.code = code
+    self.msg = msg
+
+
+class MexcExchangeClient:
+  '''
+  Signed MEXC spot REST client, the hedging leg's counterpart of CoinexExchangeClient. Calls block,
+  like the CoinEx client's, and are run off the event loop by their caller. Parameters travel in
+  the query string and the signature is an HMAC-SHA256 of that string, as the v3 API expects.
+  '''
+  def __init__(self, access_key: str, secret_key: str, http_url: str = MEXC_HTTP):
+    self.http_url = http_url
+    self.access_key = access_key
+    self.secret_key = secret_key
+
+    # Keyed HMAC state is built once; every request signs a copy of it
+    self._hmac = hmac.new(secret_key.encode("latin-1"), digestmod=hashlib.sha256)
+    self._base_headers = {
+      "X-MEXC-APIKEY": access_key,
+      "Content-Type": "application/json",
+    }
+    # Pooled keep-alive connections so a hedge doesn't pay a TCP + TLS handshake
+    self.session = requests.Session()
+
+  def _sign(self, qs: str) -> str:
+    signer = self._hmac.copy()
+    signer.update(qs.encode("latin-1"))
+    return signer.hexdigest()
+
+  def _request(self, method: str, path: str, params: dict) -> dict:
+    """
+    Send a signed request to MEXC.
+    method: "GET", "POST" or "DELETE"
+    path: API path, e.g. "/api/v3/order"
+    params: request parameters; timestamp, recvWindow and signature are added here
+    """
+    start_ns = time.perf_counter_ns()
+    qs = urlencode({**params, "recvWindow": RECV_WINDOW, "timestamp": int(time.time() * 1000)})
+    url = self.http_url + path + "?" + qs + "&signature=" + self._sign(qs)
+
+    send_ns = time.perf_counter_ns()
+    tracer.record("mexc_rest.build", send_ns - start_ns)
+    resp = self.session.request(method, url, headers=self._base_headers)
+    tracer.since("mexc_rest.send_to_response " + path, send_ns)
+    if resp.status_code >= 400:
+      try:
+        error = resp.json()
+      except ValueError:
+        error = {}
+      raise MexcApiError(resp.status_code, error.get("code"), error.get("msg") or resp.text)
+    return resp.json()
+
+  def get_account_info(self) -> dict:
+    '''Get account information, including balances'''
+    return self._request("GET", "/api/v3/account", {})
+
+  def place_order(self, req: MexcPlaceOrderRequest) -> MexcOrderData:
+    '''Place an order; the response only acknowledges it, so fills are read back with get_order'''
+    params = {
+      "symbol": req.symbol.replace("-", ""),
+      "side": req.side,
+      "type": req.type,
+    }
+
+    # Optional fields
+    if req.quantity is not None:
+      params["quantity"] = req.quantity
+    if req.quote_order_qty is not None:
+      params["quoteOrderQty"] = req.quote_order_qty
+    if req.price is not None:
+      params["price"] = req.price
+    if req.client_order_id is not None:
+      params["newClientOrderId"] = req.client_order_id
+    return MexcOrderData.from_dict(self._request("POST", "/api/v3/order", params))
+
+  def get_order(self, symbol: str, order_id: str) -> MexcOrderData:
+    return MexcOrderData.from_dict(self._request("GET", "/api/v3/order", {"symbol": symbol.replace("-", ""), "orderId": order_id}))
+
+  def cancel_order(self, symbol: str, order_id: str) -> MexcOrderData:
+    return MexcOrderData.from_dict(self._request("DELETE", "/api/v3/order", {"symbol": symbol.replace("-", ""), "orderId": order_id}))
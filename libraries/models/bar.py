@@ -0,0 +1,20 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+@dataclass(slots=True)
+class Bar:
+  market: str
+  resolution: int               # seconds per bar: 1, 60 or 3600
+  start: datetime               # UTC, aligned to the resolution
+  open: float | None            # trade OHLC, None for a bar with quotes but no trades
+  high: float | None
+  low: float | None
+  close: float | None
+  volume: float                 # base currency
+  quote_volume: float
+  trades: int
+  buy_volume: float             # taker buys, base currency
+  mid_close: float | None       # last BBA mid in the bar
+  spread_mean_bps: float | None # mean of the BBA spreads seen in the bar
+  spread_max_bps: float | None
+  bba_updates: int
@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from datetime import datetime
 
-@dataclass
+@dataclass(slots=True)
 class BBA:
   ts: datetime
   market: str
@@ -9,3 +9,7 @@ class BBA:
   best_bid_size: float
   best_ask_price: float
   best_ask_size: float
+  recv_ns: int = 0  # perf_counter_ns when the frame carrying this BBA was received, for latency tracing
+  # Exact integer prices in 10^-price_precision units, parsed from the exchange's strings; 0 when the feed doesn't know the precision
+  best_bid_ticks: int = 0
+  best_ask_ticks: int = 0
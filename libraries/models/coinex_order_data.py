@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 
 @dataclass
 class CoinexOrderData:
@@ -23,3 +23,14 @@ class CoinexOrderData:
     last_fill_price: str
     created_at: int
     updated_at: int
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CoinexOrderData":
+        """Tolerates the extra and missing keys that differ between REST endpoints and the private stream."""
+        values = {}
+        for f in fields(cls):
+            if f.name in data:
+                values[f.name] = data[f.name]
+            else:
+                values[f.name] = 0 if f.type in (int, "int") else ""
+        return cls(**values)
@@ -0,0 +1,27 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from libraries.models.side import Side
+
+@dataclass(slots=True)
+class Fill:
+  ts: datetime
+  exchange: str
+  market: str
+  side: Side
+  price: float       # average price of this fill
+  amount: float      # base currency, before fees
+  fee_base: float    # fee charged in base currency
+  fee_quote: float   # fee charged in quote currency
+  is_maker: bool
+  order_id: int | None = None
+  client_id: str | None = None
+
+  @property
+  def value(self) -> float:
+    return self.price * self.amount
+
+  @property
+  def fee_value(self) -> float:
+    """All fees in quote currency, base fees valued at the fill price."""
+    return self.fee_quote + self.fee_base * self.price
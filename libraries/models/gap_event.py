@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+@dataclass
+class GapEvent:
+  exchange: str
+  market: str
+  started_at: datetime         # last message received before the outage
+  ended_at: datetime | None    # None while the feed is still down
+  reason: str
+
+  @property
+  def is_open(self) -> bool:
+    return self.ended_at is None
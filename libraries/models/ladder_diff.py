@@ -0,0 +1,14 @@
+from dataclasses import dataclass, field
+
+from libraries.models.ladder_level import LadderLevel
+from libraries.models.tracked_order import TrackedOrder
+
+@dataclass
+class LadderDiff:
+  cancels: list[TrackedOrder] = field(default_factory=list)
+  places: list[LadderLevel] = field(default_factory=list)
+  keeps: list[TrackedOrder] = field(default_factory=list)
+
+  @property
+  def is_empty(self) -> bool:
+    return not self.cancels and not self.places
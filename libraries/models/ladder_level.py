@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+@dataclass(slots=True)
+class LadderLevel:
+  price: float
+  amount: float   # in base currency
+  is_hide: bool
+  level: int      # 0 is the top of the ladder
+  price_ticks: int = 0   # price and amount as integer ticks and lots when the market's increments are known
+  amount_lots: int = 0
+  expected_fill_seconds: float | None = None  # from the queue model, when the planner has one
@@ -0,0 +1,62 @@
+from dataclasses import dataclass
+
+from utils.fixed_point import floor_to_ticks, str_to_ticks, ticks_to_float, ticks_to_str
+
+@dataclass
+class MarketInfo:
+  exchange: str
+  market: str             # exchange symbol without separator, e.g. XECUSDT
+  base: str
+  quote: str
+  price_precision: int    # decimals allowed in a price
+  amount_precision: int   # decimals allowed in an amount
+  min_amount: float       # in base currency
+  min_notional: float     # in quote currency
+  quote_volume: float     # trailing 24h, in quote currency
+  tradable: bool
+
+  @property
+  def pair(self) -> str:
+    return f"{self.base}-{self.quote}"
+
+  @property
+  def tick_size(self) -> float:
+    return 10.0 ** -self.price_precision
+
+  @property
+  def lot_size(self) -> float:
+    return 10.0 ** -self.amount_precision
+
+  def price_ticks(self, price: float) -> int:
+    """Price rounded down to a whole number of ticks."""
+    return floor_to_ticks(price, self.price_precision)
+
+  def amount_lots(self, amount: float) -> int:
+    """Amount rounded down to a whole number of lots, so an order never exceeds the size it was sized for."""
+    return floor_to_ticks(amount, self.amount_precision)
+
+  def parse_price_ticks(self, price: str) -> int:
+    """Exact tick count of a price string from the exchange."""
+    return str_to_ticks(price, self.price_precision)
+
+  def format_price_ticks(self, ticks: int) -> str:
+    return ticks_to_str(ticks, self.price_precision)
+
+  def format_amount_lots(self, lots: int) -> str:
+    return ticks_to_str(lots, self.amount_precision)
+
+  def format_price(self, price: float) -> str:
+    """Price rounded down to the tick, as the fixed-point string the exchange expects (never '2e-05')."""
+    return self.format_price_ticks(self.price_ticks(price))
+
+  def format_amount(self, amount: float) -> str:
+    return self.format_amount_lots(self.amount_lots(amount))
+
+  def round_price(self, price: float) -> float:
+    return ticks_to_float(self.price_ticks(price), self.price_precision)
+
+  def round_amount(self, amount: float) -> float:
+    return ticks_to_float(self.amount_lots(amount), self.amount_precision)
+
+  def is_valid_order(self, price: float, amount: float) -> bool:
+    return amount >= self.min_amount and price * amount >= self.min_notional
@@ -0,0 +1,38 @@
+from dataclasses import dataclass, fields
+
+# MEXC's camelCase keys for the fields that don't map one-to-one
+_KEYS = {
+    "order_id": "orderId",
+    "client_order_id": "clientOrderId",
+    "orig_qty": "origQty",
+    "executed_qty": "executedQty",
+    "cummulative_quote_qty": "cummulativeQuoteQty",
+    "transact_time": "transactTime",
+    "update_time": "updateTime",
+}
+
+@dataclass
+class MexcOrderData:
+    symbol: str
+    order_id: str
+    client_order_id: str
+    side: str
+    type: str
+    price: str
+    orig_qty: str
+    executed_qty: str
+    cummulative_quote_qty: str   # sic, as MEXC spells it
+    status: str                  # NEW, FILLED, PARTIALLY_FILLED, CANCELED, PARTIALLY_CANCELED
+    transact_time: int
+    update_time: int
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MexcOrderData":
+        """Tolerates the keys missing from the place-order response, which only acknowledges the order."""
+        values = {}
+        for f in fields(cls):
+            value = data.get(_KEYS.get(f.name, f.name))
+            if value is None:
+                value = 0 if f.type in (int, "int") else ""
+            values[f.name] = value if f.type in (int, "int") else str(value)
+        return cls(**values)
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass
+class MexcPlaceOrderRequest:
+    symbol: str
+    side: str = "SELL"        # or "BUY"
+    type: str = "MARKET"      # or "LIMIT", "IMMEDIATE_OR_CANCEL", ...
+    quantity: Optional[str] = None        # base amount
+    quote_order_qty: Optional[str] = None # quote amount, MARKET orders only
+    price: Optional[str] = None
+    client_order_id: Optional[str] = None
@@ -0,0 +1,12 @@
+from enum import Enum
+
+class OrderStatus(Enum):
+  PENDING_NEW = "pending_new"            # sent, no response yet
+  OPEN = "open"
+  PARTIALLY_FILLED = "partially_filled"
+  PENDING_CANCEL = "pending_cancel"      # cancel sent, not yet confirmed
+  DONE = "done"                          # filled, cancelled or rejected
+
+  @property
+  def is_live(self) -> bool:
+    return self != OrderStatus.DONE
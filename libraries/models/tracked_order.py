@@ -0,0 +1,33 @@
+from dataclasses import dataclass
+
+from libraries.models.coinex_order_data import CoinexOrderData
+from libraries.models.order_status import OrderStatus
+
+@dataclass
+class TrackedOrder:
+  client_id: str
+  market: str
+  side: str
+  price: str
+  amount: str
+  is_hide: bool
+  status: OrderStatus
+  order_id: int | None = None
+  filled_amount: float = 0.0
+  filled_value: float = 0.0
+  base_fee: float = 0.0                # cumulative fees charged so far, in base and quote currency
+  quote_fee: float = 0.0
+  updated_at: int = 0                  # exchange ms of the last applied update, to drop stale ones
+  data: CoinexOrderData | None = None  # last full snapshot from REST or the private stream
+  reject_reason: str | None = None
+  price_ticks: int | None = None       # exact price in market ticks, filled in by whoever knows the precision
+
+  @property
+  def is_live(self) -> bool:
+    return self.status.is_live
+
+  @property
+  def is_filled(self) -> bool:
+    if self.status != OrderStatus.DONE or self.data is None or self.data.unfilled_amount == "":
+      return False
+    return float(self.data.unfilled_amount) == 0
@@ -2,7 +2,7 @@ from datetime import datetime
 from dataclasses import dataclass
 from libraries.models.side import Side
 
-@dataclass
+@dataclass(slots=True)
 class Trade:
   ts: datetime
   market: str
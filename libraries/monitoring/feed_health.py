@@ -0,0 +1,159 @@
+import asyncio
+import time
+from typing import Callable
+
+from libraries.data_ingestion.fan_out import Backpressure, Topic
+
+HealthListener = Callable[["FeedHealth", bool], None]
+
+class FeedHealth:
+  '''
+  Liveness and freshness counters for one feed. The feed calls on_frame for every websocket frame
+  (pongs included) and on_update for every market data message; both are plain attribute writes so
+  they are safe to call on the hot path. FeedHealthMonitor reads them from its watchdog loop.
+  '''
+  def __init__(self, exchange: str, market: str, stale_after_seconds: float):
+    self.exchange = exchange
+    self.market = market
+    self.stale_after_seconds = stale_after_seconds
+
+    self.connected = False
+    self.healthy = False
+    self.frames_total = 0
+    self.updates_total = 0
+    self.last_frame_ns = 0
+    self.last_update_ns = 0
+    self.exchange_latency_ms: float | None = None
+    self.exchange_latency_ewma_ms: float | None = None
+    self.update_rate = 0.0  # updates/s, refreshed by the watchdog
+
+  def on_frame(self):
+    self.frames_total += 1
+    self.last_frame_ns = time.monotonic_ns()
+
+  def on_update(self, exchange_ts_ms: int | None = None):
+    self.updates_total += 1
+    self.last_update_ns = time.monotonic_ns()
+    if exchange_ts_ms:
+      latency = time.time() * 1000 - exchange_ts_ms
+      self.exchange_latency_ms = latency
+      if self.exchange_latency_ewma_ms is None:
+        self.exchange_latency_ewma_ms = latency
+      else:
+        self.exchange_latency_ewma_ms += 0.1 * (latency - self.exchange_latency_ewma_ms)
+
+  def seconds_since_frame(self) -> float:
+    if not self.last_frame_ns:
+      return float("inf")
+    return (time.monotonic_ns() - self.last_frame_ns) / 1e9
+
+  def seconds_since_update(self) -> float:
+    if not self.last_update_ns:
+      return float("inf")
+    return (time.monotonic_ns() - self.last_update_ns) / 1e9
+
+  def is_fresh(self) -> bool:
+    return self.connected and self.seconds_since_frame() <= self.stale_after_seconds
+
+
+class FeedHealthMonitor:
+  '''
+  Watchdog over a set of FeedHealth objects. Every check_interval it refreshes update rates and
+  fires listeners on stale/healthy transitions, so strategies can pull quotes the moment a feed freezes.
+  Feeds registered with their topics also get per-subscriber drop counts and lag exported, and
+  DROP_OLDEST subscribers that fell behind are logged.
+  '''
+  def __init__(self, check_interval: float = 0.5):
+    self.check_interval = check_interval
+    self.feeds: list[FeedHealth] = []
+    self.listeners: list[HealthListener] = []
+    self._last_counts: dict[int, tuple[int, int]] = {}
+    self.topics: list[tuple[FeedHealth, dict[str, Topic]]] = []
+    self._last_dropped: dict[int, int] = {}
+
+  def register(self, health: FeedHealth, topics: dict[str, Topic] | None = None):
+    self.feeds.append(health)
+    if topics:
+      self.topics.append((health, topics))
+
+  def subscribe(self, listener: HealthListener):
+    """listener(health, healthy) is called on every transition. Listeners must not block."""
+    self.listeners.append(listener)
+
+  def all_healthy(self) -> bool:
+    return all(feed.healthy for feed in self.feeds)
+
+  def check(self):
+    now_ns = time.monotonic_ns()
+    for feed in self.feeds:
+      prev_updates, prev_ns = self._last_counts.get(id(feed), (feed.updates_total, now_ns))
+      elapsed = (now_ns - prev_ns) / 1e9
+      if elapsed > 0:
+        feed.update_rate = (feed.updates_total - prev_updates) / elapsed
+      self._last_counts[id(feed)] = (feed.updates_total, now_ns)
+
+      healthy = feed.is_fresh()
+      if healthy == feed.healthy:
+        continue
+
+      feed.healthy = healthy
+      state = "HEALTHY" if healthy else "STALE"
+      print(f"[{state} {feed.exchange}] {feed.market} last frame {feed.seconds_since_frame():.1f}s ago")
+      for listener in self.listeners:
+        try:
+          listener(feed, healthy)
+        except Exception as e:
+          print(f"[ERROR] Health listener failed: {e}")
+
+    self._check_drops()
+
+  def _check_drops(self):
+    for feed, topics in self.topics:
+      for topic_name, topic in topics.items():
+        for sub in topic.subscriptions():
+          prev = self._last_dropped.get(id(sub), 0)
+          self._last_dropped[id(sub)] = sub.dropped
+          # LATEST subscribers skip by design; anyone else skipping lost data it wanted
+          if sub.dropped > prev and sub.policy != Backpressure.LATEST:
+            print(f"[DROPPED {feed.exchange}] {feed.market} {topic_name} subscriber {sub.name} fell behind and skipped {sub.dropped - prev} items ({sub.dropped} total)")
+
+  async def run(self):
+    while True:
+      self.check()
+      await asyncio.sleep(self.check_interval)
+
+  def render_prometheus(self) -> str:
+    metrics = [
+      ("spot_arb_feed_frames_total", "counter", "Websocket frames received", lambda f: f.frames_total),
+      ("spot_arb_feed_updates_total", "counter", "Market data updates received", lambda f: f.updates_total),
+      ("spot_arb_feed_update_rate", "gauge", "Market data updates per second", lambda f: f.update_rate),
+      ("spot_arb_feed_exchange_latency_ms", "gauge", "Local receive time minus exchange timestamp (EWMA)", lambda f: f.exchange_latency_ewma_ms),
+      ("spot_arb_feed_seconds_since_frame", "gauge", "Seconds since the last websocket frame", lambda f: f.seconds_since_frame()),
+      ("spot_arb_feed_seconds_since_update", "gauge", "Seconds since the last market data update", lambda f: f.seconds_since_update()),
+      ("spot_arb_feed_healthy", "gauge", "1 if the feed is connected and fresh", lambda f: int(f.healthy)),
+    ]
+
+    lines = []
+    for name, kind, help_text, value in metrics:
+      lines.append(f"# HELP {name} {help_text}")
+      lines.append(f"# TYPE {name} {kind}")
+      for feed in self.feeds:
+        v = value(feed)
+        if v is None:
+          continue
+        v = "+Inf" if v == float("inf") else v
+        lines.append(f'{name}{{exchange="{feed.exchange}",market="{feed.market}"}} {v}')
+
+    subscription_metrics = [
+      ("spot_arb_feed_subscription_dropped_total", "counter", "Items a subscriber skipped, by design for policy latest", lambda sub: sub.dropped),
+      ("spot_arb_feed_subscription_lag", "gauge", "Items published but not yet read by the subscriber", lambda sub: sub.qsize()),
+    ]
+    for name, kind, help_text, value in subscription_metrics:
+      lines.append(f"# HELP {name} {help_text}")
+      lines.append(f"# TYPE {name} {kind}")
+      for feed, topics in self.topics:
+        for topic_name, topic in topics.items():
+          for sub in topic.subscriptions():
+            labels = f'exchange="{feed.exchange}",market="{feed.market}",topic="{topic_name}",subscriber="{sub.name}",policy="{sub.policy.value}"'
+            lines.append(f"{name}{{{labels}}} {value(sub)}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,49 @@
+import asyncio
+from typing import Callable
+
+class MetricsServer:
+  '''
+  Minimal HTTP/1.1 endpoint for Prometheus scrapes and ad-hoc curl. Each route maps a path to a
+  function returning the plain text body, rendered on request.
+  '''
+  def __init__(self, host: str = "127.0.0.1", port: int = 9100):
+    self.host = host
+    self.port = port
+    self.routes: dict[str, Callable[[], str]] = {}
+
+  def add_route(self, path: str, render: Callable[[], str]):
+    self.routes[path] = render
+
+  async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+      request_line = await reader.readline()
+      # Drain the headers; nothing in them matters here
+      while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+        pass
+
+      parts = request_line.decode("latin-1").split()
+      path = parts[1].split("?", 1)[0] if len(parts) > 1 else "/"
+      render = self.routes.get(path)
+      if render:
+        status, body = "200 OK", render()
+      else:
+        status, body = "404 Not Found", f"Unknown path {path}, try one of {sorted(self.routes)}\n"
+
+      payload = body.encode("utf-8")
+      writer.write(
+        f"HTTP/1.1 {status}\r\n"
+        f"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: close\r\n\r\n".encode("latin-1") + payload
+      )
+      await writer.drain()
+    except Exception as e:
+      print(f"[ERROR] Metrics request failed: {e}")
+    finally:
+      writer.close()
+
+  async def run(self):
+    server = await asyncio.start_server(self._handle, self.host, self.port)
+    print(f"[METRICS] Serving {sorted(self.routes)} on http://{self.host}:{self.port}")
+    async with server:
+      await server.serve_forever()
@@ -1,15 +1,42 @@
 import asyncio
+import time
+from enum import Enum
 
+from libraries.analytics.fill_stats import FillStats
 from libraries.data_ingestion.coinex_data_feed import CoinexDataFeed
+from libraries.data_ingestion.fan_out import Backpressure
 from libraries.data_ingestion.mexc_data_feed import MexcDataFeed
 from libraries.exchange_clients.coinex_exchange_client import CoinexExchangeClient
+from libraries.exchange_clients.coinex_request_scheduler import CoinexRequestScheduler
 from libraries.models.bba import BBA
-from libraries.models.coinex_order_data import CoinexOrderData
+from libraries.models.coinex_cancel_order_request import CoinexCancelOrderRequest
 from libraries.models.coinex_place_order_request import CoinexPlaceOrderRequest
 from libraries.models.coinex_cancel_all_orders_request import CoinexCancelAllOrdersRequest
+from libraries.models.ladder_diff import LadderDiff
+from libraries.models.ladder_level import LadderLevel
+from libraries.models.market_info import MarketInfo
+from libraries.models.order_status import OrderStatus
+from libraries.models.orderbook import Orderbook
+from libraries.models.tracked_order import TrackedOrder
+from libraries.monitoring.feed_health import FeedHealth, FeedHealthMonitor
+from libraries.monitoring.latency_tracer import tracer
+from libraries.order_management.ladder_planner import LadderPlanner
+from libraries.order_management.local_order_manager import LocalOrderManager
 
 from utils.difference_in_bps import difference_in_bps
 
+# Decisions run as soon as a quote changes; this is the longest we go without one, so
+# HOLDs on unconfirmed orders are retried even when the market is quiet
+DECISION_INTERVAL_SECONDS = 1.0
+
+class ChaseAction(Enum):
+  WAIT_STALE = "wait_stale"
+  WAIT_BBA = "wait_bba"
+  CANCEL = "cancel"
+  PLACE = "place"
+  REQUOTE = "requote"
+  HOLD = "hold"
+
 class ChaseBBA():
   def __init__(
     self,
@@ -18,7 +45,12 @@ class ChaseBBA():
     coinex_feed: CoinexDataFeed,
     mexc_feed: MexcDataFeed,
     coinex_exchange_client: CoinexExchangeClient,
-
+    health_monitor: FeedHealthMonitor | None = None,
+    order_manager: LocalOrderManager | None = None,
+    scheduler: CoinexRequestScheduler | None = None,
+    planner: LadderPlanner | None = None,
+    fill_stats: FillStats | None = None,
+    market_info: MarketInfo | None = None,
   ):
     self.pair = pair.replace('-', '')
     self.minimum_bps_threshold = minimum_bps_threshold
@@ -27,142 +59,225 @@ class ChaseBBA():
     self.mexc_feed: MexcDataFeed = mexc_feed
 
     self.coinex_exchange_client: CoinexExchangeClient = coinex_exchange_client
+    # All REST calls go through the scheduler; share one across strategies so they share CoinEx's rate limits
+    self.scheduler = scheduler or CoinexRequestScheduler(coinex_exchange_client)
+    # Serializes place and cancel so a cancel-all can't overtake (and miss) an in-flight place
+    self._order_lock = asyncio.Lock()
+    self._background: set[asyncio.Task] = set()
 
     self.coinex_bba: BBA | None = None
     self.mexc_bba: BBA | None = None
 
-    self.visible_order: CoinexOrderData | None = None
-    self.hidden_order: CoinexOrderData | None = None
+    self.orderbook: Orderbook | None = None
+
+    # Order state lives in the manager; the planner turns market state into target levels
+    self.order_manager = order_manager or LocalOrderManager()
+    # Market increments and minimums from the pair universe; with them prices are exact ticks, without them plain str(float)
+    self.market_info = market_info
+    self.planner = planner or LadderPlanner(market_info=market_info)
+    self.limit_amount_usd = 0.0
     self.prev_coinex_bba: BBA | None = None
+    self.last_bps: float | None = None
+    self.last_diff: LadderDiff | None = None
+    self.last_action: ChaseAction | None = None
+    self._market_changed = asyncio.Event()
+    # Rolling fill flow for this market, fed from the same BBA and depth updates we quote off
+    self.fill_stats = fill_stats
+
+    # Quoting is paused while any feed we price off is stale
+    self.stale_feeds: set[str] = set()
+    if health_monitor:
+      health_monitor.subscribe(self.on_feed_health)
+
+  def _has_live_orders(self) -> bool:
+    return bool(self.order_manager.live_orders(self.pair))
 
   async def consume_coinex_bba(self, queue):
     while True:
       self.coinex_bba = await queue.get()
+      self._market_changed.set()
+      if self.fill_stats:
+        self.fill_stats.on_bba(self.coinex_bba)
 
-  async def consume_mexc_bba(self):
+  async def consume_orderbook(self, queue):
     while True:
-      await asyncio.sleep(1)
-      self.mexc_bba = self.mexc_feed.bba
+      self.orderbook = await queue.get()
+      self._market_changed.set()
+      if self.fill_stats:
+        self.fill_stats.on_orderbook(self.orderbook)
 
-  def place_orders(self, amount_usd: float, hidden_to_visible_ratio: float = 20.0, visible_only: bool = False, hidden_only: bool = False):
-    if not self.coinex_bba:
-      print("No coinex bba, can't place order")
-      return
-
-    p0 = self.coinex_bba.best_bid_price
-
-    # visible + hidden = amount_usd
-    # hidden = hidden_to_visible_ratio × visible
-    # → visible * (1 + hidden_to_visible_ratio) = amount_usd
-    visible_usd = amount_usd / (1 + hidden_to_visible_ratio)
-    hidden_usd  = amount_usd - visible_usd
+  async def consume_gaps(self, queue):
+    """A feed outage means the last BBA we hold is stale, so drop it and pull quotes until the feed resumes."""
+    while True:
+      gap = await queue.get()
+      if not gap.is_open:
+        continue
 
-    amount_pair_visible = visible_usd / p0
-    amount_pair_hidden  = hidden_usd  / p0
+      print(f"[GAP {gap.exchange}] Feed down ({gap.reason}), pulling quotes")
+      if gap.exchange == self.coinex_feed.exchange:
+        self.coinex_bba = None
+        self.orderbook = None
+      else:
+        self.mexc_bba = None
+      if self._has_live_orders():
+        await self.cancel_orders()
+
+  def on_feed_health(self, health: FeedHealth, healthy: bool):
+    if health.market != self.pair:
+      return
 
-    if not hidden_only:
-      self._place_visible_order(p0, amount_pair_visible)
+    if healthy:
+      self.stale_feeds.discard(health.exchange)
+      return
 
-    if not visible_only:
-      self._place_hidden_order(p0, amount_pair_hidden)
+    self.stale_feeds.add(health.exchange)
+    print(f"[STALE {health.exchange}] Pulling quotes until the feed recovers")
+    if self._has_live_orders():
+      # Listeners must not block, so the cancel runs as its own task
+      task = asyncio.create_task(self.cancel_orders())
+      self._background.add(task)
+      task.add_done_callback(self._background.discard)
 
-  def _place_visible_order(self, p0: float, amount_pair: float):
-    visible_order_request = CoinexPlaceOrderRequest(
+  async def consume_mexc_bba(self, queue):
+    while True:
+      self.mexc_bba = await queue.get()
+      self._market_changed.set()
+
+  async def apply_diff(self, diff: LadderDiff):
+    """Sends the cancels in diff, then its places, each batch concurrently through the scheduler."""
+    bba = self.coinex_bba
+    decision_ns = time.perf_counter_ns()
+    if bba and bba.recv_ns:
+      tracer.record("chase.recv_to_decision", decision_ns - bba.recv_ns)
+
+    async with self._order_lock:
+      # Cancels first so the ladder never briefly holds more than its size
+      if diff.cancels:
+        await asyncio.gather(*(self._cancel_order(order) for order in diff.cancels))
+      if diff.places:
+        await asyncio.gather(*(self._place_level(level) for level in diff.places))
+
+    if diff.places and bba:
+      tracer.since("chase.decision_to_ack", decision_ns)
+      tracer.since("e2e.recv_to_ack", bba.recv_ns)
+      tracer.record("e2e.exchange_to_ack", time.time_ns() - int(bba.ts.timestamp() * 1e9))
+
+  async def _place_level(self, level: LadderLevel):
+    """Tracks the order in the order manager, then sends it; a failed send leaves the order DONE."""
+    req = CoinexPlaceOrderRequest(
       market = self.pair,
       side = "buy",
-      amount = str(amount_pair),
-      price = str(p0),
+      amount = self.market_info.format_amount_lots(level.amount_lots) if self.market_info else str(level.amount),
+      price = self.market_info.format_price_ticks(level.price_ticks) if self.market_info else str(level.price),
+      is_hide = level.is_hide,
     )
-
+    order = self.order_manager.track_new(req, price_ticks=level.price_ticks if self.market_info else None)
     try:
-      visible_order = self.coinex_exchange_client.place_order(visible_order_request)
-      self.visible_order = visible_order.data
+      resp = await self.scheduler.place_order(req, slot=level.level)
+      self.order_manager.on_place_response(order.client_id, resp)
     except Exception as e:
-      print(f"[ERROR] Failed to place visible order: {e}")
-      self.visible_order = None
-
-  def _place_hidden_order(self, p0: float, amount_pair: float):
-    hidden_order_request = CoinexPlaceOrderRequest(
-      market = self.pair,
-      side = "buy",
-      amount = str(amount_pair),
-      price = str(p0),
-      is_hide = True
-    )
+      print(f"[ERROR] Failed to place {'hidden' if level.is_hide else 'visible'} order at level {level.level}: {e}")
+      self.order_manager.on_place_response(order.client_id, None, e)
 
+  async def _cancel_order(self, order: TrackedOrder):
+    self.order_manager.mark_order_pending_cancel(order.client_id)
     try:
-      hidden_order = self.coinex_exchange_client.place_order(hidden_order_request)
-      self.hidden_order = hidden_order.data
+      resp = await self.scheduler.cancel_order(CoinexCancelOrderRequest(market=self.pair, order_id=order.order_id)) # type: ignore[arg-type]
     except Exception as e:
-      print(f"[ERROR] Failed to place hidden order: {e}")
-      self.hidden_order = None
+      # Stays PENDING_CANCEL until the private stream or reconciliation settles it
+      print(f"[ERROR] Failed to cancel order {order.client_id}: {e}")
+      return
+    self.order_manager.on_cancel_response(resp)
+
+  async def cancel_orders(self):
+    async with self._order_lock:
+      self.order_manager.mark_pending_cancel(self.pair)
+      try:
+        resp = await self.scheduler.cancel_all_orders(CoinexCancelAllOrdersRequest(market=self.pair))
+      except Exception as e:
+        # Legs stay PENDING_CANCEL, which holds quoting until the private stream or reconciliation settles them
+        print(f"[ERROR] Failed to cancel orders: {e}")
+        self.order_manager.on_cancel_all_response(self.pair, None, e)
+        return
 
-  def cancel_orders(self):
-    self.coinex_exchange_client.cancel_all_orders(CoinexCancelAllOrdersRequest(market=self.pair))
-    self.visible_order = None
-    self.hidden_order = None
+      self.order_manager.on_cancel_all_response(self.pair, resp)
 
   async def run(self, limit_amount_usd: float):
-    asyncio.create_task(self.consume_coinex_bba(self.coinex_feed.bba_queue))
-    asyncio.create_task(self.consume_mexc_bba())
+    self.limit_amount_usd = limit_amount_usd
+    # Own subscriptions, so a recorder or dashboard on the same feeds still sees every update.
+    # Quoting only ever needs the newest book, so those skip straight to the latest.
+    asyncio.create_task(self.consume_coinex_bba(self.coinex_feed.subscribe("bba", "chase_bba", Backpressure.LATEST)))
+    asyncio.create_task(self.consume_orderbook(self.coinex_feed.subscribe("orderbook", "chase_bba", Backpressure.LATEST)))
+    if self.fill_stats:
+      asyncio.create_task(self.fill_stats.consume_trades(self.coinex_feed.subscribe("trades", "fill_stats")))
+    asyncio.create_task(self.consume_mexc_bba(self.mexc_feed.subscribe("bba", "chase_bba", Backpressure.LATEST)))
+    asyncio.create_task(self.consume_gaps(self.coinex_feed.subscribe("gaps", "chase_bba")))
+    asyncio.create_task(self.consume_gaps(self.mexc_feed.subscribe("gaps", "chase_bba")))
 
     while True:
-      await asyncio.sleep(1)
-
-      if not self.coinex_bba or not self.mexc_bba:
+      try:
+        async with asyncio.timeout(DECISION_INTERVAL_SECONDS):
+          await self._market_changed.wait()
+      except TimeoutError:
+        pass
+      self._market_changed.clear()
+      await self.execute(self.decide())
+
+  def decide(self) -> ChaseAction:
+    """Pure decision step: looks only at local state, so it can be benchmarked without an exchange."""
+    if self.stale_feeds:
+      return ChaseAction.WAIT_STALE
+
+    if not self.coinex_bba or not self.mexc_bba:
+      return ChaseAction.WAIT_BBA
+
+    coinex_bid = self.coinex_bba.best_bid_price
+    mexc_bid =  self.mexc_bba.best_bid_price
+    self.last_bps = difference_in_bps(coinex_bid, mexc_bid)
+
+    live = self.order_manager.live_orders(self.pair)
+    # An order whose place or cancel hasn't been confirmed yet can't safely be touched again
+    for order in live:
+      if order.status in (OrderStatus.PENDING_NEW, OrderStatus.PENDING_CANCEL):
+        return ChaseAction.HOLD
+
+    targets = self.planner.targets(
+      coinex_bid, mexc_bid, self.minimum_bps_threshold, self.orderbook, self.limit_amount_usd,
+      coinex_bid_ticks=self.coinex_bba.best_bid_ticks,
+    )
+    if not targets:
+      return ChaseAction.CANCEL if live else ChaseAction.HOLD
+
+    self.last_diff = self.planner.diff(targets, live)
+    if self.last_diff.is_empty:
+      return ChaseAction.HOLD
+    return ChaseAction.REQUOTE if live else ChaseAction.PLACE
+
+  async def execute(self, action: ChaseAction):
+    # Decisions run on every quote, so waits are logged once when entered rather than every time
+    repeated = action == self.last_action
+    self.last_action = action
+    if action == ChaseAction.WAIT_STALE:
+      if not repeated:
+        print(f"Waiting for stale feeds to recover: {', '.join(sorted(self.stale_feeds))}")
+      return
+    if action == ChaseAction.WAIT_BBA:
+      if not repeated:
         print("Waiting for BBA's to populate")
-        continue
-
-      coinex_bid = self.coinex_bba.best_bid_price
-      mexc_bid =  self.mexc_bba.best_bid_price
-      bps = difference_in_bps(coinex_bid, mexc_bid)
-
-      # If the Bps spread falls below 30, we just want to cancel and not replace order
-      # TODO: Change this to a more nuaced "leave in market at 30 bps" later
-      print("BPS ARB:", bps)
-      if bps < self.minimum_bps_threshold:
-        print(f"Arb less than {self.minimum_bps_threshold} bps, canceling")
-        self.cancel_orders()
-        continue
-
-      if not self.visible_order and not self.hidden_order:
-        print("Currently no orders, creating one now")
-        self.place_orders(limit_amount_usd)
-        continue
-
-      # When do we want to replace order:
-      # 1) The BBA changes
-      if (
-        (self.visible_order and float(self.visible_order.price) != coinex_bid)
-        or
-        (self.hidden_order and float(self.hidden_order.price) != coinex_bid)
-      ):
-        print("BBA Changed, moving orders")
-        self.cancel_orders()
-        self.place_orders(limit_amount_usd)
-        continue
-
-      #TODO: FIX THIS IT CURRENTLY CAN'T TELL THIS CAUSE WE NEVER QUERY THE API FOR IT (Actually we might not need this since bba changes)
-      # 2) Order is fully filled
-      if self.visible_order and self.visible_order.unfilled_amount == 0:
-        print("Visible order fully filled, replacing it")
-        self.place_orders(limit_amount_usd, visible_only = True)
-        continue
-      if self.hidden_order and self.hidden_order.unfilled_amount == 0:
-        print("Hidden order fully filled, replacing it")
-        self.place_orders(limit_amount_usd, hidden_only = True)
-        continue
-
-      # Otherwise just leave the order alone
-
-  # Calculate where we should place order: if bps are above 30 just put at bba, if below 30 but it at 30
-  #   We also want to have our order on three levels laddering down which is why we need the orderbook data
-  # If current orders are at this level then skip
-  # otherwise cancel stale orders and replace them with correct levels
-  #
-  # Should constantly be checking every second or so to see if anything was filled, if so immediately be sure to create new orders
-  # at calculated limit prices
-
-
+      return
+    if action == ChaseAction.HOLD:
+      return
 
-# Visible order is 1/20 th of hidden order
+    print("BPS ARB:", self.last_bps)
+    if action == ChaseAction.CANCEL:
+      print("No valid ladder levels, canceling")
+      await self.cancel_orders()
+    elif action in (ChaseAction.PLACE, ChaseAction.REQUOTE) and self.last_diff:
+      diff = self.last_diff
+      print(f"Moving ladder: {len(diff.cancels)} cancels, {len(diff.places)} places, {len(diff.keeps)} kept")
+      if self.planner.queue_model and self.orderbook:
+        self.planner.estimate_fill_times(diff.places, self.orderbook)
+        print("Expected fill times: " + ", ".join(
+          f"L{level.level} {'hidden' if level.is_hide else 'visible'} {level.expected_fill_seconds:,.0f}s" for level in diff.places
+        ))
+      await self.apply_diff(diff)
@@ -0,0 +1,218 @@
+import asyncio
+import itertools
+import time
+from datetime import datetime, timezone
+
+from libraries.exchange_clients.mexc_exchange_client import MexcExchangeClient
+from libraries.models.bba import BBA
+from libraries.models.fill import Fill
+from libraries.models.market_info import MarketInfo
+from libraries.models.mexc_order_data import MexcOrderData
+from libraries.models.mexc_place_order_request import MexcPlaceOrderRequest
+from libraries.models.side import Side
+from libraries.monitoring.latency_tracer import tracer
+from libraries.portfolio.position_tracker import PositionTracker
+
+MEXC_TAKER_FEE_RATE = 0.0005   # spot taker fee charged on the hedge, in quote currency
+RETRY_SECONDS = 1.0            # pause after a failed hedge before trying again
+READBACK_POLL_SECONDS = 0.02   # first pause between order reads, doubling up to READBACK_MAX_POLL_SECONDS
+READBACK_MAX_POLL_SECONDS = 0.5
+READBACK_TIMEOUT_SECONDS = 10.0
+FINAL_STATUSES = ("FILLED", "CANCELED", "PARTIALLY_CANCELED")
+
+class Hedger:
+  '''
+  Hedging leg: offsets every CoinEx fill with a market order on MEXC as soon as it arrives.
+  Fills accumulate in one signed pending amount (net of base fees, which never reach the wallet)
+  and go out as soon as that amount, rounded down to MEXC's lot size, clears its minimum amount
+  and notional at the MEXC bid, so a run of small fills is hedged as one order instead of waiting
+  on each other or being rejected. The amount is reserved before the order is sent. MEXC's place
+  call only acknowledges the order, so it is read back until its status is final, and only then
+  does whatever didn't execute go back to pending; an order that isn't final within
+  READBACK_TIMEOUT_SECONDS stays reserved and is listed as unconfirmed rather than hedged twice.
+  Executions are reported as MEXC fills to the position tracker. CoinEx fill to MEXC
+  acknowledgement is recorded as hedge.fill_to_ack.
+  '''
+  def __init__(
+    self,
+    pair: str,
+    client: MexcExchangeClient,
+    market_info: MarketInfo | None = None,
+    positions: PositionTracker | None = None,
+    taker_fee_rate: float = MEXC_TAKER_FEE_RATE,
+  ):
+    self.pair = pair.replace('-', '')
+    self.client = client
+    # MEXC's increments and minimums for the pair; without them amounts go out as plain str(float)
+    self.market_info = market_info
+    self.positions = positions
+    self.taker_fee_rate = taker_fee_rate
+
+    self.pending = 0.0               # base to sell on MEXC; negative means base to buy back
+    self.mexc_bba: BBA | None = None
+    self._first_fill_ns = 0          # perf_counter_ns of the oldest fill still pending
+    self._first_fill_ts: datetime | None = None
+    self._wakeup = asyncio.Event()
+    self._client_ids = itertools.count(1)
+
+    self.hedges = 0
+    self.hedged = 0.0
+    self.failures = 0
+    self.unconfirmed: dict[str, float] = {}  # order id -> signed amount reserved for a hedge of unknown outcome
+
+  def on_fill(self, fill: Fill):
+    """LocalOrderManager fill listener: queues the CoinEx amount for hedging and wakes the hedge loop."""
+    if fill.exchange != "CoinEx":
+      return
+    received = fill.amount - fill.fee_base if fill.side == Side.BUY else -fill.amount
+    if not self._first_fill_ns:
+      self._first_fill_ns = time.perf_counter_ns()
+      self._first_fill_ts = fill.ts
+    self.pending += received
+    self._wakeup.set()
+
+  def on_bba(self, bba: BBA):
+    self.mexc_bba = bba
+    if self.pending:
+      # A batch short of the minimum notional may clear it at the new price
+      self._wakeup.set()
+
+  def _hedge_side(self) -> str:
+    return "SELL" if self.pending > 0 else "BUY"
+
+  def _hedge_amount(self) -> float:
+    """Size of the next hedge order, 0 while the pending amount is too small to send."""
+    amount = abs(self.pending)
+    if self.market_info is None:
+      return amount if amount > 0 else 0.0
+    amount = self.market_info.round_amount(amount)
+    if self.mexc_bba is None:
+      # No price to check the minimum notional against yet
+      return amount if amount > 0 and amount >= self.market_info.min_amount and self.market_info.min_notional <= 0 else 0.0
+    price = self.mexc_bba.best_bid_price if self.pending > 0 else self.mexc_bba.best_ask_price
+    return amount if self.market_info.is_valid_order(price, amount) else 0.0
+
+  def _format_amount(self, amount: float) -> str:
+    return self.market_info.format_amount(amount) if self.market_info else str(amount)
+
+  async def hedge_once(self) -> bool:
+    """Sends one hedge for what is pending, if it is large enough; False when there was nothing to send."""
+    amount = self._hedge_amount()
+    if amount <= 0:
+      return False
+
+    side = self._hedge_side()
+    signed = amount if side == "SELL" else -amount
+    first_fill_ns, first_fill_ts = self._first_fill_ns, self._first_fill_ts
+    # Reserve before the await, so fills arriving while the order is in flight start a new batch
+    self.pending -= signed
+    # Any lot-size remainder goes out with the next batch, which is timed from that batch's first fill
+    self._first_fill_ns, self._first_fill_ts = 0, None
+    req = MexcPlaceOrderRequest(
+      symbol=self.pair,
+      side=side,
+      type="MARKET",
+      quantity=self._format_amount(amount),
+      client_order_id=f"hg{next(self._client_ids)}",
+    )
+
+    tracer.since("hedge.fill_to_send", first_fill_ns)
+    try:
+      ack = await asyncio.to_thread(self.client.place_order, req)
+    except Exception as e:
+      self.failures += 1
+      print(f"[ERROR] Failed to hedge {side} {req.quantity} {self.pair} on MEXC: {e}")
+      self._restore(signed, first_fill_ns, first_fill_ts)
+      return False
+    tracer.since("hedge.fill_to_ack", first_fill_ns)
+    if first_fill_ts is not None:
+      tracer.record("hedge.exchange_fill_to_ack", int((time.time() - first_fill_ts.timestamp()) * 1e9))
+
+    order = await self._read_final(ack.order_id)
+    if order is None:
+      # The order is in but its outcome is unknown; keep the amount reserved rather than hedge it twice
+      self.unconfirmed[ack.order_id] = signed
+      print(f"[ERROR] Hedge {ack.order_id} ({side} {req.quantity} {self.pair}) not final after {READBACK_TIMEOUT_SECONDS:g}s, leaving it reserved")
+      return True
+    self._on_executed(side, amount, order)
+    return True
+
+  async def _read_final(self, order_id: str) -> MexcOrderData | None:
+    """Polls the order until MEXC reports a final status; None if it doesn't within READBACK_TIMEOUT_SECONDS."""
+    deadline = time.monotonic() + READBACK_TIMEOUT_SECONDS
+    delay = READBACK_POLL_SECONDS
+    while True:
+      try:
+        order = await asyncio.to_thread(self.client.get_order, self.pair, order_id)
+        if order.status in FINAL_STATUSES:
+          return order
+      except Exception as e:
+        print(f"[ERROR] Failed to read back hedge {order_id}: {e}")
+      if time.monotonic() + delay > deadline:
+        return None
+      await asyncio.sleep(delay)
+      delay = min(delay * 2, READBACK_MAX_POLL_SECONDS)
+
+  def _restore(self, signed: float, first_fill_ns: int, first_fill_ts: datetime | None):
+    self.pending += signed
+    if first_fill_ns:
+      self._first_fill_ns, self._first_fill_ts = first_fill_ns, first_fill_ts
+
+  def _on_executed(self, side: str, amount: float, order: MexcOrderData):
+    executed = float(order.executed_qty or 0)
+    value = float(order.cummulative_quote_qty or 0)
+    if executed < amount:
+      # Market orders can stop short on a thin book; the rest goes back in the next batch
+      self._restore(amount - executed if side == "SELL" else executed - amount, 0, None)
+      self._wakeup.set()
+    if executed <= 0:
+      return
+
+    if value > 0:
+      price = value / executed
+    elif self.mexc_bba is not None:
+      price = self.mexc_bba.best_bid_price if side == "SELL" else self.mexc_bba.best_ask_price
+    else:
+      price = 0.0
+    self.hedges += 1
+    self.hedged += executed
+    print(f"[HEDGE MEXC] {side} {executed:g} {self.pair} @ {price:g}, {self.pending:g} still pending")
+    if self.positions is not None:
+      self.positions.on_fill(Fill(
+        ts = datetime.fromtimestamp(order.update_time / 1000, tz=timezone.utc) if order.update_time else datetime.now(tz=timezone.utc),
+        exchange = "MexC",
+        market = self.pair,
+        side = Side.SELL if side == "SELL" else Side.BUY,
+        price = price,
+        amount = executed,
+        fee_base = 0.0,
+        fee_quote = executed * price * self.taker_fee_rate,
+        is_maker = False,
+        order_id = int(order.order_id) if order.order_id.isdigit() else None,
+        client_id = order.client_order_id or None,
+      ))
+
+  def snapshot(self) -> dict:
+    return {
+      "pair": self.pair,
+      "pending": self.pending,
+      "hedges": self.hedges,
+      "hedged": self.hedged,
+      "failures": self.failures,
+      "unconfirmed": self.unconfirmed,
+    }
+
+  async def consume_bba(self, queue):
+    while True:
+      self.on_bba(await queue.get())
+
+  async def run(self):
+    while True:
+      await self._wakeup.wait()
+      self._wakeup.clear()
+      while await self.hedge_once():
+        pass
+      if self._hedge_amount() > 0:
+        # Stopped on a failed hedge; retry it shortly rather than on the next fill
+        await asyncio.sleep(RETRY_SECONDS)
+        self._wakeup.set()
@@ -0,0 +1,159 @@
+from libraries.analytics.queue_model import QueueModel
+from libraries.models.ladder_diff import LadderDiff
+from libraries.models.ladder_level import LadderLevel
+from libraries.models.market_info import MarketInfo
+from libraries.models.orderbook import Orderbook
+from libraries.models.tracked_order import TrackedOrder
+from utils.fixed_point import float_to_ticks, ticks_to_float
+
+class LadderPlanner:
+  '''
+  Works out where our bids should rest and how to get there from the orders already live.
+  The top level quotes at CoinEx's best bid while the arb to MEXC clears the threshold, and is
+  pinned at the threshold price otherwise. Lower levels join the next bid prices in CoinEx depth,
+  so every level sits in an existing queue. Each level is a visible order plus a larger hidden one.
+  With market_info, prices and amounts are worked out as integer ticks and lots (rounded down to
+  the market's increments) and orders below its minimum size or notional are left out.
+  With a queue_model, estimate_fill_times() gives orders about to be placed their expected fill time.
+  '''
+  def __init__(
+    self,
+    levels: int = 3,
+    level_weights: tuple[float, ...] = (0.5, 0.3, 0.2),
+    hidden_to_visible_ratio: float = 20.0,
+    market_info: MarketInfo | None = None,
+    queue_model: QueueModel | None = None,
+  ):
+    if len(level_weights) < levels:
+      raise ValueError("Need a weight for every ladder level")
+    self.levels = levels
+    self.level_weights = level_weights[:levels]
+    self.hidden_to_visible_ratio = hidden_to_visible_ratio
+    self.market_info = market_info
+    self.queue_model = queue_model
+
+  def top_price(self, coinex_bid: float, mexc_bid: float, minimum_bps_threshold: float) -> float:
+    """Highest bid that still clears the threshold against MEXC: the best bid, or the threshold price below it."""
+    threshold_price = mexc_bid / (1 + minimum_bps_threshold / 10_000)
+    return min(coinex_bid, threshold_price)
+
+  def top_ticks(self, coinex_bid_ticks: int, mexc_bid: float, minimum_bps_threshold: float) -> int:
+    """top_price in whole ticks. Flooring keeps the pinned price on the profitable side of the threshold."""
+    threshold_ticks = self.market_info.price_ticks(mexc_bid / (1 + minimum_bps_threshold / 10_000))  # type: ignore[union-attr]
+    return min(coinex_bid_ticks, threshold_ticks)
+
+  def level_prices(self, top_price: float, orderbook: Orderbook | None) -> list[float]:
+    prices = [top_price]
+    if orderbook:
+      for price, _ in orderbook.bids:
+        if len(prices) == self.levels:
+          break
+        if price < prices[-1]:
+          prices.append(price)
+    return prices
+
+  def level_ticks(self, top_ticks: int, orderbook: Orderbook | None) -> list[int]:
+    precision = self.market_info.price_precision  # type: ignore[union-attr]
+    ticks = [top_ticks]
+    if orderbook:
+      for price, _ in orderbook.bids:
+        if len(ticks) == self.levels:
+          break
+        # Depth prices are already on the tick grid, so rounding only removes float noise
+        price_ticks = float_to_ticks(price, precision)
+        if price_ticks < ticks[-1]:
+          ticks.append(price_ticks)
+    return ticks
+
+  def targets(
+    self,
+    coinex_bid: float,
+    mexc_bid: float,
+    minimum_bps_threshold: float,
+    orderbook: Orderbook | None,
+    amount_usd: float,
+    coinex_bid_ticks: int = 0,
+  ) -> list[LadderLevel]:
+    """
+    Target orders, top level first. With market_info every price and amount is an exact tick and
+    lot count; coinex_bid_ticks is the exchange's own bid when the feed parsed it, otherwise the
+    float bid is snapped to the grid.
+    """
+    info = self.market_info
+    if info:
+      top_ticks = self.top_ticks(coinex_bid_ticks or float_to_ticks(coinex_bid, info.price_precision), mexc_bid, minimum_bps_threshold)
+      if top_ticks <= 0:
+        return []
+      level_ticks = self.level_ticks(top_ticks, orderbook)
+      prices = [ticks_to_float(t, info.price_precision) for t in level_ticks]
+    else:
+      top = self.top_price(coinex_bid, mexc_bid, minimum_bps_threshold)
+      if top <= 0:
+        return []
+      prices = self.level_prices(top, orderbook)
+      level_ticks = [0] * len(prices)
+
+    # Depth may have fewer levels than we want; spread the full size over the ones we have
+    weights = self.level_weights[:len(prices)]
+    total_weight = sum(weights)
+
+    targets = []
+    for level, (price, price_ticks, weight) in enumerate(zip(prices, level_ticks, weights)):
+      level_usd = amount_usd * weight / total_weight
+      visible_usd = level_usd / (1 + self.hidden_to_visible_ratio)
+      hidden_usd = level_usd - visible_usd
+      targets.append(LadderLevel(price=price, amount=visible_usd / price, is_hide=False, level=level, price_ticks=price_ticks))
+      targets.append(LadderLevel(price=price, amount=hidden_usd / price, is_hide=True, level=level, price_ticks=price_ticks))
+
+    if info:
+      for target in targets:
+        target.amount_lots = info.amount_lots(target.amount)
+        target.amount = ticks_to_float(target.amount_lots, info.amount_precision)
+      targets = [t for t in targets if info.is_valid_order(t.price, t.amount)]
+    return targets
+
+  def estimate_fill_times(self, targets: list[LadderLevel], orderbook: Orderbook):
+    """
+    Sets expected_fill_seconds on each target from where it would queue in the current book. Only
+    called for orders actually being placed, so decide() doesn't pay for it on every quote.
+    """
+    model = self.queue_model
+    visible_at = {t.price: t.amount for t in targets if not t.is_hide}
+    for target in targets:
+      ahead = model.queue_ahead(orderbook, target.price, target.is_hide, visible_at.get(target.price, 0.0))  # type: ignore[union-attr]
+      level = model.book_level(orderbook, target.price)  # type: ignore[union-attr]
+      target.expected_fill_seconds = model.expected_fill_seconds(level, ahead, target.amount)  # type: ignore[union-attr]
+
+  def _order_key(self, order: TrackedOrder) -> tuple[float | int, bool]:
+    if not self.market_info:
+      return float(order.price), order.is_hide
+    if order.price_ticks is None:
+      # Orders adopted from the exchange arrive with a price string only; parse it once
+      order.price_ticks = self.market_info.parse_price_ticks(order.price)
+    return order.price_ticks, order.is_hide
+
+  def diff(self, targets: list[LadderLevel], live: list[TrackedOrder]) -> LadderDiff:
+    """
+    Minimal change set from live to targets. A live order is kept when a target has the same price
+    and visibility, regardless of size, so partially filled orders keep their queue position.
+    Everything else live is cancelled and every unmatched target is placed. With market_info
+    prices are compared as integer ticks, so float formatting can never force a requote.
+    """
+    result = LadderDiff()
+    unmatched: dict[tuple[float | int, bool], list[LadderLevel]] = {}
+    for target in targets:
+      key = (target.price_ticks if self.market_info else target.price, target.is_hide)
+      unmatched.setdefault(key, []).append(target)
+
+    for order in live:
+      matches = unmatched.get(self._order_key(order))
+      if matches:
+        matches.pop()
+        result.keeps.append(order)
+      else:
+        result.cancels.append(order)
+
+    for remaining in unmatched.values():
+      result.places.extend(remaining)
+    result.places.sort(key=lambda t: t.level)
+    return result
@@ -0,0 +1,288 @@
+import asyncio
+import itertools
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+from libraries.exchange_clients.coinex_request_scheduler import CoinexRequestScheduler
+from libraries.models.coinex_cancel_order_response import CoinexCancelOrderResponse
+from libraries.models.coinex_empty_response import CoinexEmptyResponse
+from libraries.models.coinex_order_data import CoinexOrderData
+from libraries.models.coinex_place_order_request import CoinexPlaceOrderRequest
+from libraries.models.coinex_place_order_response import CoinexPlaceOrderResponse
+from libraries.models.fill import Fill
+from libraries.models.order_status import OrderStatus
+from libraries.models.side import Side
+from libraries.models.tracked_order import TrackedOrder
+
+FillListener = Callable[[Fill], None]
+
+# Orders younger than this may legitimately be missing from the pending list (placed after the snapshot)
+RECONCILE_GRACE_SECONDS = 5.0
+# How long an order closed by a cancel-all is looked for in the finished list before its fills are given up on
+UNSETTLED_SECONDS = 120.0
+
+class LocalOrderManager:
+  '''
+  In-memory lifecycle of every order we send, keyed by client_id:
+    PENDING_NEW -> OPEN -> PARTIALLY_FILLED -> DONE
+                       \\-> PENDING_CANCEL ---/
+  Fed by REST responses, the private order stream and periodic reconciliation against CoinEx's
+  open/finished order lists, so strategies can read order state without a REST round trip.
+  Whichever source first shows an order's filled amount growing, the increase is passed to fill
+  listeners as one Fill, so every fill is reported exactly once however many sources repeat it.
+  '''
+  def __init__(self, client_id_prefix: str = "sa"):
+    self.orders: dict[str, TrackedOrder] = {}
+    self._client_ids_by_order_id: dict[int, str] = {}
+    self._sent_at: dict[str, float] = {}
+    self._cancel_sent_at: dict[str, float] = {}
+    self._unsettled: dict[str, float] = {}  # client_id -> when a cancel-all closed it, until its final fill is known
+    self._prefix = f"{client_id_prefix}{int(time.time())}"
+    self._counter = itertools.count(1)
+    self.fill_listeners: list[FillListener] = []
+
+  def new_client_id(self) -> str:
+    # CoinEx allows 1-32 letters, digits, '-' and '_'
+    return f"{self._prefix}_{next(self._counter)}"
+
+  def subscribe_fills(self, listener: FillListener):
+    """listener(fill) is called for every new fill on any order. Listeners must not block."""
+    self.fill_listeners.append(listener)
+
+  def get(self, client_id: str | None) -> TrackedOrder | None:
+    if client_id is None:
+      return None
+    return self.orders.get(client_id)
+
+  def live_orders(self, market: str | None = None) -> list[TrackedOrder]:
+    return [o for o in self.orders.values() if o.is_live and (market is None or o.market == market)]
+
+  def track_new(self, req: CoinexPlaceOrderRequest, price_ticks: int | None = None) -> TrackedOrder:
+    """Registers an order about to be sent, assigning it a client_id if it has none."""
+    if req.client_id is None:
+      req.client_id = self.new_client_id()
+
+    order = TrackedOrder(
+      client_id = req.client_id,
+      market = req.market.replace("-", ""),
+      side = req.side,
+      price = req.price,
+      amount = req.amount,
+      is_hide = bool(req.is_hide),
+      status = OrderStatus.PENDING_NEW,
+      price_ticks = price_ticks,
+    )
+    self.orders[order.client_id] = order
+    self._sent_at[order.client_id] = time.monotonic()
+    return order
+
+  def on_place_response(self, client_id: str, resp: CoinexPlaceOrderResponse | None, error: Exception | None = None):
+    order = self.orders.get(client_id)
+    if not order:
+      return
+
+    if error is not None or resp is None or resp.data is None:
+      order.status = OrderStatus.DONE
+      order.reject_reason = str(error) if error is not None else (resp.message if resp else "no response")
+      return
+    self.apply(resp.data, order=order)
+
+  def mark_pending_cancel(self, market: str):
+    now = time.monotonic()
+    for order in self.live_orders(market):
+      order.status = OrderStatus.PENDING_CANCEL
+      self._cancel_sent_at[order.client_id] = now
+
+  def mark_order_pending_cancel(self, client_id: str):
+    order = self.orders.get(client_id)
+    if order and order.is_live:
+      order.status = OrderStatus.PENDING_CANCEL
+      self._cancel_sent_at[client_id] = time.monotonic()
+
+  def on_cancel_all_response(self, market: str, resp: CoinexEmptyResponse | None, error: Exception | None = None):
+    """
+    A successful cancel-all closes every order it was sent for, but its response carries no fills, so
+    each order is also kept as unsettled until a finish event or the finished-order list in
+    reconcile() shows its final filled amount. On failure the outcome is unknown, so orders stay
+    PENDING_CANCEL for the private stream or reconciliation to settle.
+    """
+    if error is not None or resp is None or resp.code != 0:
+      return
+    now = time.monotonic()
+    for order in self.live_orders(market):
+      if order.status == OrderStatus.PENDING_CANCEL:
+        order.status = OrderStatus.DONE
+        self._unsettled[order.client_id] = now
+
+  def on_cancel_response(self, resp: CoinexCancelOrderResponse):
+    # A failed cancel (already filled or gone) carries no order; reconciliation settles those
+    if resp.code == 0 and resp.data is not None:
+      self.apply(resp.data, finished=True)
+
+  def on_order_update(self, event: str, data: CoinexOrderData):
+    """Private stream events: put, update, modify, finish."""
+    self.apply(data, finished=event == "finish")
+
+  def apply(self, data: CoinexOrderData, finished: bool = False, order: TrackedOrder | None = None):
+    order = order or self._find(data)
+    if order is None:
+      # Not sent by this process (a previous run, or the web UI): adopt it so it is visible and reconcilable
+      order = TrackedOrder(
+        client_id = data.client_id or f"order_{data.order_id}",
+        market = data.market,
+        side = data.side,
+        price = data.price,
+        amount = data.amount,
+        is_hide = False,
+        status = OrderStatus.OPEN,
+      )
+      # Fills from before we saw it were reported by whichever run placed it; only later ones are new
+      order.filled_amount = float(data.filled_amount or 0)
+      order.filled_value = float(data.filled_value or 0)
+      order.base_fee = float(data.base_fee or 0)
+      order.quote_fee = float(data.quote_fee or 0)
+      self.orders[order.client_id] = order
+
+    if data.updated_at and data.updated_at < order.updated_at:
+      return
+
+    order.data = data
+    order.updated_at = data.updated_at or order.updated_at
+    if data.order_id:
+      order.order_id = int(data.order_id)
+      self._client_ids_by_order_id[order.order_id] = order.client_id
+    filled_amount = float(data.filled_amount or 0)
+    if filled_amount > order.filled_amount:
+      self._on_filled(order, data, filled_amount)
+    order.filled_amount = filled_amount
+    order.filled_value = float(data.filled_value or 0)
+    order.base_fee = float(data.base_fee or 0)
+    order.quote_fee = float(data.quote_fee or 0)
+
+    if finished or (data.unfilled_amount != "" and float(data.unfilled_amount) == 0):
+      order.status = OrderStatus.DONE
+      self._unsettled.pop(order.client_id, None)
+    elif order.status == OrderStatus.PENDING_CANCEL:
+      # Still live until the exchange confirms the cancel
+      pass
+    elif order.filled_amount > 0:
+      order.status = OrderStatus.PARTIALLY_FILLED
+    else:
+      order.status = OrderStatus.OPEN
+
+  def _on_filled(self, order: TrackedOrder, data: CoinexOrderData, filled_amount: float):
+    """Reports the growth of an order's cumulative fill, fees and value since the last update as one Fill."""
+    amount = filled_amount - order.filled_amount
+    value = float(data.filled_value or 0) - order.filled_value
+    price = value / amount if value > 0 else float(data.last_fill_price or data.price or 0)
+    fee_base = max(0.0, float(data.base_fee or 0) - order.base_fee)
+    fee_quote = max(0.0, float(data.quote_fee or 0) - order.quote_fee)
+    fill = Fill(
+      ts = datetime.fromtimestamp(data.updated_at / 1000, tz=timezone.utc) if data.updated_at else datetime.now(tz=timezone.utc),
+      exchange = "CoinEx",
+      market = order.market,
+      side = Side.BUY if order.side == "buy" else Side.SELL,
+      price = price,
+      amount = amount,
+      fee_base = fee_base,
+      fee_quote = fee_quote,
+      is_maker = self._is_maker(data, fee_base * price + fee_quote, amount * price),
+      order_id = order.order_id,
+      client_id = order.client_id,
+    )
+    for listener in self.fill_listeners:
+      try:
+        listener(fill)
+      except Exception as e:
+        print(f"[ERROR] Fill listener failed for {order.client_id}: {e}")
+
+  @staticmethod
+  def _is_maker(data: CoinexOrderData, fee: float, value: float) -> bool:
+    """Which of the order's maker and taker fee rates the fee charged is closer to; maker when they can't be told apart."""
+    try:
+      maker_rate, taker_rate = float(data.maker_fee_rate), float(data.taker_fee_rate)
+    except ValueError:
+      return True
+    if maker_rate == taker_rate or value <= 0:
+      return True
+    rate = fee / value
+    return abs(rate - maker_rate) <= abs(rate - taker_rate)
+
+  def _find(self, data: CoinexOrderData) -> TrackedOrder | None:
+    if data.client_id and data.client_id in self.orders:
+      return self.orders[data.client_id]
+    if data.order_id:
+      client_id = self._client_ids_by_order_id.get(int(data.order_id))
+      if client_id:
+        return self.orders.get(client_id)
+    return None
+
+  def reconcile(self, market: str, pending: list[CoinexOrderData], finished: list[CoinexOrderData]):
+    """
+    Brings local state in line with the exchange's view of one market: pending orders are applied
+    as live, and local live orders missing from it are closed with their finished snapshot when
+    available, or closed outright when not. Orders a cancel-all closed are settled from their
+    finished snapshot too, so fills that raced the cancel still reach the fill listeners.
+    """
+    market = market.replace("-", "")
+    now = time.monotonic()
+    for data in pending:
+      order = self._find(data)
+      # Still open well after we asked to cancel it, so the cancel never landed
+      if order and order.status == OrderStatus.PENDING_CANCEL and now - self._cancel_sent_at.get(order.client_id, 0) > RECONCILE_GRACE_SECONDS:
+        order.status = OrderStatus.OPEN
+      self.apply(data, order=order)
+
+    pending_ids = {int(d.order_id) for d in pending if d.order_id}
+    finished_by_id = {int(d.order_id): d for d in finished if d.order_id}
+    for order in self.live_orders(market):
+      if order.order_id in pending_ids:
+        continue
+      if now - self._sent_at.get(order.client_id, 0) < RECONCILE_GRACE_SECONDS:
+        continue
+
+      if order.order_id is not None and order.order_id in finished_by_id:
+        self.apply(finished_by_id[order.order_id], finished=True)
+      else:
+        print(f"[RECONCILE] {order.client_id} not open on {market}, closing it locally")
+        order.status = OrderStatus.DONE
+
+    for client_id, closed_at in list(self._unsettled.items()):
+      order = self.orders.get(client_id)
+      if order is None or order.market != market:
+        continue
+      if order.order_id is not None and order.order_id in finished_by_id:
+        self.apply(finished_by_id[order.order_id], finished=True)
+      elif now - closed_at > UNSETTLED_SECONDS:
+        print(f"[RECONCILE] {client_id} cancelled on {market} but never in the finished list, its last fills may be missing")
+        del self._unsettled[client_id]
+
+  async def reconcile_once(self, scheduler: CoinexRequestScheduler, market: str):
+    pending, finished = await asyncio.gather(scheduler.get_pending_orders(market), scheduler.get_finished_orders(market))
+    self.reconcile(market, pending, finished)
+
+  async def run_reconciliation(self, scheduler: CoinexRequestScheduler, markets: list[str], interval: float = 15.0):
+    while True:
+      for market in markets:
+        try:
+          await self.reconcile_once(scheduler, market)
+        except Exception as e:
+          print(f"[ERROR] Reconciliation failed for {market}: {e}")
+      await asyncio.sleep(interval)
+
+  async def consume_gaps(self, queue, scheduler: CoinexRequestScheduler):
+    """Updates missed while the private stream was down are recovered by reconciling as soon as it resumes."""
+    while True:
+      gap = await queue.get()
+      if gap.is_open:
+        continue
+      try:
+        await self.reconcile_once(scheduler, gap.market)
+      except Exception as e:
+        print(f"[ERROR] Reconciliation after {gap.exchange} gap failed: {e}")
+
+  async def consume_order_updates(self, queue):
+    while True:
+      event, data = await queue.get()
+      self.on_order_update(event, data)
@@ -0,0 +1,222 @@
+import asyncio
+import json
+import os
+from datetime import datetime, timezone
+
+from libraries.models.bba import BBA
+from libraries.models.fill import Fill
+from libraries.models.side import Side
+
+POSITIONS_DIR = os.path.join("output", "positions")
+SNAPSHOT_PATH = os.path.join(POSITIONS_DIR, "positions.json")
+
+def load_snapshots(directory: str = POSITIONS_DIR) -> dict[str, dict]:
+  """Latest checkpointed snapshot of every tracker writing to `directory` (one file per process), by file name."""
+  snapshots = {}
+  try:
+    names = sorted(os.listdir(directory))
+  except FileNotFoundError:
+    return snapshots
+  for name in names:
+    if not name.endswith(".json"):
+      continue
+    try:
+      with open(os.path.join(directory, name)) as f:
+        snapshots[name[:-len(".json")]] = json.load(f)["snapshot"]
+    except (OSError, ValueError, KeyError):
+      continue
+  return snapshots
+
+class Position:
+  '''
+  Net inventory of one pair across exchanges, on average cost. Bids filled on CoinEx and hedges
+  sold on MEXC land in the same position, so the spread captured between them shows up as
+  realized PnL and whatever is left unhedged is the exposure marked to MEXC.
+  '''
+  __slots__ = ("market", "amount", "cost", "realized_pnl", "fees", "bought", "sold", "fills", "maker_fills", "mark", "by_exchange")
+
+  def __init__(self, market: str):
+    self.market = market
+    self.amount = 0.0        # base currency; negative when more has been sold than bought
+    self.cost = 0.0          # signed quote cost of `amount` at its average entry price
+    self.realized_pnl = 0.0  # quote, before fees
+    self.fees = 0.0          # quote, base fees valued at their fill price
+    self.bought = 0.0        # quote value, all time
+    self.sold = 0.0
+    self.fills = 0
+    self.maker_fills = 0
+    self.mark: float | None = None  # price the inventory would be unwound at: MEXC bid when long, ask when short
+    self.by_exchange: dict[str, float] = {}  # net base amount traded per exchange
+
+  @property
+  def avg_price(self) -> float | None:
+    return self.cost / self.amount if self.amount else None
+
+  @property
+  def exposure(self) -> float:
+    """Quote value of the inventory at the mark (at cost until there is one)."""
+    return self.amount * self.mark if self.mark is not None else self.cost
+
+  @property
+  def unrealized_pnl(self) -> float:
+    return self.exposure - self.cost
+
+  @property
+  def net_pnl(self) -> float:
+    return self.realized_pnl + self.unrealized_pnl - self.fees
+
+  def apply(self, fill: Fill):
+    # A base fee never reaches the wallet, so a buy adds only the net amount; the fee is counted in fees alone
+    signed = fill.amount - fill.fee_base if fill.side == Side.BUY else -fill.amount
+    if self.amount == 0 or (self.amount > 0) == (signed > 0):
+      # Opening or adding: cost grows at the fill price
+      self.cost += signed * fill.price
+      self.amount += signed
+    else:
+      closing = min(abs(signed), abs(self.amount))
+      avg = self.cost / self.amount
+      direction = 1.0 if self.amount > 0 else -1.0
+      self.realized_pnl += closing * (fill.price - avg) * direction
+      self.cost -= closing * direction * avg
+      self.amount -= closing * direction
+      opening = abs(signed) - closing
+      if opening > 0:
+        # Flipped through flat: the rest opens the other way at the fill price
+        self.amount = -direction * opening
+        self.cost = self.amount * fill.price
+      elif abs(self.amount) < 1e-12:
+        self.amount = self.cost = 0.0
+
+    self.fees += fill.fee_value
+    if fill.side == Side.BUY:
+      self.bought += fill.value
+    else:
+      self.sold += fill.value
+    self.fills += 1
+    self.maker_fills += fill.is_maker
+    self.by_exchange[fill.exchange] = self.by_exchange.get(fill.exchange, 0.0) + signed
+
+  def on_bba(self, bba: BBA):
+    self.mark = bba.best_bid_price if self.amount >= 0 else bba.best_ask_price
+
+  def snapshot(self) -> dict:
+    return {
+      "market": self.market,
+      "amount": self.amount,
+      "avg_price": self.avg_price,
+      "mark": self.mark,
+      "exposure": self.exposure,
+      "realized_pnl": self.realized_pnl,
+      "unrealized_pnl": self.unrealized_pnl,
+      "fees": self.fees,
+      "net_pnl": self.net_pnl,
+      "bought": self.bought,
+      "sold": self.sold,
+      "fills": self.fills,
+      "maker_fills": self.maker_fills,
+      "by_exchange": dict(self.by_exchange),
+    }
+
+  def state(self) -> dict:
+    return {name: getattr(self, name) for name in self.__slots__}
+
+  @classmethod
+  def from_state(cls, state: dict) -> "Position":
+    position = cls(state["market"])
+    for name in cls.__slots__:
+      if name in state:
+        setattr(position, name, state[name])
+    return position
+
+class PositionTracker:
+  '''
+  Live inventory and PnL per pair. Fills (from LocalOrderManager, REST or a private stream, and
+  the hedger's MEXC fills) and MEXC BBA updates each touch one Position, and portfolio totals are
+  adjusted by that position's change rather than re-summed, so every event is O(1) however many
+  pairs are running. Positions are checkpointed to JSON so a restart carries inventory over.
+  '''
+  def __init__(self, snapshot_path: str = SNAPSHOT_PATH):
+    self.snapshot_path = snapshot_path
+    self.positions: dict[str, Position] = {}
+    self.total_exposure = 0.0
+    self.total_realized_pnl = 0.0
+    self.total_unrealized_pnl = 0.0
+    self.total_fees = 0.0
+
+  def position(self, market: str) -> Position:
+    market = market.replace('-', '')
+    position = self.positions.get(market)
+    if position is None:
+      position = self.positions[market] = Position(market)
+    return position
+
+  def _update(self, position: Position, change):
+    """Runs change() on a position and moves the portfolio totals by its effect."""
+    exposure, realized, unrealized, fees = position.exposure, position.realized_pnl, position.unrealized_pnl, position.fees
+    change()
+    self.total_exposure += position.exposure - exposure
+    self.total_realized_pnl += position.realized_pnl - realized
+    self.total_unrealized_pnl += position.unrealized_pnl - unrealized
+    self.total_fees += position.fees - fees
+
+  def on_fill(self, fill: Fill):
+    position = self.position(fill.market)
+    self._update(position, lambda: position.apply(fill))
+    if position.mark is None:
+      # Until the first quote arrives, mark at the fill so exposure isn't reported as zero
+      self._update(position, lambda: setattr(position, "mark", fill.price))
+
+  def on_bba(self, bba: BBA):
+    position = self.positions.get(bba.market.replace('-', ''))
+    if position is not None:
+      self._update(position, lambda: position.on_bba(bba))
+
+  def snapshot(self) -> dict:
+    return {
+      "total_exposure": self.total_exposure,
+      "total_realized_pnl": self.total_realized_pnl,
+      "total_unrealized_pnl": self.total_unrealized_pnl,
+      "total_fees": self.total_fees,
+      "total_net_pnl": self.total_realized_pnl + self.total_unrealized_pnl - self.total_fees,
+      "positions": {market: p.snapshot() for market, p in sorted(self.positions.items())},
+    }
+
+  def save_checkpoint(self):
+    os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+    state = {
+      "saved_at": datetime.now(tz=timezone.utc).isoformat(),
+      "positions": {market: p.state() for market, p in self.positions.items()},
+      "snapshot": self.snapshot(),
+    }
+    # Write-then-rename so a reader never sees a half-written file
+    tmp_path = self.snapshot_path + ".tmp"
+    with open(tmp_path, "w") as f:
+      json.dump(state, f)
+    os.replace(tmp_path, self.snapshot_path)
+
+  def load_checkpoint(self) -> bool:
+    try:
+      with open(self.snapshot_path) as f:
+        state = json.load(f)
+    except (OSError, ValueError):
+      return False
+
+    self.positions = {market: Position.from_state(p) for market, p in state.get("positions", {}).items()}
+    # Totals are sums of the positions; recomputed once here, then kept up to date per event
+    self.total_exposure = sum(p.exposure for p in self.positions.values())
+    self.total_realized_pnl = sum(p.realized_pnl for p in self.positions.values())
+    self.total_unrealized_pnl = sum(p.unrealized_pnl for p in self.positions.values())
+    self.total_fees = sum(p.fees for p in self.positions.values())
+    return True
+
+  async def consume_bba(self, queue):
+    while True:
+      self.on_bba(await queue.get())
+
+  async def run_checkpoints(self, interval: float = 10.0):
+    while True:
+      await asyncio.sleep(interval)
+      try:
+        self.save_checkpoint()
+      except OSError as e:
+        print(f"[ERROR] Failed to checkpoint positions: {e}")
@@ -0,0 +1,84 @@
+import bisect
+import sqlite3
+from datetime import datetime, timedelta
+
+from libraries.models.bba import BBA
+
+SNAPSHOT_INTERVAL_SECONDS = 60.0
+
+# Values of the bba table's `kind` column
+CHANGE = "change"      # the quote differs from the last one stored
+SNAPSHOT = "snapshot"  # unchanged quote re-stored so readers can tell "still valid" from "feed was down"
+
+class BbaChangeFilter:
+  '''
+  Decides which BBA updates are worth a row. CoinEx pushes bbo.update whenever updated_at moves,
+  even with identical prices and sizes; those duplicates carry no information for an as-of reader.
+  An update is stored when its (bid, bid size, ask, ask size) differs from the last stored one, and
+  an unchanged quote is re-stored every snapshot_interval so quiet pairs still show they were live.
+  '''
+  def __init__(self, snapshot_interval: float = SNAPSHOT_INTERVAL_SECONDS):
+    self.snapshot_interval = timedelta(seconds=snapshot_interval)
+    self._last: dict[str, tuple[tuple[float, float, float, float], datetime]] = {}
+    self.seen = 0
+    self.stored = 0
+
+  def classify(self, bba: BBA) -> str | None:
+    """CHANGE or SNAPSHOT when the update should be stored, None when it is a duplicate."""
+    self.seen += 1
+    quote = (bba.best_bid_price, bba.best_bid_size, bba.best_ask_price, bba.best_ask_size)
+    last = self._last.get(bba.market)
+    if last is None or last[0] != quote:
+      kind = CHANGE
+    elif bba.ts - last[1] >= self.snapshot_interval:
+      kind = SNAPSHOT
+    else:
+      return None
+
+    self._last[bba.market] = (quote, bba.ts)
+    self.stored += 1
+    return kind
+
+class BbaAsOf:
+  '''
+  The BBA step function of one market over a window, loaded from the change-only bba table with
+  one sorted scan. as_of() is a binary search for the quote in force at a time. Rows are at most
+  snapshot_interval apart while the feed is up, so a quote older than max_age means we were not
+  receiving data and as_of() says so by returning None rather than a stale price.
+  '''
+  def __init__(self, rows: list[BBA], max_age: float = 2 * SNAPSHOT_INTERVAL_SECONDS):
+    self.rows = rows
+    self.times = [row.ts.timestamp() for row in rows]
+    self.max_age = max_age
+
+  @classmethod
+  def load(cls, conn: sqlite3.Connection, market: str, start: datetime, end: datetime, exchange: str = "CoinEx", max_age: float = 2 * SNAPSHOT_INTERVAL_SECONDS) -> "BbaAsOf":
+    columns = "ts, best_bid_price, best_bid_size, best_ask_price, best_ask_size"
+    # The quote in force when the window opens, then every stored change inside it
+    seed = conn.execute(
+      f"SELECT {columns} FROM bba WHERE exchange = ? AND market = ? AND ts < ? ORDER BY ts DESC LIMIT 1",
+      (exchange, market, start.isoformat()),
+    ).fetchall()
+    rows = conn.execute(
+      f"SELECT {columns} FROM bba WHERE exchange = ? AND market = ? AND ts >= ? AND ts < ? ORDER BY ts ASC",
+      (exchange, market, start.isoformat(), end.isoformat()),
+    ).fetchall()
+    return cls([BBA(datetime.fromisoformat(r[0]), market, r[1], r[2], r[3], r[4]) for r in seed + rows], max_age)
+
+  def as_of(self, ts: datetime) -> BBA | None:
+    t = ts.timestamp()
+    i = bisect.bisect_right(self.times, t) - 1
+    if i < 0 or t - self.times[i] > self.max_age:
+      return None
+    return self.rows[i]
+
+  def steps(self) -> list[tuple[datetime, BBA]]:
+    """Distinct quotes in time order with when each took effect, snapshots (repeats) collapsed."""
+    steps: list[tuple[datetime, BBA]] = []
+    for row in self.rows:
+      if steps:
+        prev = steps[-1][1]
+        if (prev.best_bid_price, prev.best_bid_size, prev.best_ask_price, prev.best_ask_size) == (row.best_bid_price, row.best_bid_size, row.best_ask_price, row.best_ask_size):
+          continue
+      steps.append((row.ts, row))
+    return steps
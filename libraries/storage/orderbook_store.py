@@ -0,0 +1,219 @@
+import json
+import sqlite3
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+from libraries.models.orderbook import Orderbook
+
+KEYFRAME_INTERVAL_SECONDS = 60.0  # a block (and its keyframe) covers at most this much time
+MAX_BLOCK_UPDATES = 2_000         # ...or this many depth updates, whichever comes first
+COMPRESS_LEVEL = 6
+
+def _levels_to_dict(levels) -> dict[float, float]:
+  return {price: size for price, size in levels}
+
+def _diff(prev: dict[float, float], current: dict[float, float]) -> list[list[float]]:
+  """Level changes turning `prev` into `current`: [price, size] for new or resized levels, [price, 0] for removed ones."""
+  changes = [[price, size] for price, size in current.items() if prev.get(price) != size]
+  changes.extend([price, 0] for price in prev if price not in current)
+  return changes
+
+def _apply(book: dict[float, float], changes: list[list[float]]):
+  for price, size in changes:
+    if size:
+      book[price] = size
+    else:
+      book.pop(price, None)
+
+def _parse_ts(ts: str) -> datetime:
+  return datetime.fromisoformat(ts)
+
+class _OpenBlock:
+  __slots__ = ("start", "bids", "asks", "keyframe", "offsets", "deltas")
+
+  def __init__(self, ob: Orderbook):
+    self.start = ob.ts
+    self.bids = _levels_to_dict(ob.bids)
+    self.asks = _levels_to_dict(ob.asks)
+    self.keyframe = [[list(level) for level in ob.bids], [list(level) for level in ob.asks]]
+    self.offsets = [0]  # microseconds since the keyframe, one per update including the keyframe
+    self.deltas: list[list[list[list[float]]]] = []  # [bid changes, ask changes] per update after the keyframe
+
+class OrderbookBlockWriter:
+  '''
+  Turns one market's stream of depth snapshots into orderbook_blocks rows. A block opens with a full
+  keyframe of the book; every later update in it is stored as the levels that changed since the
+  previous one (a removed level has size 0). A block closes after keyframe_interval or max_updates
+  and is written as one zlib-compressed JSON blob, so a point-in-time read decodes one block and
+  replays at most one interval of deltas. Closed blocks wait in `pending` to be persisted.
+  '''
+  def __init__(self, market: str, exchange: str = "CoinEx", keyframe_interval: float = KEYFRAME_INTERVAL_SECONDS, max_updates: int = MAX_BLOCK_UPDATES):
+    self.market = market.replace('-', '')
+    self.exchange = exchange
+    self.keyframe_interval = timedelta(seconds=keyframe_interval)
+    self.max_updates = max_updates
+    self._block: _OpenBlock | None = None
+    self.pending: list[tuple] = []  # closed blocks as orderbook_blocks rows
+    self.updates = 0       # depth updates in closed blocks
+    self.stored_bytes = 0  # their compressed size
+
+  def append(self, ob: Orderbook):
+    block = self._block
+    if block is not None and (ob.ts - block.start >= self.keyframe_interval or len(block.offsets) >= self.max_updates):
+      self._close()
+      block = None
+
+    if block is None:
+      block = self._block = _OpenBlock(ob)
+    else:
+      offset = (ob.ts - block.start) // timedelta(microseconds=1)
+      block.offsets.append(max(offset, block.offsets[-1]))  # keep offsets sorted if an update arrives out of order
+      bids, asks = _levels_to_dict(ob.bids), _levels_to_dict(ob.asks)
+      block.deltas.append([_diff(block.bids, bids), _diff(block.asks, asks)])
+      block.bids, block.asks = bids, asks
+
+  def _close(self):
+    block, self._block = self._block, None
+    if block is None:
+      return
+    data = encode_block(block.keyframe, block.offsets, block.deltas)
+    end = block.start + timedelta(microseconds=block.offsets[-1])
+    self.pending.append((self.exchange, self.market, block.start.isoformat(), end.isoformat(), len(block.offsets), data))
+    self.updates += len(block.offsets)
+    self.stored_bytes += len(data)
+
+  def flush(self, now: datetime | None = None):
+    """Closes the open block once its interval has passed by `now`, so a quiet market still gets written out."""
+    block = self._block
+    if block is not None and (now or datetime.now(tz=timezone.utc)) - block.start >= self.keyframe_interval:
+      self._close()
+
+  def close(self):
+    """Closes the open block regardless of its age, e.g. on shutdown."""
+    self._close()
+
+  def take_pending(self) -> list[tuple]:
+    rows, self.pending = self.pending, []
+    return rows
+
+def encode_block(keyframe: list, offsets: list[int], deltas: list) -> bytes:
+  payload = {"k": keyframe, "t": offsets, "d": deltas}
+  return zlib.compress(json.dumps(payload, separators=(",", ":")).encode(), COMPRESS_LEVEL)
+
+class _Block:
+  '''A decoded block plus a replay cursor, so lookups moving forward in time only apply the new deltas.'''
+  __slots__ = ("start", "start_ts", "keyframe", "offsets", "deltas", "position", "bids", "asks")
+
+  def __init__(self, start_ts: str, data: bytes):
+    payload = json.loads(zlib.decompress(data))
+    self.start_ts = start_ts
+    self.start = _parse_ts(start_ts)
+    self.keyframe = payload["k"]
+    self.offsets: list[int] = payload["t"]
+    self.deltas = payload["d"]
+    self.rewind()
+
+  def rewind(self):
+    self.position = 0  # index of the update the book currently reflects
+    self.bids = _levels_to_dict(self.keyframe[0])
+    self.asks = _levels_to_dict(self.keyframe[1])
+
+  def step(self):
+    """Applies the next update's deltas."""
+    self.position += 1
+    bid_changes, ask_changes = self.deltas[self.position - 1]
+    _apply(self.bids, bid_changes)
+    _apply(self.asks, ask_changes)
+
+  def seek(self, offset: int):
+    """Moves the book to the last update at or before `offset` microseconds into the block."""
+    if offset < self.offsets[self.position]:
+      self.rewind()
+    offsets = self.offsets
+    while self.position + 1 < len(offsets) and offsets[self.position + 1] <= offset:
+      self.step()
+
+  def book(self, market: str) -> Orderbook:
+    return Orderbook(
+      ts = self.start + timedelta(microseconds=self.offsets[self.position]),
+      market = market,
+      bids = sorted(self.bids.items(), reverse=True),
+      asks = sorted(self.asks.items()),
+    )
+
+def has_blocks(conn: sqlite3.Connection) -> bool:
+  """False for databases recorded before orderbook_blocks existed."""
+  return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'orderbook_blocks'").fetchone() is not None
+
+class OrderbookHistory:
+  '''
+  Point-in-time reads over one market's orderbook_blocks. The (exchange, market, start_ts) index
+  is the time -> keyframe index: book_at() finds the block covering a time with one index seek,
+  decodes it and replays its deltas up to that time. The last decoded block stays cached with its
+  replay position, so a run of lookups in time order (a backtest) costs one decode per block.
+  '''
+  def __init__(self, conn: sqlite3.Connection, market: str, exchange: str = "CoinEx"):
+    self.conn = conn
+    self.market = market
+    self.exchange = exchange
+    self._block: _Block | None = None
+    self._next_start_ts: str | None = None  # where the cached block stops being the one in force
+
+  def _block_rows(self, where: str, params: tuple, order: str = "ASC", limit: str = ""):
+    return self.conn.execute(
+      f"SELECT start_ts, data FROM orderbook_blocks WHERE exchange = ? AND market = ? AND {where} ORDER BY start_ts {order} {limit}",
+      (self.exchange, self.market, *params),
+    ).fetchall()
+
+  def _cached_covers(self, ts_s: str) -> bool:
+    block = self._block
+    return block is not None and block.start_ts <= ts_s and self._next_start_ts is not None and ts_s < self._next_start_ts
+
+  def book_at(self, ts: datetime) -> Orderbook | None:
+    """The book as of the last recorded update at or before `ts`, None if nothing was recorded before it."""
+    ts_s = ts.isoformat()
+    if not self._cached_covers(ts_s):
+      rows = self._block_rows("start_ts <= ?", (ts_s,), "DESC", "LIMIT 1")
+      if not rows:
+        return None
+      start_ts, data = rows[0]
+      if self._block is None or self._block.start_ts != start_ts:
+        self._block = _Block(start_ts, data)
+      # Looked up again while this is the newest block, as the recorder may still append the next one
+      following = self.conn.execute(
+        "SELECT start_ts FROM orderbook_blocks WHERE exchange = ? AND market = ? AND start_ts > ? ORDER BY start_ts ASC LIMIT 1",
+        (self.exchange, self.market, start_ts),
+      ).fetchone()
+      self._next_start_ts = following[0] if following else None
+
+    block = self._block
+    block.seek((ts - block.start) // timedelta(microseconds=1))
+    return block.book(self.market)
+
+  def iter_books(self, start: datetime, end: datetime) -> Iterator[Orderbook]:
+    """The book in force when [start, end) opens, then every recorded update inside it, in time order."""
+    start_s, end_s = start.isoformat(), end.isoformat()
+    blocks = self._block_rows("start_ts <= ?", (start_s,), "DESC", "LIMIT 1") + self._block_rows("start_ts > ? AND start_ts < ?", (start_s, end_s))
+
+    seed = None
+    for start_ts, data in blocks:
+      block = _Block(start_ts, data)
+      offsets = block.offsets
+      start_offset = (start - block.start) // timedelta(microseconds=1)
+      end_offset = (end - block.start) // timedelta(microseconds=1)
+      for position in range(len(offsets)):
+        if position:
+          block.step()
+        if offsets[position] < start_offset:
+          if position + 1 == len(offsets) or offsets[position + 1] >= start_offset:
+            seed = block.book(self.market)
+          continue
+        if offsets[position] >= end_offset:
+          break
+        if seed is not None:
+          yield seed
+          seed = None
+        yield block.book(self.market)
+    if seed is not None:
+      yield seed
@@ -0,0 +1,197 @@
+import asyncio
+import os
+import struct
+from datetime import datetime, timezone
+
+from libraries.models.bba import BBA
+from libraries.models.side import Side
+from libraries.models.trade import Trade
+
+TICK_DIR = os.path.join("output", "ticks")
+INDEX_STRIDE = 1024  # one sparse index entry every this many records
+
+# Fixed-width little-endian records; ts is epoch microseconds. Each struct and dtype describe the same bytes.
+BBA_RECORD = struct.Struct("<qdddd")
+BBA_DTYPE = [("ts", "<i8"), ("bid", "<f8"), ("bid_size", "<f8"), ("ask", "<f8"), ("ask_size", "<f8")]
+TRADE_RECORD = struct.Struct("<qddb7x")  # side: 1 taker buy, -1 taker sell; padded to 32 bytes so fields stay aligned
+TRADE_DTYPE = [("ts", "<i8"), ("price", "<f8"), ("amount", "<f8"), ("side", "i1"), ("_pad", "V7")]
+INDEX_RECORD = struct.Struct("<qq")      # (ts of the record, record number)
+INDEX_DTYPE = [("ts", "<i8"), ("record", "<i8")]
+
+STREAMS = {
+  "bba": (BBA_RECORD, BBA_DTYPE),
+  "trades": (TRADE_RECORD, TRADE_DTYPE),
+}
+
+def to_us(ts: datetime) -> int:
+  """Epoch microseconds, the tick store's time unit."""
+  return int(ts.timestamp()) * 1_000_000 + ts.microsecond
+
+def from_us(ts_us: int) -> datetime:
+  return datetime.fromtimestamp(ts_us // 1_000_000, tz=timezone.utc).replace(microsecond=ts_us % 1_000_000)
+
+def market_dir(market: str, exchange: str = "CoinEx", root: str = TICK_DIR) -> str:
+  return os.path.join(root, exchange, market.replace('-', ''))
+
+def list_markets(exchange: str = "CoinEx", root: str = TICK_DIR) -> list[str]:
+  try:
+    return sorted(os.listdir(os.path.join(root, exchange)))
+  except FileNotFoundError:
+    return []
+
+class _StreamWriter:
+  '''
+  Appends fixed-width records of one stream to <stream>.bin and every INDEX_STRIDE-th record's
+  time to <stream>.idx. Opening repairs a crash mid-write: a torn trailing record is cut off and
+  index entries are rebuilt from the data, so both files only ever grow by whole records.
+  '''
+  def __init__(self, directory: str, stream: str):
+    self.record, _ = STREAMS[stream]
+    self.data_path = os.path.join(directory, f"{stream}.bin")
+    self.index_path = os.path.join(directory, f"{stream}.idx")
+    self._buffer = bytearray()
+    self._index_buffer = bytearray()
+    self.count, self.last_ts = self._repair()
+    self.clamped = 0  # records written with an earlier timestamp than the one before, stored at that one's time
+
+  def _repair(self) -> tuple[int, int]:
+    size = self.record.size
+    with open(self.data_path, "ab+") as data:
+      count = data.seek(0, os.SEEK_END) // size
+      data.truncate(count * size)
+
+      with open(self.index_path, "ab+") as index:
+        entries = index.seek(0, os.SEEK_END) // INDEX_RECORD.size
+        entries = min(entries, (count + INDEX_STRIDE - 1) // INDEX_STRIDE)
+        index.truncate(entries * INDEX_RECORD.size)
+        for record in range(entries * INDEX_STRIDE, count, INDEX_STRIDE):
+          data.seek(record * size)
+          ts = struct.unpack_from("<q", data.read(8))[0]
+          index.write(INDEX_RECORD.pack(ts, record))
+
+      last_ts = 0
+      if count:
+        data.seek((count - 1) * size)
+        last_ts = struct.unpack_from("<q", data.read(8))[0]
+    return count, last_ts
+
+  def append(self, ts: int, *values):
+    # Readers binary search on ts, so it must never go backwards
+    if ts < self.last_ts:
+      ts = self.last_ts
+      self.clamped += 1
+    self.last_ts = ts
+
+    if self.count % INDEX_STRIDE == 0:
+      self._index_buffer += INDEX_RECORD.pack(ts, self.count)
+    self._buffer += self.record.pack(ts, *values)
+    self.count += 1
+
+  def flush(self):
+    # Data before index, so an index entry never points past the end of the data
+    if self._buffer:
+      with open(self.data_path, "ab") as f:
+        f.write(self._buffer)
+      self._buffer.clear()
+    if self._index_buffer:
+      with open(self.index_path, "ab") as f:
+        f.write(self._index_buffer)
+      self._index_buffer.clear()
+
+class TickStoreWriter:
+  '''
+  Appends one market's BBA and trade updates to its tick store directory. Updates are packed into
+  memory and written in one append per stream on flush(), so the recorder pays a struct.pack per
+  update and a write per interval. The files are append-only: copying or rsyncing them while the
+  recorder runs always gives a readable store.
+  '''
+  def __init__(self, market: str, exchange: str = "CoinEx", root: str = TICK_DIR):
+    self.market = market.replace('-', '')
+    self.directory = market_dir(self.market, exchange, root)
+    os.makedirs(self.directory, exist_ok=True)
+    self.bba = _StreamWriter(self.directory, "bba")
+    self.trades = _StreamWriter(self.directory, "trades")
+
+  def on_bba(self, bba: BBA):
+    self.bba.append(to_us(bba.ts), bba.best_bid_price, bba.best_bid_size, bba.best_ask_price, bba.best_ask_size)
+
+  def on_trade(self, trade: Trade):
+    self.trades.append(to_us(trade.ts), trade.price, trade.amount, 1 if trade.taker_side == Side.BUY else -1)
+
+  def flush(self):
+    self.bba.flush()
+    self.trades.flush()
+
+  async def run_flush(self, interval: float = 1.0):
+    while True:
+      await asyncio.sleep(interval)
+      try:
+        self.flush()
+      except OSError as e:
+        print(f"[ERROR] Failed to flush tick store for {self.market}: {e}")
+
+class TickStore:
+  '''
+  Read side of one market's tick store. bba and trades are NumPy structured arrays memory-mapped
+  straight onto the files, so opening months of data costs a few syscalls and columns are read
+  from the page cache on demand, never parsed or copied. Time lookups binary search the sparse
+  index (small enough to stay in memory) and then at most INDEX_STRIDE records of the column.
+  Call refresh() to see records appended since the store was opened.
+  '''
+  def __init__(self, market: str, exchange: str = "CoinEx", root: str = TICK_DIR):
+    self.market = market.replace('-', '')
+    self.directory = market_dir(self.market, exchange, root)
+    self.refresh()
+
+  def refresh(self):
+    import numpy as np
+
+    self._data = {}
+    self._index = {}
+    for stream, (record, dtype) in STREAMS.items():
+      dtype = np.dtype(dtype)
+      path = os.path.join(self.directory, f"{stream}.bin")
+      count = os.path.getsize(path) // record.size if os.path.exists(path) else 0
+      # A torn trailing record from a recorder mid-write is left out by mapping whole records only
+      self._data[stream] = np.memmap(path, dtype=dtype, mode="r", shape=(count,)) if count else np.zeros(0, dtype=dtype)
+
+      index_path = os.path.join(self.directory, f"{stream}.idx")
+      index = np.fromfile(index_path, dtype=np.dtype(INDEX_DTYPE)) if os.path.exists(index_path) else np.zeros(0, dtype=np.dtype(INDEX_DTYPE))
+      self._index[stream] = index[index["record"] < count]
+
+  @property
+  def bba(self):
+    """Every recorded BBA: fields ts (epoch us), bid, bid_size, ask, ask_size."""
+    return self._data["bba"]
+
+  @property
+  def trades(self):
+    """Every recorded trade: fields ts (epoch us), price, amount, side (1 taker buy, -1 taker sell)."""
+    return self._data["trades"]
+
+  def search(self, stream: str, ts: datetime | int, side: str = "left") -> int:
+    """Position of `ts` in the stream's time column, as numpy.searchsorted would return it."""
+    import numpy as np
+
+    ts_us = ts if isinstance(ts, int) else to_us(ts)
+    data = self._data[stream]
+    index = self._index[stream]
+    k = int(np.searchsorted(index["ts"], ts_us, side))
+    lo = int(index["record"][k - 1]) if k > 0 else 0
+    hi = int(index["record"][k]) if k < len(index) else len(data)
+    return lo + int(np.searchsorted(data["ts"][lo:hi], ts_us, side))
+
+  def between(self, stream: str, start: datetime | int, end: datetime | int):
+    """Records in [start, end) as a view onto the mapped file."""
+    return self._data[stream][self.search(stream, start):self.search(stream, end)]
+
+  def bba_between(self, start: datetime | int, end: datetime | int):
+    return self.between("bba", start, end)
+
+  def trades_between(self, start: datetime | int, end: datetime | int):
+    return self.between("trades", start, end)
+
+  def bba_at(self, ts: datetime | int):
+    """The BBA record in force at `ts` (the last one at or before it), None before the first."""
+    i = self.search("bba", ts, side="right") - 1
+    return self.bba[i] if i >= 0 else None
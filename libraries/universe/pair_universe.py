@@ -0,0 +1,137 @@
+import json
+import os
+import time
+
+from libraries.models.market_info import MarketInfo
+
+COINEX_HTTP = "https://api.coinex.com"
+MEXC_HTTP = "https://api.mexc.com"
+CACHE_DIR = os.path.join("output", "universe")
+CACHE_TTL_SECONDS = 3600
+MEXC_ONLINE_STATUSES = ("1", "ENABLED", "TRADING")
+
+def _parse_coinex(markets: list[dict], tickers: list[dict]) -> dict[str, MarketInfo]:
+  volumes = {t["market"]: float(t.get("value") or 0) for t in tickers}
+  infos = {}
+  for m in markets:
+    infos[m["market"]] = MarketInfo(
+      exchange = "CoinEx",
+      market = m["market"],
+      base = m["base_ccy"],
+      quote = m["quote_ccy"],
+      price_precision = int(m["quote_ccy_precision"]),
+      amount_precision = int(m["base_ccy_precision"]),
+      min_amount = float(m.get("min_amount") or 0),
+      min_notional = 0.0,
+      quote_volume = volumes.get(m["market"], 0.0),
+      tradable = m.get("status", "online") == "online" and m.get("is_api_trading_available", True),
+    )
+  return infos
+
+def _parse_mexc(symbols: list[dict], tickers: list[dict]) -> dict[str, MarketInfo]:
+  volumes = {t["symbol"]: float(t.get("quoteVolume") or 0) for t in tickers}
+  infos = {}
+  for s in symbols:
+    infos[s["symbol"]] = MarketInfo(
+      exchange = "MexC",
+      market = s["symbol"],
+      base = s["baseAsset"],
+      quote = s["quoteAsset"],
+      price_precision = int(s["quotePrecision"]),
+      amount_precision = int(s["baseAssetPrecision"]),
+      min_amount = float(s.get("baseSizePrecision") or 0),
+      min_notional = float(s.get("quoteAmountPrecision") or 0),
+      quote_volume = volumes.get(s["symbol"], 0.0),
+      tradable = str(s.get("status")) in MEXC_ONLINE_STATUSES and s.get("isSpotTradingAllowed", True),
+    )
+  return infos
+
+class PairUniverse:
+  '''
+  Market metadata for CoinEx and MEXC (precision, minimum size and notional, 24h volume), fetched
+  from each exchange's public REST API and cached on disk for ttl_seconds so restarts and
+  dashboard reruns don't refetch. If a refresh fails the stale cache is used rather than nothing.
+  tradable_pairs() is the set worth running feeds for: listed and trading on both exchanges.
+  '''
+  def __init__(self, cache_dir: str = CACHE_DIR, ttl_seconds: float = CACHE_TTL_SECONDS, coinex_url: str = COINEX_HTTP, mexc_url: str = MEXC_HTTP):
+    self.cache_dir = cache_dir
+    self.ttl_seconds = ttl_seconds
+    self.coinex_url = coinex_url
+    self.mexc_url = mexc_url
+    self._session = None  # created on the first fetch, so a warm cache never imports requests
+    self._markets: dict[str, dict[str, MarketInfo]] = {}
+
+  def _get(self, url: str) -> dict | list:
+    if self._session is None:
+      import requests
+      self._session = requests.Session()
+    resp = self._session.get(url, timeout=10)
+    resp.raise_for_status()
+    return resp.json()
+
+  def _fetch(self, exchange: str) -> dict[str, MarketInfo]:
+    if exchange == "CoinEx":
+      markets = self._get(f"{self.coinex_url}/v2/spot/market")["data"]  # type: ignore[index]
+      tickers = self._get(f"{self.coinex_url}/v2/spot/ticker")["data"]  # type: ignore[index]
+      return _parse_coinex(markets, tickers)
+    symbols = self._get(f"{self.mexc_url}/api/v3/exchangeInfo")["symbols"]  # type: ignore[index]
+    tickers = self._get(f"{self.mexc_url}/api/v3/ticker/24hr")
+    return _parse_mexc(symbols, tickers)  # type: ignore[arg-type]
+
+  def _cache_path(self, exchange: str) -> str:
+    return os.path.join(self.cache_dir, f"{exchange.lower()}_markets.json")
+
+  def _read_cache(self, exchange: str) -> tuple[float, dict[str, MarketInfo]] | None:
+    try:
+      with open(self._cache_path(exchange)) as f:
+        cached = json.load(f)
+      return cached["fetched_at"], {m: MarketInfo(**info) for m, info in cached["markets"].items()}
+    except (OSError, ValueError, KeyError, TypeError):
+      return None
+
+  def _write_cache(self, exchange: str, markets: dict[str, MarketInfo]):
+    os.makedirs(self.cache_dir, exist_ok=True)
+    path = self._cache_path(exchange)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+      json.dump({"fetched_at": time.time(), "markets": {m: vars(info) for m, info in markets.items()}}, f)
+    os.replace(tmp_path, path)
+
+  def markets(self, exchange: str, refresh: bool = False) -> dict[str, MarketInfo]:
+    """Every market on `exchange` ("CoinEx" or "MexC") keyed by symbol, from memory, disk cache or the API."""
+    if not refresh and exchange in self._markets:
+      return self._markets[exchange]
+
+    cached = self._read_cache(exchange)
+    if not refresh and cached and time.time() - cached[0] < self.ttl_seconds:
+      self._markets[exchange] = cached[1]
+      return cached[1]
+
+    try:
+      markets = self._fetch(exchange)
+      self._write_cache(exchange, markets)
+    except Exception as e:
+      if not cached:
+        raise
+      print(f"[ERROR {exchange}] Market metadata refresh failed, using cache from {time.ctime(cached[0])}: {e}")
+      markets = cached[1]
+
+    self._markets[exchange] = markets
+    return markets
+
+  def market(self, exchange: str, pair: str) -> MarketInfo | None:
+    return self.markets(exchange).get(pair.replace("-", ""))
+
+  def tradable_pairs(self, quote: str = "USDT", min_quote_volume: float = 0.0) -> list[str]:
+    """Pairs like XEC-USDT trading on both exchanges, by CoinEx 24h quote volume, highest first."""
+    coinex = self.markets("CoinEx")
+    mexc = self.markets("MexC")
+    overlap = [
+      info for symbol, info in coinex.items()
+      if info.quote == quote
+      and info.tradable
+      and info.quote_volume >= min_quote_volume
+      and symbol in mexc and mexc[symbol].tradable
+    ]
+    overlap.sort(key=lambda info: info.quote_volume, reverse=True)
+    return [info.pair for info in overlap]
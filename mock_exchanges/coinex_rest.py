@@ -0,0 +1,263 @@
+import argparse
+import hashlib
+import hmac
+import itertools
+import json
+import threading
+import time
+from collections import deque
+from typing import Callable
+from urllib.parse import parse_qsl
+
+from mock_exchanges.market_sim import COINEX, MarketSim, SimMarket
+from mock_exchanges.rest_server import MockError, RateLimiter, serve
+
+MOCK_ACCESS_ID = "mock"
+MOCK_SECRET = "mock"
+MAKER_FEE_RATE = 0.001
+TAKER_FEE_RATE = 0.002
+FINISHED_KEPT = 1000  # finished orders kept per market for finished-order queries
+
+# Requests per second per endpoint, CoinEx's published per-user limits
+ENDPOINT_LIMITS = {"place": 30, "cancel": 60, "query": 10}
+ENDPOINTS = {
+  "/v2/spot/order": "place",
+  "/v2/spot/cancel-order": "cancel",
+  "/v2/spot/cancel-all-order": "cancel",
+  "/v2/spot/pending-order": "query",
+  "/v2/spot/finished-order": "query",
+}
+
+# Response codes as CoinEx sends them, in a 200 response
+SIGN_ERROR = 25
+INVALID_ARGUMENT = 3008
+ORDER_NOT_FOUND = 3600
+RATE_LIMITED = 4213
+
+OrderListener = Callable[[str, dict], None]
+
+def _num(x: float) -> str:
+  """Plain decimal string, never exponent notation."""
+  return f"{x:.12f}".rstrip("0").rstrip(".") or "0"
+
+def _error(code: int, message: str) -> MockError:
+  return MockError(200, {"code": code, "data": {}, "message": message})
+
+class MockCoinexExchange:
+  '''
+  In-memory stand-in for CoinEx's v2 spot REST API: signed order placement, cancel, cancel-all,
+  and pending and finished order queries, with CoinEx's per-endpoint rate limits answered with
+  code 4213, plus the public market and ticker lists for the pair universe. Limit orders rest
+  until the simulated tape trades through them (on_deals, fed by the websocket mock) and fill at
+  maker fees; marketable ones fill at the touch as taker. Every change is passed to
+  order_listeners as a private-stream order.update event (put, update or finish).
+  '''
+  def __init__(self, sim: MarketSim, access_id: str = MOCK_ACCESS_ID, secret_key: str = MOCK_SECRET, rate_limits: dict[str, int] | None = ENDPOINT_LIMITS, latency_ms: float = 0.0):
+    self.sim = sim
+    self.access_id = access_id
+    self.secret_key = secret_key.encode("latin-1")
+    self.limiter = RateLimiter(rate_limits or {})
+    self.latency_ms = latency_ms
+    self.order_listeners: list[OrderListener] = []
+    self.open_orders: dict[str, dict[int, dict]] = {}   # market -> order_id -> order
+    self.finished: dict[str, deque[dict]] = {}
+    self._order_ids = itertools.count(100_000_000)
+    self._lock = threading.Lock()
+    self.placed = 0
+    self.fills = 0
+    self.rate_limited = 0
+
+  def _check(self, method: str, path: str, qs: str, headers, body: bytes):
+    ts = headers.get("X-COINEX-TIMESTAMP") or ""
+    to_sign = (method + path + ("?" + qs if qs else "")).encode("latin-1") + body + ts.encode("latin-1")
+    expected = hmac.new(self.secret_key, to_sign, hashlib.sha256).hexdigest()
+    if headers.get("X-COINEX-KEY") != self.access_id or not hmac.compare_digest(headers.get("X-COINEX-SIGN") or "", expected):
+      raise _error(SIGN_ERROR, "signature error")
+
+  def handle(self, method: str, path: str, qs: str, headers, body: bytes) -> dict:
+    if path == "/v2/spot/market":
+      return {"code": 0, "data": self._markets(), "message": "OK"}
+    if path == "/v2/spot/ticker":
+      return {"code": 0, "data": [{"market": m.symbol, "value": _num(m.volume)} for m in self.sim.markets.values()], "message": "OK"}
+
+    self._check(method, path, qs, headers, body)
+    endpoint = ENDPOINTS.get(path)
+    if endpoint and not self.limiter.allow(endpoint):
+      self.rate_limited += 1
+      raise _error(RATE_LIMITED, "rate limit exceeded")
+    if self.latency_ms:
+      time.sleep(self.latency_ms / 1000)
+
+    params = json.loads(body) if body else dict(parse_qsl(qs))
+    if path == "/v2/account/info":
+      return {"code": 0, "data": {"user_id": 1}, "message": "OK"}
+    if path == "/v2/spot/order" and method == "POST":
+      return {"code": 0, "data": self.place(params), "message": "OK"}
+    if path == "/v2/spot/cancel-order":
+      return {"code": 0, "data": self.cancel(params["market"], int(params["order_id"])), "message": "OK"}
+    if path == "/v2/spot/cancel-all-order":
+      self.cancel_all(params["market"], params.get("side"))
+      return {"code": 0, "data": {}, "message": "OK"}
+    if path in ("/v2/spot/pending-order", "/v2/spot/finished-order"):
+      return self._list(path, params)
+    raise MockError(404, {"code": 404, "message": f"{path} not found"})
+
+  def _market(self, symbol: str) -> SimMarket:
+    market = self.sim.get(symbol or "")
+    if market is None:
+      raise _error(INVALID_ARGUMENT, f"invalid market {symbol}")
+    return market
+
+  def _markets(self) -> list[dict]:
+    return [
+      {
+        "market": m.symbol,
+        "base_ccy": m.base,
+        "quote_ccy": m.quote,
+        "base_ccy_precision": m.amount_precision,
+        "quote_ccy_precision": m.price_precision,
+        "min_amount": _num(10 ** -m.amount_precision),
+        "maker_fee_rate": _num(MAKER_FEE_RATE),
+        "taker_fee_rate": _num(TAKER_FEE_RATE),
+        "status": "online",
+        "is_api_trading_available": True,
+      }
+      for m in self.sim.markets.values()
+    ]
+
+  def _notify(self, event: str, order: dict):
+    for listener in self.order_listeners:
+      listener(event, dict(order))
+
+  def place(self, params: dict) -> dict:
+    market = self._market(params.get("market"))
+    side, order_type = params.get("side"), params.get("type")
+    amount = float(params.get("amount") or 0)
+    price = float(params.get("price") or 0)
+    if side not in ("buy", "sell") or order_type not in ("limit", "market") or amount <= 0 or (order_type == "limit" and price <= 0):
+      raise _error(INVALID_ARGUMENT, "invalid argument")
+
+    now = int(time.time() * 1000)
+    order = {
+      "order_id": next(self._order_ids),
+      "market": market.symbol,
+      "market_type": "SPOT",
+      "ccy": market.base,
+      "side": side,
+      "type": order_type,
+      "amount": params["amount"],
+      "price": params.get("price") or "0",
+      "unfilled_amount": params["amount"],
+      "filled_amount": "0",
+      "filled_value": "0",
+      "client_id": params.get("client_id") or "",
+      "base_fee": "0",
+      "quote_fee": "0",
+      "discount_fee": "0",
+      "maker_fee_rate": _num(MAKER_FEE_RATE),
+      "taker_fee_rate": _num(TAKER_FEE_RATE),
+      "last_fill_amount": "0",
+      "last_fill_price": "0",
+      "created_at": now,
+      "updated_at": now,
+    }
+    with self._lock:
+      self.placed += 1
+      self._notify("put", order)
+      bid, ask = self.sim.best(market, COINEX)
+      touch = ask if side == "buy" else bid
+      if order_type == "market" or (price >= touch if side == "buy" else price <= touch):
+        # Marketable: takes the touch in full
+        self._fill(order, amount, touch, TAKER_FEE_RATE)
+      else:
+        self.open_orders.setdefault(market.symbol, {})[order["order_id"]] = order
+      return dict(order)
+
+  def _fill(self, order: dict, amount: float, price: float, fee_rate: float):
+    filled = float(order["filled_amount"]) + amount
+    unfilled = max(0.0, float(order["amount"]) - filled)
+    # Fees are taken in the currency received: base on buys, quote on sells
+    if order["side"] == "buy":
+      order["base_fee"] = _num(float(order["base_fee"]) + amount * fee_rate)
+    else:
+      order["quote_fee"] = _num(float(order["quote_fee"]) + amount * price * fee_rate)
+    order["filled_amount"] = _num(filled)
+    order["filled_value"] = _num(float(order["filled_value"]) + amount * price)
+    order["unfilled_amount"] = _num(unfilled)
+    order["last_fill_amount"] = _num(amount)
+    order["last_fill_price"] = _num(price)
+    order["updated_at"] = int(time.time() * 1000)
+    self.fills += 1
+    self._notify("update", order)
+    if unfilled <= 1e-12:
+      self._finish(order)
+
+  def _finish(self, order: dict):
+    self.open_orders.get(order["market"], {}).pop(order["order_id"], None)
+    self.finished.setdefault(order["market"], deque(maxlen=FINISHED_KEPT)).appendleft(order)
+    self._notify("finish", order)
+
+  def on_deals(self, market: SimMarket, deals: list[tuple[str, float, float]]):
+    """Fills resting orders the simulated tape trades through: taker sells at or below a bid, taker buys at or above an ask."""
+    with self._lock:
+      orders = self.open_orders.get(market.symbol)
+      if not orders:
+        return
+      for side, price, amount in deals:
+        resting = [o for o in orders.values() if o["side"] == ("buy" if side == "sell" else "sell")]
+        if side == "sell":
+          crossed = sorted((o for o in resting if float(o["price"]) >= price), key=lambda o: -float(o["price"]))
+        else:
+          crossed = sorted((o for o in resting if float(o["price"]) <= price), key=lambda o: float(o["price"]))
+        for order in crossed:
+          if amount <= 0:
+            break
+          fill = min(amount, float(order["unfilled_amount"]))
+          amount -= fill
+          self._fill(order, fill, float(order["price"]), MAKER_FEE_RATE)
+
+  def cancel(self, symbol: str, order_id: int) -> dict:
+    with self._lock:
+      order = self.open_orders.get(symbol.replace("-", ""), {}).get(order_id)
+      if order is None:
+        raise _error(ORDER_NOT_FOUND, "order not found")
+      order["updated_at"] = int(time.time() * 1000)
+      self._finish(order)
+      return dict(order)
+
+  def cancel_all(self, symbol: str, side: str | None = None):
+    with self._lock:
+      for order in list(self.open_orders.get(symbol.replace("-", ""), {}).values()):
+        if side is None or order["side"] == side:
+          order["updated_at"] = int(time.time() * 1000)
+          self._finish(order)
+
+  def _list(self, path: str, params: dict) -> dict:
+    symbol = (params.get("market") or "").replace("-", "")
+    page, limit = int(params.get("page") or 1), int(params.get("limit") or 10)
+    with self._lock:
+      if path == "/v2/spot/pending-order":
+        orders = sorted(self.open_orders.get(symbol, {}).values(), key=lambda o: -o["order_id"])
+      else:
+        orders = list(self.finished.get(symbol, ()))
+      start = (page - 1) * limit
+      return {
+        "code": 0,
+        "data": [dict(o) for o in orders[start:start + limit]],
+        "message": "OK",
+        "pagination": {"total": len(orders), "has_next": start + limit < len(orders)},
+      }
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Local mock of CoinEx's signed v2 spot order endpoints. Orders only fill when run with the websocket mock, see mock_exchanges.launch.")
+  parser.add_argument("--host", default="127.0.0.1")
+  parser.add_argument("--port", type=int, default=8082)
+  parser.add_argument("--markets", type=int, default=100, help="Markets to list, including the real pairs")
+  parser.add_argument("--access_id", default=MOCK_ACCESS_ID)
+  parser.add_argument("--secret_key", default=MOCK_SECRET)
+  args = parser.parse_args()
+
+  exchange = MockCoinexExchange(MarketSim(args.markets), args.access_id, args.secret_key)
+  serve(exchange, args.host, args.port)
+  print(f"Mock CoinEx REST on http://{args.host}:{args.port} (access id {args.access_id!r}), {len(exchange.sim.markets)} markets")
+  threading.Event().wait()
@@ -0,0 +1,150 @@
+import hashlib
+import hmac
+import itertools
+import json
+import time
+import zlib
+from typing import Callable
+
+from websockets.asyncio.server import ServerConnection
+
+from mock_exchanges.market_sim import COINEX, MarketSim, SimMarket
+from mock_exchanges.ws_server import MockWsServer
+
+# Frames per second per subscribed market; about what CoinEx sends for an active small cap
+COINEX_RATES = {"bba": 5.0, "trades": 1.0, "depth": 5.0}
+DEPTH_LIMITS = (5, 10, 20, 50)
+DEPTH_LEVELS = 5
+
+# Error codes as CoinEx returns them in subscription acks
+INVALID_ARGUMENT = 20001
+INVALID_MARKET = 30001
+UNAUTHORIZED = 21001
+
+DealListener = Callable[[SimMarket, list[tuple[str, float, float]]], None]
+
+def _frame(message: dict) -> bytes:
+  # CoinEx gzips every server frame, acks included. A gzip-wrapped compressobj at the lowest memory
+  # level costs a fraction of gzip.compress, whose per-call setup dominates on frames this small
+  compressor = zlib.compressobj(1, zlib.DEFLATED, 16 + zlib.MAX_WBITS, 1)
+  return compressor.compress(json.dumps(message, separators=(",", ":")).encode()) + compressor.flush()
+
+class MockCoinexWs(MockWsServer):
+  '''
+  CoinEx v2 spot websocket stand-in: bbo, deals and depth subscriptions by market_list, gzip JSON
+  frames, server.ping, and the authenticated order stream (server.sign then order.subscribe)
+  fed by push_order from the REST mock. Depth is always sent as full DEPTH_LEVELS snapshots.
+  deal_listeners see every simulated deal, which is how the REST mock fills resting orders.
+  '''
+  name = COINEX
+
+  def __init__(self, sim: MarketSim, rates: dict[str, float] | None = None, host: str = "127.0.0.1", port: int = 0, access_id: str = "mock", secret_key: str = "mock"):
+    super().__init__(sim, rates or COINEX_RATES, host, port)
+    self.access_id = access_id
+    self.secret_key = secret_key.encode("latin-1")
+    self.deal_listeners: list[DealListener] = []
+    self._deal_ids = itertools.count(1)
+    self._signed: set[ServerConnection] = set()
+    self._order_subscribers: dict[str, set[ServerConnection]] = {}
+
+  def _ack(self, ws: ServerConnection, req_id, code: int = 0, message: str = "OK", data: dict | None = None):
+    reply = {"id": req_id, "code": code, "message": message}
+    if data is not None:
+      reply["data"] = data
+    self.send([ws], _frame(reply))
+
+  async def on_message(self, ws: ServerConnection, raw: str | bytes):
+    try:
+      request = json.loads(raw)
+      method, params, req_id = request["method"], request.get("params") or {}, request.get("id")
+    except (ValueError, KeyError, TypeError):
+      self._ack(ws, None, INVALID_ARGUMENT, "invalid argument")
+      return
+
+    if method == "server.ping":
+      self._ack(ws, req_id, data={"result": "pong"})
+    elif method == "server.sign":
+      expected = hmac.new(self.secret_key, str(params.get("timestamp")).encode("latin-1"), hashlib.sha256).hexdigest()
+      if params.get("access_id") != self.access_id or not hmac.compare_digest(str(params.get("signed_str")), expected):
+        self._ack(ws, req_id, UNAUTHORIZED, "signature error")
+        return
+      self._signed.add(ws)
+      self._ack(ws, req_id)
+    elif method in ("bbo.subscribe", "deals.subscribe", "depth.subscribe", "order.subscribe"):
+      self._subscribe(ws, method, params, req_id)
+    else:
+      self._ack(ws, req_id, INVALID_ARGUMENT, f"method {method} not found")
+
+  def _subscribe(self, ws: ServerConnection, method: str, params: dict, req_id):
+    entries = params.get("market_list") or []
+    if method == "depth.subscribe":
+      if any(not isinstance(e, list) or len(e) != 4 or e[1] not in DEPTH_LIMITS for e in entries):
+        self._ack(ws, req_id, INVALID_ARGUMENT, "invalid argument")
+        return
+      symbols = [e[0] for e in entries]
+    else:
+      symbols = entries
+    unknown = [s for s in symbols if self.sim.get(s) is None]
+    if unknown:
+      self._ack(ws, req_id, INVALID_MARKET, f"invalid market: {', '.join(map(str, unknown))}")
+      return
+
+    if method == "order.subscribe":
+      if ws not in self._signed:
+        self._ack(ws, req_id, UNAUTHORIZED, "unauthorized, call server.sign first")
+        return
+      for symbol in symbols:
+        self._order_subscribers.setdefault(symbol, set()).add(ws)
+    else:
+      topic = {"bbo.subscribe": "bba", "deals.subscribe": "trades", "depth.subscribe": "depth"}[method]
+      for symbol in symbols:
+        self.subscribe(ws, topic, symbol)
+    self._ack(ws, req_id)
+
+  def _drop(self, ws: ServerConnection):
+    super()._drop(ws)
+    self._signed.discard(ws)
+    for subscribers in self._order_subscribers.values():
+      subscribers.discard(ws)
+
+  def push_order(self, event: str, order: dict):
+    """Sends an order.update (event put, update or finish) to the connections subscribed to its market."""
+    subscribers = self._order_subscribers.get(order["market"])
+    if subscribers:
+      self.send(subscribers, _frame({"method": "order.update", "data": {"event": event, "order": order}, "id": None}))
+
+  def encode(self, topic: str, market: SimMarket) -> bytes:
+    now_ms = int(time.time() * 1000)
+    if topic == "bba":
+      self.sim.step(market)
+      bids, asks = self.sim.levels(market, COINEX, 1)
+      return _frame({"method": "bbo.update", "data": {
+        "market": market.symbol,
+        "updated_at": now_ms,
+        "best_bid_price": bids[0][0],
+        "best_bid_size": bids[0][1],
+        "best_ask_price": asks[0][0],
+        "best_ask_size": asks[0][1],
+      }, "id": None})
+
+    if topic == "trades":
+      deals = self.sim.deals(market, COINEX, 1 + int(self.sim.rng.expovariate(1.0)))
+      for listener in self.deal_listeners:
+        listener(market, deals)
+      return _frame({"method": "deals.update", "data": {"market": market.symbol, "deal_list": [
+        {
+          "deal_id": next(self._deal_ids),
+          "created_at": now_ms,
+          "side": side,
+          "price": f"{price:.{market.price_precision}f}",
+          "amount": f"{amount:.{market.amount_precision}f}",
+        }
+        for side, price, amount in deals
+      ]}, "id": None})
+
+    bids, asks = self.sim.levels(market, COINEX, DEPTH_LEVELS)
+    return _frame({"method": "depth.update", "data": {
+      "market": market.symbol,
+      "is_full": True,
+      "depth": {"asks": asks, "bids": bids, "last": bids[0][0] if bids else "0", "updated_at": now_ms, "checksum": 0},
+    }, "id": None})
@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import os
+
+from libraries.runtime import performance
+from mock_exchanges.coinex_rest import MOCK_ACCESS_ID, MOCK_SECRET, MockCoinexExchange
+from mock_exchanges.coinex_ws import COINEX_RATES, MockCoinexWs
+from mock_exchanges.market_sim import DEFAULT_PAIRS, MarketSim
+from mock_exchanges.mexc_rest import MockMexcExchange
+from mock_exchanges.mexc_ws import MEXC_RATES, MockMexcWs
+from mock_exchanges.rest_server import serve
+
+PAIRS_FILE = os.path.join("output", "mock_exchanges", "pairs.txt")
+
+def _scaled(rates: dict[str, float], load: float) -> dict[str, float]:
+  return {topic: rate * load for topic, rate in rates.items()}
+
+async def main(args):
+  sim = MarketSim(args.markets, tuple(args.pairs), args.mexc_premium_bps, args.volatility_bps, seed=args.seed)
+  coinex_ws = MockCoinexWs(sim, _scaled(COINEX_RATES, args.load), args.host, args.coinex_ws_port, args.access_id, args.secret_key)
+  mexc_ws = MockMexcWs(sim, _scaled(MEXC_RATES, args.load), args.host, args.mexc_ws_port)
+
+  coinex_rest = MockCoinexExchange(sim, args.access_id, args.secret_key, latency_ms=args.latency_ms)
+  mexc_rest = MockMexcExchange(latency_ms=args.latency_ms, api_key=args.access_id, secret_key=args.secret_key, sim=sim)
+  # REST handlers run on server threads; order updates reach the private stream through the loop
+  loop = asyncio.get_running_loop()
+  coinex_rest.order_listeners.append(lambda event, order: loop.call_soon_threadsafe(coinex_ws.push_order, event, order))
+  coinex_ws.deal_listeners.append(coinex_rest.on_deals)
+  serve(coinex_rest, args.host, args.coinex_rest_port)
+  serve(mexc_rest, args.host, args.mexc_rest_port)
+
+  # One pair per line, for feeding every simulated market to the recorder: --pairs @output/mock_exchanges/pairs.txt
+  os.makedirs(os.path.dirname(PAIRS_FILE), exist_ok=True)
+  with open(PAIRS_FILE, "w") as f:
+    f.write("\n".join(sim.pairs()) + "\n")
+
+  coinex_ws_url = f"ws://{args.host}:{args.coinex_ws_port}"
+  mexc_ws_url = f"ws://{args.host}:{args.mexc_ws_port}"
+  coinex_http_url = f"http://{args.host}:{args.coinex_rest_port}"
+  mexc_http_url = f"http://{args.host}:{args.mexc_rest_port}"
+  print(f"[MOCK] {len(sim.markets)} markets at {args.load:g}x load, pair list in {PAIRS_FILE}")
+  print(f"[MOCK] CoinEx REST on {coinex_http_url}, MEXC REST on {mexc_http_url} (key and secret {args.access_id!r} / {args.secret_key!r})")
+  print("Point the apps at it with:")
+  print(f"  python -m app.data_ingestion_orchestrator --coinex_ws_url {coinex_ws_url} --pairs @{PAIRS_FILE} --db output/mock_arb_data.db")
+  print(
+    f"  COINEX_ACCESS_ID={args.access_id} COINEX_SECRET_KEY={args.secret_key} MEXC_ACCESS_KEY={args.access_id} MEXC_SECRET_KEY={args.secret_key} "
+    f"python -m app.order_manager {sim.pairs()[0]} 50 --hedge --coinex_ws_url {coinex_ws_url} --mexc_ws_url {mexc_ws_url} "
+    f"--coinex_http_url {coinex_http_url} --mexc_http_url {mexc_http_url}"
+  )
+  await asyncio.gather(coinex_ws.run(), mexc_ws.run())
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Run local CoinEx and MEXC stand-ins (public websockets, CoinEx private order stream, REST order endpoints) on simulated markets.")
+  parser.add_argument("--host", default="127.0.0.1")
+  parser.add_argument("--markets", type=int, default=100, help="Markets to simulate, including --pairs (default: 100)")
+  parser.add_argument("--pairs", nargs="+", default=list(DEFAULT_PAIRS), help="Real pair names to include, e.g. XEC-USDT")
+  parser.add_argument(
+    "--load", type=float, default=1.0,
+    help=f"Multiplier on the per-market frame rates (CoinEx {COINEX_RATES}, MEXC {MEXC_RATES} per second), e.g. 10 for 10x production"
+  )
+  parser.add_argument("--mexc_premium_bps", type=float, default=40.0, help="How far MEXC's book sits above CoinEx's (default: 40)")
+  parser.add_argument("--volatility_bps", type=float, default=2.0, help="Random-walk step of each market's mid per quote update (default: 2)")
+  parser.add_argument("--latency_ms", type=float, default=0.0, help="Delay added to every signed REST response")
+  parser.add_argument("--seed", type=int, default=1)
+  parser.add_argument("--coinex_ws_port", type=int, default=8080)
+  parser.add_argument("--mexc_ws_port", type=int, default=8081)
+  parser.add_argument("--coinex_rest_port", type=int, default=8082)
+  parser.add_argument("--mexc_rest_port", type=int, default=8083)
+  parser.add_argument("--access_id", default=MOCK_ACCESS_ID, help="API key both mocks accept")
+  parser.add_argument("--secret_key", default=MOCK_SECRET)
+  parser.add_argument(
+    "--perf_mode", action="store_true",
+    help=f"Run on uvloop with a frozen, retuned GC (also enabled by {performance.PERF_MODE_ENV}=1)"
+  )
+  args = parser.parse_args()
+
+  performance.run(main(args), perf_mode=performance.perf_mode_requested(args.perf_mode))
@@ -0,0 +1,104 @@
+import math
+import random
+
+COINEX = "CoinEx"
+MEXC = "MexC"
+DEFAULT_PAIRS = ("BTT-USDT", "XEC-USDT", "PENDLE-USDT")
+
+def _precision(price: float, significant: int = 5) -> int:
+  """Decimals that give a price about `significant` significant digits, as exchanges list small caps."""
+  return max(0, significant - 1 - math.floor(math.log10(price)))
+
+class SimMarket:
+  __slots__ = ("symbol", "base", "quote", "mid", "price_precision", "amount_precision", "tick", "volume")
+
+  def __init__(self, base: str, quote: str, mid: float, amount_precision: int = 2):
+    self.symbol = base + quote
+    self.base = base
+    self.quote = quote
+    self.mid = mid
+    self.price_precision = _precision(mid)
+    self.amount_precision = amount_precision
+    self.tick = 10.0 ** -self.price_precision
+    self.volume = 0.0  # quote value traded on the simulated tape
+
+  @property
+  def pair(self) -> str:
+    return f"{self.base}-{self.quote}"
+
+class MarketSim:
+  '''
+  Synthetic markets shared by the mock exchanges: each has a mid price on a random walk, stepped
+  every time a server publishes for it, and CoinEx and MEXC quote around it with MEXC's book
+  `mexc_premium_bps` higher, so the strategy sees an arb to chase. Prices come out as the fixed
+  decimal strings the exchanges send, on each market's tick size.
+  '''
+  def __init__(
+    self,
+    markets: int = 100,
+    pairs: tuple[str, ...] = DEFAULT_PAIRS,
+    mexc_premium_bps: float = 40.0,
+    volatility_bps: float = 2.0,
+    spread_ticks: int = 2,
+    seed: int = 1,
+  ):
+    self.rng = random.Random(seed)
+    self.mexc_premium = mexc_premium_bps / 1e4
+    self.volatility = volatility_bps / 1e4
+    self.spread_ticks = spread_ticks
+    self.markets: dict[str, SimMarket] = {}
+    for pair in pairs:
+      base, quote = pair.split("-")
+      self._add(SimMarket(base, quote, self._random_price()))
+    for i in range(max(0, markets - len(pairs))):
+      self._add(SimMarket(f"SIM{i:05d}", "USDT", self._random_price()))
+
+  def _add(self, market: SimMarket):
+    self.markets[market.symbol] = market
+
+  def _random_price(self) -> float:
+    # Log-uniform from micro caps to majors, like the listings the universe scans
+    return 10.0 ** self.rng.uniform(-6, 3)
+
+  def pairs(self) -> list[str]:
+    return [m.pair for m in self.markets.values()]
+
+  def get(self, symbol: str) -> SimMarket | None:
+    return self.markets.get(symbol.replace("-", ""))
+
+  def step(self, market: SimMarket):
+    market.mid *= math.exp(self.rng.gauss(0.0, self.volatility))
+
+  def _fmt(self, market: SimMarket, price: float) -> str:
+    return f"{price:.{market.price_precision}f}"
+
+  def _size(self, market: SimMarket) -> str:
+    # 10 to 10,000 USDT a level
+    return f"{(10.0 + self.rng.random() * 9990.0) / market.mid:.{market.amount_precision}f}"
+
+  def best(self, market: SimMarket, exchange: str = COINEX) -> tuple[float, float]:
+    """Best bid and ask prices on `exchange`, on the market's tick."""
+    mid = market.mid * (1 + self.mexc_premium) if exchange == MEXC else market.mid
+    ticks = mid / market.tick
+    bid = max(1, math.floor(ticks - self.spread_ticks / 2))
+    return bid * market.tick, (bid + self.spread_ticks) * market.tick
+
+  def levels(self, market: SimMarket, exchange: str, depth: int) -> tuple[list[list[str]], list[list[str]]]:
+    """Top `depth` bid and ask levels as [price, size] strings, best first."""
+    bid, ask = self.best(market, exchange)
+    tick = market.tick
+    bids = [[self._fmt(market, bid - k * tick), self._size(market)] for k in range(depth) if bid - k * tick > 0]
+    asks = [[self._fmt(market, ask + k * tick), self._size(market)] for k in range(depth)]
+    return bids, asks
+
+  def deals(self, market: SimMarket, exchange: str, count: int) -> list[tuple[str, float, float]]:
+    """Taker trades at the touch as (side, price, amount): sells hit the bid, buys lift the ask."""
+    bid, ask = self.best(market, exchange)
+    deals = []
+    for _ in range(count):
+      side = "buy" if self.rng.random() < 0.5 else "sell"
+      price = ask if side == "buy" else bid
+      amount = round(10.0 ** self.rng.uniform(0, 3) / market.mid, market.amount_precision)
+      market.volume += price * amount
+      deals.append((side, price, amount))
+    return deals
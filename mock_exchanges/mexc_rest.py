@@ -0,0 +1,176 @@
+import argparse
+import hashlib
+import hmac
+import itertools
+import threading
+import time
+from urllib.parse import parse_qsl
+
+from mock_exchanges.market_sim import MEXC, MarketSim
+from mock_exchanges.rest_server import MockError, serve
+
+MOCK_KEY = "mock"
+MOCK_SECRET = "mock"
+
+def _error(status: int, code: int, msg: str) -> MockError:
+  return MockError(status, {"code": code, "msg": msg})
+
+class MockMexcExchange:
+  '''
+  In-memory stand-in for MEXC's spot order endpoints. Requests are checked the way MEXC checks
+  them (API key header, HMAC-SHA256 of the query string, recvWindow), MARKET orders execute at
+  once against the quote, and LIMIT orders rest until cancelled. The quote is a fixed spread
+  around `price`, or each market's MEXC touch when running on a MarketSim, which also serves the
+  public exchangeInfo and 24hr ticker endpoints the pair universe reads. fill_ratio below 1 makes
+  market orders execute only partially, as they can on a thin book, and new_reads makes the first
+  reads of each market order report it NEW with nothing executed, as MEXC can right after the ack.
+  '''
+  def __init__(
+    self,
+    price: float = 1.0,
+    spread_bps: float = 10.0,
+    fill_ratio: float = 1.0,
+    latency_ms: float = 0.0,
+    api_key: str = MOCK_KEY,
+    secret_key: str = MOCK_SECRET,
+    sim: MarketSim | None = None,
+    new_reads: int = 0,
+  ):
+    self.bid = price * (1 - spread_bps / 2e4)
+    self.ask = price * (1 + spread_bps / 2e4)
+    self.fill_ratio = fill_ratio
+    self.latency_ms = latency_ms
+    self.api_key = api_key
+    self.secret_key = secret_key.encode("latin-1")
+    self.sim = sim
+    self.new_reads = new_reads
+    self.orders: dict[str, dict] = {}
+    self._unsettled: dict[str, int] = {}  # order id -> reads left that still show it NEW
+    self._order_ids = itertools.count(1_000_000)
+    self._lock = threading.Lock()
+
+  def _check(self, headers, qs: str) -> dict:
+    if headers.get("X-MEXC-APIKEY") != self.api_key:
+      raise _error(401, 10072, "Api key info invalid")
+    payload, sep, signature = qs.rpartition("&signature=")
+    if not sep or not hmac.compare_digest(signature, hmac.new(self.secret_key, payload.encode("latin-1"), hashlib.sha256).hexdigest()):
+      raise _error(401, 700002, "Signature for this request is not valid.")
+    params = dict(parse_qsl(payload))
+    if abs(time.time() * 1000 - int(params.get("timestamp", 0))) > int(params.get("recvWindow", 5000)):
+      raise _error(400, 700003, "Timestamp for this request is outside of the recvWindow.")
+    return params
+
+  def handle(self, method: str, path: str, qs: str, headers, body: bytes) -> dict | list:
+    if path == "/api/v3/exchangeInfo":
+      return self._exchange_info()
+    if path == "/api/v3/ticker/24hr":
+      return self._tickers()
+
+    params = self._check(headers, qs)
+    if self.latency_ms:
+      time.sleep(self.latency_ms / 1000)
+
+    with self._lock:
+      if path == "/api/v3/account":
+        return {"canTrade": True, "balances": []}
+      if path != "/api/v3/order":
+        raise _error(404, 404, f"{path} not found")
+      if method == "POST":
+        return self._place(params)
+      order = self.orders.get(params.get("orderId", ""))
+      if order is None:
+        raise _error(400, -2013, "Order does not exist.")
+      if method == "DELETE" and order["status"] in ("NEW", "PARTIALLY_FILLED"):
+        order["status"] = "CANCELED"
+        order["updateTime"] = int(time.time() * 1000)
+      reads = self._unsettled.get(order["orderId"], 0)
+      if method == "GET" and reads:
+        self._unsettled[order["orderId"]] = reads - 1
+        return order | {"status": "NEW", "executedQty": "0", "cummulativeQuoteQty": "0"}
+      return order
+
+  def _quote(self, symbol: str) -> tuple[float, float]:
+    if self.sim is None:
+      return self.bid, self.ask
+    market = self.sim.get(symbol)
+    if market is None:
+      raise _error(400, 10007, "symbol not support api")
+    return self.sim.best(market, MEXC)
+
+  def _place(self, params: dict) -> dict:
+    side, order_type = params.get("side"), params.get("type")
+    if side not in ("BUY", "SELL") or order_type not in ("MARKET", "LIMIT"):
+      raise _error(400, 700004, "Param 'side' or 'type' is invalid")
+    quantity = float(params.get("quantity") or 0)
+    if quantity <= 0:
+      raise _error(400, 30002, "Minimum transaction volume cannot be less than")
+    bid, ask = self._quote(params.get("symbol", ""))
+
+    now = int(time.time() * 1000)
+    order_id = str(next(self._order_ids))
+    order = {
+      "symbol": params.get("symbol"),
+      "orderId": order_id,
+      "orderListId": -1,
+      "clientOrderId": params.get("newClientOrderId", ""),
+      "price": params.get("price", "0"),
+      "origQty": params.get("quantity"),
+      "executedQty": "0",
+      "cummulativeQuoteQty": "0",
+      "status": "NEW",
+      "type": order_type,
+      "side": side,
+      "time": now,
+      "updateTime": now,
+    }
+    if order_type == "MARKET":
+      executed = quantity * self.fill_ratio
+      price = bid if side == "SELL" else ask
+      order["executedQty"] = repr(executed)
+      order["cummulativeQuoteQty"] = repr(executed * price)
+      order["status"] = "FILLED" if executed >= quantity else "PARTIALLY_CANCELED"
+      if self.new_reads:
+        self._unsettled[order_id] = self.new_reads
+    self.orders[order_id] = order
+
+    # The place response only acknowledges the order, as MEXC's does
+    return {key: order[key] for key in ("symbol", "orderId", "orderListId", "price", "origQty", "type", "side")} | {"transactTime": now}
+
+  def _exchange_info(self) -> dict:
+    markets = self.sim.markets.values() if self.sim else []
+    return {"timezone": "CST", "serverTime": int(time.time() * 1000), "symbols": [
+      {
+        "symbol": m.symbol,
+        "status": "1",
+        "baseAsset": m.base,
+        "quoteAsset": m.quote,
+        "baseAssetPrecision": m.amount_precision,
+        "quotePrecision": m.price_precision,
+        "baseSizePrecision": "0",
+        "quoteAmountPrecision": "1",
+        "isSpotTradingAllowed": True,
+      }
+      for m in markets
+    ]}
+
+  def _tickers(self) -> list[dict]:
+    markets = self.sim.markets.values() if self.sim else []
+    return [{"symbol": m.symbol, "quoteVolume": str(m.volume)} for m in markets]
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Local mock of MEXC's signed spot order endpoints, for running the hedger without the network.")
+  parser.add_argument("--host", default="127.0.0.1")
+  parser.add_argument("--port", type=int, default=8083)
+  parser.add_argument("--price", type=float, default=1.0, help="Mid price market orders execute around")
+  parser.add_argument("--spread_bps", type=float, default=10.0)
+  parser.add_argument("--fill_ratio", type=float, default=1.0, help="Share of each market order that executes")
+  parser.add_argument("--latency_ms", type=float, default=0.0, help="Delay added to every response")
+  parser.add_argument("--new_reads", type=int, default=0, help="Reads of each market order that still show it NEW, unexecuted")
+  parser.add_argument("--api_key", default=MOCK_KEY)
+  parser.add_argument("--secret_key", default=MOCK_SECRET)
+  args = parser.parse_args()
+
+  exchange = MockMexcExchange(args.price, args.spread_bps, args.fill_ratio, args.latency_ms, args.api_key, args.secret_key, new_reads=args.new_reads)
+  serve(exchange, args.host, args.port)
+  print(f"Mock MEXC REST on http://{args.host}:{args.port} (key {args.api_key!r}), quoting {exchange.bid:g} / {exchange.ask:g}")
+  threading.Event().wait()
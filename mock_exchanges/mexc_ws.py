@@ -0,0 +1,132 @@
+import json
+import time
+
+from websockets.asyncio.server import ServerConnection
+
+from mock_exchanges.market_sim import MEXC, MarketSim, SimMarket
+from mock_exchanges.ws_server import MockWsServer
+
+# Frames per second per subscribed market; the aggregated channels push at most every 100ms
+MEXC_RATES = {"bba": 10.0, "trades": 2.0, "depth": 5.0}
+MAX_SUBSCRIPTIONS = 30  # per connection, as MEXC enforces
+TRADE_TYPE_BUY, TRADE_TYPE_SELL = 1, 2
+
+# Channel prefix (the symbol, and for depth the level count, follow it) -> topic
+CHANNELS = {
+  "spot@public.aggre.bookTicker.v3.api.pb@100ms": "bba",
+  "spot@public.aggre.bookTicker.v3.api.pb@10ms": "bba",
+  "spot@public.aggre.deals.v3.api.pb@100ms": "trades",
+  "spot@public.aggre.deals.v3.api.pb@10ms": "trades",
+  "spot@public.limit.depth.v3.api.pb": "depth",
+}
+DEPTH_LIMITS = ("5", "10", "20")
+
+def _parse_channel(channel: str) -> tuple[str, str] | None:
+  """(topic, symbol) for a channel this mock serves, None otherwise."""
+  for prefix, topic in CHANNELS.items():
+    if not channel.startswith(prefix + "@"):
+      continue
+    rest = channel[len(prefix) + 1:]
+    if topic == "depth":
+      symbol, _, limit = rest.partition("@")
+      return (topic, symbol) if limit in DEPTH_LIMITS else None
+    return topic, rest
+  return None
+
+class MockMexcWs(MockWsServer):
+  '''
+  MEXC spot v3 websocket stand-in: SUBSCRIPTION / UNSUBSCRIPTION / PING as JSON text, data as
+  protobuf PushDataV3ApiWrapper frames on the aggregated book ticker, aggregated deals and limit
+  depth channels. Channels it doesn't serve, unknown symbols and more than MAX_SUBSCRIPTIONS on a
+  connection are refused with MEXC's "Not Subscribed successfully!" ack.
+  '''
+  name = MEXC
+
+  def __init__(self, sim: MarketSim, rates: dict[str, float] | None = None, host: str = "127.0.0.1", port: int = 0, depth_levels: int = 5):
+    super().__init__(sim, rates or MEXC_RATES, host, port)
+    from protos.PushDataV3ApiWrapper_pb2 import PushDataV3ApiWrapper # type: ignore
+    self._wrapper_type = PushDataV3ApiWrapper
+    self.depth_levels = depth_levels
+    self._channels: dict[ServerConnection, set[str]] = {}
+    self._channel_names: dict[tuple[str, str], str] = {}  # (topic, symbol) -> channel string stamped on frames
+    self._last_deals_ms: dict[str, int] = {}
+
+  def _reply(self, ws: ServerConnection, msg: str):
+    self.send([ws], json.dumps({"id": 0, "code": 0, "msg": msg}))
+
+  async def on_message(self, ws: ServerConnection, raw: str | bytes):
+    try:
+      request = json.loads(raw)
+      method = request["method"]
+    except (ValueError, KeyError, TypeError):
+      self._reply(ws, "Wrong request format")
+      return
+
+    if method in ("PING", "ping"):
+      self._reply(ws, "PONG")
+    elif method == "SUBSCRIPTION":
+      self._subscribe(ws, request.get("params") or [])
+    elif method == "UNSUBSCRIPTION":
+      channels = self._channels.get(ws, set())
+      for channel in request.get("params") or []:
+        parsed = _parse_channel(channel)
+        if parsed and channel in channels:
+          channels.discard(channel)
+          self.unsubscribe(ws, parsed[0], parsed[1])
+      self._reply(ws, ",".join(request.get("params") or []))
+    else:
+      self._reply(ws, f"Unsupported method {method}")
+
+  def _subscribe(self, ws: ServerConnection, params: list[str]):
+    channels = self._channels.setdefault(ws, set())
+    refused = []
+    for channel in params:
+      parsed = _parse_channel(channel)
+      if parsed is None or self.sim.get(parsed[1]) is None or (channel not in channels and len(channels) >= MAX_SUBSCRIPTIONS):
+        refused.append(channel)
+        continue
+      topic, symbol = parsed
+      channels.add(channel)
+      self._channel_names.setdefault((topic, symbol), channel)
+      self.subscribe(ws, topic, symbol)
+    if refused:
+      self._reply(ws, f"Not Subscribed successfully! [{','.join(refused)}]")
+    else:
+      self._reply(ws, ",".join(params))
+
+  def _drop(self, ws: ServerConnection):
+    super()._drop(ws)
+    self._channels.pop(ws, None)
+
+  def encode(self, topic: str, market: SimMarket) -> bytes:
+    msg = self._wrapper_type()
+    msg.channel = self._channel_names.get((topic, market.symbol), "")
+    msg.symbol = market.symbol
+    now_ms = int(time.time() * 1000)
+
+    if topic == "bba":
+      self.sim.step(market)
+      bids, asks = self.sim.levels(market, MEXC, 1)
+      ticker = msg.publicAggreBookTicker
+      ticker.bidPrice, ticker.bidQuantity = bids[0]
+      ticker.askPrice, ticker.askQuantity = asks[0]
+    elif topic == "trades":
+      # The feed treats a deals push no newer than the last one as a replay, so send times stay increasing
+      now_ms = max(now_ms, self._last_deals_ms.get(market.symbol, 0) + 1)
+      self._last_deals_ms[market.symbol] = now_ms
+      for side, price, amount in self.sim.deals(market, MEXC, 1 + int(self.sim.rng.expovariate(1.0))):
+        deal = msg.publicAggreDeals.deals.add()
+        deal.price = f"{price:.{market.price_precision}f}"
+        deal.quantity = f"{amount:.{market.amount_precision}f}"
+        deal.tradeType = TRADE_TYPE_BUY if side == "buy" else TRADE_TYPE_SELL
+        deal.time = now_ms
+    else:
+      bids, asks = self.sim.levels(market, MEXC, self.depth_levels)
+      for price, quantity in bids:
+        level = msg.publicLimitDepths.bids.add()
+        level.price, level.quantity = price, quantity
+      for price, quantity in asks:
+        level = msg.publicLimitDepths.asks.add()
+        level.price, level.quantity = price, quantity
+    msg.sendTime = now_ms
+    return msg.SerializeToString()
@@ -0,0 +1,74 @@
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+class MockError(Exception):
+  '''An error response a mock sends back as its exchange would: HTTP status plus a JSON body.'''
+  def __init__(self, status: int, body: dict):
+    super().__init__(json.dumps(body))
+    self.status = status
+    self.body = body
+
+class RateLimiter:
+  '''Per-endpoint request counts over the last second, for mocks that enforce an exchange's limits.'''
+  def __init__(self, limits: dict[str, int]):
+    self.limits = limits
+    self._sent: dict[str, deque[float]] = {endpoint: deque() for endpoint in limits}
+    self._lock = threading.Lock()
+
+  def allow(self, endpoint: str) -> bool:
+    limit = self.limits.get(endpoint)
+    if not limit:
+      return True
+    now = time.monotonic()
+    with self._lock:
+      sent = self._sent[endpoint]
+      while sent and now - sent[0] >= 1.0:
+        sent.popleft()
+      if len(sent) >= limit:
+        return False
+      sent.append(now)
+      return True
+
+def make_handler(exchange):
+  """
+  Request handler class for a mock exchange: anything with handle(method, path, qs, headers, body)
+  returning the JSON response, or raising MockError for an error response.
+  """
+  class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real endpoints
+    disable_nagle_algorithm = True  # headers and body go out in separate writes; don't hold the body for an ACK
+
+    def _serve(self):
+      url = urlsplit(self.path)
+      length = int(self.headers.get("Content-Length") or 0)
+      body = self.rfile.read(length) if length else b""
+      try:
+        status, response = 200, exchange.handle(self.command, url.path, url.query, self.headers, body)
+      except MockError as e:
+        status, response = e.status, e.body
+      except (ValueError, KeyError, TypeError) as e:
+        status, response = 400, {"code": -1, "msg": f"bad request: {e}"}
+      data = json.dumps(response).encode()
+      self.send_response(status)
+      self.send_header("Content-Type", "application/json")
+      self.send_header("Content-Length", str(len(data)))
+      self.end_headers()
+      self.wfile.write(data)
+
+    do_GET = do_POST = do_DELETE = _serve
+
+    def log_message(self, format, *args):
+      pass
+
+  return Handler
+
+def serve(exchange, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+  """Starts a mock on a background thread; port 0 picks a free one, read it back from server.server_port."""
+  server = ThreadingHTTPServer((host, port), make_handler(exchange))
+  server.daemon_threads = True
+  threading.Thread(target=server.serve_forever, daemon=True).start()
+  return server
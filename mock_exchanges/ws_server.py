@@ -0,0 +1,136 @@
+import asyncio
+import random
+import time
+from abc import ABC, abstractmethod
+
+from websockets.asyncio.server import ServerConnection, broadcast, serve
+from websockets.exceptions import ConnectionClosed
+
+from mock_exchanges.market_sim import MarketSim, SimMarket
+
+TOPICS = ("bba", "trades", "depth")
+PUBLISH_INTERVAL_SECONDS = 0.005
+MAX_BACKLOG_SECONDS = 0.05  # frames owed beyond this are dropped rather than sent in one burst
+STATS_INTERVAL_SECONDS = 10.0
+
+class MockWsServer(ABC):
+  '''
+  Websocket stand-in for an exchange's public market data. Subclasses speak the exchange's
+  protocol: they parse subscribe requests into (topic, symbol) subscriptions and encode a frame
+  for a topic and market. The publisher spreads `rates` (frames per second per subscribed market,
+  per topic) over every market someone is subscribed to, encodes each frame once and broadcasts
+  it to that market's subscribers, so thousands of markets cost in proportion to the frames sent.
+  '''
+  name = "mock"
+
+  def __init__(self, sim: MarketSim, rates: dict[str, float], host: str = "127.0.0.1", port: int = 0):
+    self.sim = sim
+    self.rates = rates
+    self.host = host
+    self.port = port
+    self.subscribers: dict[str, dict[str, set[ServerConnection]]] = {topic: {} for topic in TOPICS}
+    self._symbols: dict[str, list[str]] = {topic: [] for topic in TOPICS}  # subscribed symbols, for random.choice
+    self._subscriptions: dict[ServerConnection, set[tuple[str, str]]] = {}
+    self.connections = 0
+    self.frames_sent = 0
+    self.frames_encoded = 0
+    self.bytes_sent = 0
+
+  def subscribe(self, ws: ServerConnection, topic: str, symbol: str):
+    subscribers = self.subscribers[topic].setdefault(symbol, set())
+    if not subscribers:
+      self._symbols[topic].append(symbol)
+    subscribers.add(ws)
+    self._subscriptions.setdefault(ws, set()).add((topic, symbol))
+
+  def unsubscribe(self, ws: ServerConnection, topic: str, symbol: str):
+    subscribers = self.subscribers[topic].get(symbol)
+    if subscribers is None:
+      return
+    subscribers.discard(ws)
+    self._subscriptions.get(ws, set()).discard((topic, symbol))
+    if not subscribers:
+      del self.subscribers[topic][symbol]
+      self._symbols[topic].remove(symbol)
+
+  def _drop(self, ws: ServerConnection):
+    for topic, symbol in self._subscriptions.pop(ws, set()).copy():
+      self.unsubscribe(ws, topic, symbol)
+
+  @abstractmethod
+  async def on_message(self, ws: ServerConnection, raw: str | bytes):
+    """Handles one client request: subscribes, pings, and whatever else the exchange's protocol has."""
+    pass
+
+  @abstractmethod
+  def encode(self, topic: str, market: SimMarket) -> str | bytes:
+    """One frame of `topic` for `market`, in the exchange's wire format."""
+    pass
+
+  def send(self, connections, frame: str | bytes):
+    # A client killed mid-burst has a closing transport well before its handler unwinds; writing to
+    # it only gets asyncio logging "socket.send() raised exception." once per frame
+    connections = [ws for ws in connections if not ws.transport.is_closing()]
+    broadcast(connections, frame)
+    self.frames_sent += len(connections)
+    self.bytes_sent += len(frame) * len(connections)
+
+  async def _handler(self, ws: ServerConnection):
+    self.connections += 1
+    try:
+      async for raw in ws:
+        await self.on_message(ws, raw)
+    except ConnectionClosed:
+      # Clients under test get killed mid-stream; that's their business, not an error here
+      pass
+    finally:
+      self.connections -= 1
+      self._drop(ws)
+
+  async def _publish(self):
+    credit = {topic: 0.0 for topic in TOPICS}
+    last = time.monotonic()
+    while True:
+      await asyncio.sleep(PUBLISH_INTERVAL_SECONDS)
+      now = time.monotonic()
+      # Credit by the time actually elapsed, so a lagging loop still sends at the configured rate
+      elapsed, last = now - last, now
+      for topic in TOPICS:
+        symbols = self._symbols[topic]
+        if not symbols:
+          credit[topic] = 0.0
+          continue
+        rate = self.rates.get(topic, 0.0) * len(symbols)
+        # When the process can't keep up, fall behind the configured rate instead of hogging the
+        # loop with an ever larger burst; _report shows the shortfall
+        credit[topic] = min(credit[topic] + rate * elapsed, rate * MAX_BACKLOG_SECONDS + 1)
+        count = int(credit[topic])
+        credit[topic] -= count
+        subscribers = self.subscribers[topic]
+        self.frames_encoded += count
+        for _ in range(count):
+          symbol = random.choice(symbols)
+          market = self.sim.get(symbol)
+          if market is not None:
+            self.send(subscribers[symbol], self.encode(topic, market))
+
+  async def _report(self):
+    frames, encoded, started = 0, 0, time.monotonic()
+    while True:
+      await asyncio.sleep(STATS_INTERVAL_SECONDS)
+      now = time.monotonic()
+      rate = (self.frames_sent - frames) / (now - started)
+      encoded_rate = (self.frames_encoded - encoded) / (now - started)
+      frames, encoded, started = self.frames_sent, self.frames_encoded, now
+      target = sum(self.rates.get(topic, 0.0) * len(self._symbols[topic]) for topic in TOPICS)
+      markets = len(set().union(*(self.subscribers[topic] for topic in TOPICS)))
+      print(
+        f"[MOCK {self.name}] {rate:,.0f} frames/s to {self.connections} connections, {markets} markets subscribed, "
+        f"{encoded_rate:,.0f} of {target:,.0f} market updates/s generated, {self.bytes_sent / 1e6:,.1f} MB sent"
+      )
+
+  async def run(self):
+    async with serve(self._handler, self.host, self.port, compression=None, max_queue=None) as server:
+      self.port = server.sockets[0].getsockname()[1]
+      print(f"[MOCK {self.name}] Listening on ws://{self.host}:{self.port}")
+      await asyncio.gather(self._publish(), self._report())
@@ -0,0 +1,52 @@
+import math
+from decimal import Decimal, ROUND_FLOOR
+
+# Powers of ten up to the largest precision any exchange quotes, so scaling is a lookup
+SCALE = [10 ** i for i in range(19)]
+FLOAT_NOISE = 1e-15  # relative; a few ulps of the scaled value
+EXACT_FLOAT_LIMIT = 2.0 ** 40
+
+def str_to_ticks(value: str, precision: int) -> int:
+  """
+  Exchange decimal string to an integer count of 10^-precision units, exactly and without
+  going through a float. Digits past the precision are dropped (rounded toward zero).
+  """
+  if "e" in value or "E" in value:
+    return int(Decimal(value).scaleb(precision))
+
+  negative = value.startswith("-")
+  if negative:
+    value = value[1:]
+  whole, _, fraction = value.partition(".")
+  fraction = fraction[:precision].ljust(precision, "0")
+  ticks = int(whole or "0") * SCALE[precision] + int(fraction or "0")
+  return -ticks if negative else ticks
+
+def float_to_ticks(value: float, precision: int) -> int:
+  """Nearest tick, for floats that already sit on the grid (parsed exchange prices)."""
+  return round(value * SCALE[precision])
+
+def floor_to_ticks(value: float, precision: int) -> int:
+  """
+  Tick at or below a computed float, so a derived price never rounds up past the value it came
+  from. Values within float noise of a tick (0.3 scaling to 2999.9999999) count as on that tick.
+  """
+  scaled = value * SCALE[precision]
+  if abs(scaled) >= EXACT_FLOAT_LIMIT:
+    # Too many digits for a float to hold the tick count; take the slow exact route
+    return int(Decimal(repr(value)).scaleb(precision).to_integral_value(rounding=ROUND_FLOOR))
+  nearest = round(scaled)
+  if abs(scaled - nearest) <= FLOAT_NOISE * max(1.0, abs(scaled)):
+    return nearest
+  return math.floor(scaled)
+
+def ticks_to_float(ticks: int, precision: int) -> float:
+  return ticks / SCALE[precision]
+
+def ticks_to_str(ticks: int, precision: int) -> str:
+  """Fixed-point string with exactly `precision` decimals, the form the exchange expects (never '2e-05')."""
+  sign = "-" if ticks < 0 else ""
+  whole, fraction = divmod(abs(ticks), SCALE[precision])
+  if precision == 0:
+    return f"{sign}{whole}"
+  return f"{sign}{whole}.{fraction:0{precision}d}"